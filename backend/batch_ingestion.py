@@ -0,0 +1,180 @@
+"""
+Batch ingestion of many PDFs.
+
+PDF parsing and splitting run across a process pool, since text extraction
+is CPU-bound. Each file's chunks are embedded and upserted as soon as that
+file is parsed, one file at a time, while the pool keeps parsing the rest;
+so parsing overlaps ingestion, but embedding is only batched within a file.
+Where a process pool cannot be started, or a worker dies, the remaining
+files are parsed in-process.
+
+Usage:
+    python batch_ingestion.py <directory> [--workers N] [--recursive] [--json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Tuple, Union
+
+import config
+import metrics
+import tracing
+from document_processor import parse_pdf_in_worker
+
+
+class BatchIngestor:
+    """Class to ingest many PDFs with parsing spread across worker processes"""
+
+    def __init__(self, vector_store_manager, max_workers: int = None):
+        self.vector_store_manager = vector_store_manager
+        self.max_workers = max_workers or config.PARSE_WORKERS
+
+    def ingest(self, files: List[Tuple[str, Union[bytes, str]]], progress_callback=None) -> dict:
+        """
+        Parse, embed and upsert a batch of PDFs
+
+        Args:
+            files: List of (filename, content) pairs, where content is the PDF bytes or a path
+            progress_callback: Optional callable receiving ("parsed" | "split" | "embedded" |
+                "upserted" | "skipped" | "deleted", count)
+
+        Returns:
+            Dictionary with a report per file and total throughput
+        """
+        start = time.perf_counter()
+        reports = []
+
+        # Ingest each file as soon as its parse finishes, while other files are still parsing
+        for filename, parsed in self._parse_files(files):
+            report = {"filename": filename, "status": "completed", "error": None}
+            try:
+                if isinstance(parsed, Exception):
+                    raise parsed
+                report.update(pages=parsed["pages"], chunks=len(parsed["chunks"]), parse_seconds=parsed["parse_seconds"])
+                # Worker processes keep their own metrics, so record the whole-file parse here
+                metrics.INGESTION_STAGE_SECONDS.observe(parsed["parse_seconds"], stage="parse_file")
+                tracing.current_span().add_event(
+                    "parsed", source=filename, pages=parsed["pages"], parse_seconds=parsed["parse_seconds"]
+                )
+                if progress_callback:
+                    progress_callback("parsed", parsed["pages"])
+                    progress_callback("split", len(parsed["chunks"]))
+
+                ingest_start = time.perf_counter()
+                report["added"] = self.vector_store_manager.add_document_stream(
+                    filename, parsed["chunks"], progress_callback=progress_callback
+                )
+                report["ingest_seconds"] = time.perf_counter() - ingest_start
+            except Exception as e:
+                print(f"Error ingesting {filename}: {e}")
+                metrics.ERRORS.inc(component="ingestion")
+                report.update(status="failed", error=str(e))
+            reports.append(report)
+
+        total_seconds = time.perf_counter() - start
+        total_chunks = sum(report.get("chunks", 0) for report in reports)
+        return {
+            "files": reports,
+            "total_seconds": total_seconds,
+            "total_chunks": total_chunks,
+            "chunks_per_second": total_chunks / total_seconds if total_seconds else 0.0,
+            "files_per_second": len(reports) / total_seconds if total_seconds else 0.0
+        }
+
+
+    def _parse_files(self, files: List[Tuple[str, Union[bytes, str]]]) -> Iterator[Tuple[str, Union[dict, Exception]]]:
+        """
+        Parse files across worker processes, falling back to this process
+
+        Yields:
+            (filename, parse result) pairs in completion order, where a file
+            that failed to parse has the exception as its result
+        """
+        parsed = set()
+        workers = min(self.max_workers, len(files))
+        if workers > 1:
+            try:
+                # Spawn rather than fork: the server process has live threads and clients
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                    futures = {
+                        pool.submit(parse_pdf_in_worker, content, filename): i
+                        for i, (filename, content) in enumerate(files)
+                    }
+                    for future in as_completed(futures):
+                        i = futures[future]
+                        try:
+                            result = future.result()
+                        except BrokenProcessPool:
+                            raise
+                        except Exception as e:
+                            result = e
+                        parsed.add(i)
+                        yield files[i][0], result
+            except (BrokenProcessPool, NotImplementedError, OSError) as e:
+                # e.g. no shared memory for the pool's queues on serverless hosts, or a worker was killed
+                print(f"Process pool unavailable, parsing {len(files) - len(parsed)} files in-process: {e}")
+
+        for i, (filename, content) in enumerate(files):
+            if i in parsed:
+                continue
+            try:
+                result = parse_pdf_in_worker(content, filename)
+            except Exception as e:
+                result = e
+            yield filename, result
+
+
+def find_pdfs(directory: str, recursive: bool = False) -> List[Tuple[str, str]]:
+    """Return (filename, path) pairs for the PDFs in a directory"""
+    pdfs = []
+    for root, dirs, names in os.walk(directory):
+        for name in sorted(names):
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(root, name)
+                pdfs.append((os.path.relpath(path, directory), path))
+        if not recursive:
+            break
+    return pdfs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory of PDFs into the vector store")
+    parser.add_argument("directory", help="Directory containing PDF files")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: PARSE_WORKERS)")
+    parser.add_argument("--recursive", action="store_true", help="Include PDFs in subdirectories")
+    parser.add_argument("--json", action="store_true", help="Print a machine-readable report")
+    args = parser.parse_args()
+
+    from vector_store import VectorStoreManager
+
+    files = find_pdfs(args.directory, recursive=args.recursive)
+    if not files:
+        print(f"No PDF files found in {args.directory}")
+        return
+
+    report = BatchIngestor(VectorStoreManager(), max_workers=args.workers).ingest(files)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'file':<40} {'status':<10} {'pages':>6} {'chunks':>7} {'added':>6} {'parse s':>8} {'ingest s':>9}")
+    for file_report in report["files"]:
+        print(
+            f"{file_report['filename'][:40]:<40} {file_report['status']:<10} "
+            f"{file_report.get('pages', 0):>6} {file_report.get('chunks', 0):>7} {file_report.get('added', 0):>6} "
+            f"{file_report.get('parse_seconds', 0):>8.2f} {file_report.get('ingest_seconds', 0):>9.2f}"
+        )
+    print(
+        f"{len(report['files'])} files, {report['total_chunks']} chunks in {report['total_seconds']:.2f}s "
+        f"({report['chunks_per_second']:.1f} chunks/sec, {report['files_per_second']:.2f} files/sec)"
+    )
+
+
+if __name__ == "__main__":
+    main()
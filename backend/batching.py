@@ -0,0 +1,142 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List
+
+from langchain_core.embeddings import Embeddings
+
+import metrics
+
+
+class MicroBatcher:
+    """
+    Class to coalesce concurrent requests into batched calls
+
+    Requests are lists of texts. A collector thread takes the first waiting
+    request, gives others max_wait_ms to join it, and hands up to
+    max_batch_size texts to batch_fn in one call. At most max_concurrent
+    calls run at once; requests arriving while every slot is busy join the
+    next batch instead of queueing up as calls of their own.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[str]], List],
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_concurrent: int = 1,
+        name: str = "micro-batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._slots = threading.Semaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix=name)
+        self._queue = queue.Queue()
+        self._collector = threading.Thread(target=self._run, name=name, daemon=True)
+        self._collector.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for the next batch
+
+        Returns:
+            Future resolving to one result per text, in order
+        """
+        future = Future()
+        if texts:
+            self._queue.put((list(texts), future))
+        else:
+            future.set_result([])
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+
+            # Give concurrent requests a moment to join, unless the batch is already full
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            # Requests arriving while every call is in flight join this batch
+            self._slots.acquire()
+            while size < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            self._executor.submit(self._call, batch)
+
+    def _call(self, batch: List[tuple]):
+        try:
+            live = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+            if not live:
+                return
+
+            try:
+                results = self.batch_fn([text for texts, _future in live for text in texts])
+            except Exception as e:
+                for _texts, future in live:
+                    future.set_exception(e)
+                return
+
+            offset = 0
+            for texts, future in live:
+                future.set_result(list(results[offset:offset + len(texts)]))
+                offset += len(texts)
+        finally:
+            self._slots.release()
+
+
+class CoalescingEmbeddings(Embeddings):
+    """
+    Class to send concurrent query embeddings to the model as one embed_documents call
+
+    Under a burst of queries this turns many single-text embeddings requests
+    into a few batched ones. Identical queries in a batch are embedded once.
+    Document embedding is passed straight through, since ingestion already
+    batches its chunks.
+    """
+
+    def __init__(self, embeddings: Embeddings, window_ms: float, max_batch_size: int, max_concurrent: int):
+        self.embeddings = embeddings
+        self.batcher = MicroBatcher(
+            self._embed_unique,
+            max_batch_size=max_batch_size,
+            max_wait_ms=window_ms,
+            max_concurrent=max_concurrent,
+            name="query-embeddings"
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.batcher.submit([text]).result()[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await asyncio.wrap_future(self.batcher.submit([text])))[0]
+
+    def _embed_unique(self, texts: List[str]) -> List[List[float]]:
+        metrics.QUERY_EMBEDDING_BATCH_SIZE.observe(len(texts))
+        unique = list(dict.fromkeys(texts))
+        vectors = dict(zip(unique, self.embeddings.embed_documents(unique)))
+        return [vectors[text] for text in texts]
@@ -0,0 +1 @@
+# JARVIS RAG Backend Benchmarks
\ No newline at end of file
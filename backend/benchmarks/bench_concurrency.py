@@ -0,0 +1,98 @@
+"""
+Concurrency benchmark for the /query RAG path.
+
+Compares the blocking generate_response_with_rag (called from inside an async
+handler, as /query used to do) with the async agenerate_response_with_rag,
+using the embeddings, vector store and chat model fakes from
+benchmarks/fakes.py with fixed latencies, so no OpenAI or Pinecone
+credentials are needed.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--concurrency 1 8 32 64]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from benchmarks.fakes import FakeChatModel, HashEmbeddings, build_components
+from llm import LLMManager
+
+
+async def _timed(coro_factory, start: float):
+    # Latency is measured from when the burst was issued, so queueing behind
+    # a blocked event loop shows up in the percentiles
+    await coro_factory()
+    return time.perf_counter() - start
+
+
+async def run_level(llm_manager: LLMManager, concurrency: int, use_async: bool) -> dict:
+    """Fire `concurrency` queries at once and collect wall time and latency percentiles"""
+    query = "What projects has Timal worked on?"
+
+    async def sync_handler():
+        # What /query did before: a blocking call inside an async handler
+        return llm_manager.generate_response_with_rag(query)
+
+    async def async_handler():
+        return await llm_manager.agenerate_response_with_rag(query)
+
+    handler = async_handler if use_async else sync_handler
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*[_timed(handler, start) for _ in range(concurrency)])
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latencies)
+    return {
+        "wall_s": wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "qps": concurrency / wall,
+    }
+
+
+def build_llm_manager(embed_latency: float, search_latency: float, llm_latency: float) -> LLMManager:
+    """Build an LLMManager on the fakes, with the response cache off so every query runs the pipeline"""
+    components = build_components(
+        embeddings=HashEmbeddings(latency=embed_latency),
+        chat_model=FakeChatModel(first_token_latency=llm_latency),
+        search_latency=search_latency,
+    )
+    components["vector_store_manager"].add_documents([
+        Document(page_content=f"Chunk {i} about Timal's projects.", metadata={"source": "cv.pdf", "page": i})
+        for i in range(4)
+    ])
+    llm_manager = components["llm_manager"]
+    llm_manager.response_cache = None
+    return llm_manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async /query pipeline")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    parser.add_argument("--search-latency", type=float, default=0.03)
+    parser.add_argument("--llm-latency", type=float, default=0.25)
+    args = parser.parse_args()
+
+    llm_manager = build_llm_manager(args.embed_latency, args.search_latency, args.llm_latency)
+
+    print(f"{'mode':<6} {'conc':>5} {'wall s':>8} {'p50 ms':>9} {'p99 ms':>9} {'qps':>8}")
+    for concurrency in args.concurrency:
+        for mode, use_async in (("sync", False), ("async", True)):
+            result = asyncio.run(run_level(llm_manager, concurrency, use_async))
+            print(
+                f"{mode:<6} {concurrency:>5} {result['wall_s']:>8.2f} "
+                f"{result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['qps']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
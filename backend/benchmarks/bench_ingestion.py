@@ -0,0 +1,55 @@
+"""
+Ingestion throughput benchmark for the embedding/upsert pipeline.
+
+Runs IngestionPipeline against stub embedding and upsert calls with a fixed
+per-request latency plus a per-item cost, across batch sizes and
+concurrency levels, and prints chunks/sec for each setting.
+
+Usage:
+    python benchmarks/bench_ingestion.py [--chunks 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import IngestionPipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched embedding and upsert throughput")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="Seconds per embeddings request")
+    parser.add_argument("--embed-per-item", type=float, default=0.0005, help="Seconds per embedded chunk")
+    parser.add_argument("--upsert-latency", type=float, default=0.04, help="Seconds per upsert request")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 100, 250])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    def embed(texts):
+        time.sleep(args.embed_latency + args.embed_per_item * len(texts))
+        return [[0.0] * 8 for _ in texts]
+
+    def upsert(ids, vectors, texts, metadatas):
+        time.sleep(args.upsert_latency)
+
+    ids = [str(i) for i in range(args.chunks)]
+    texts = [f"chunk {i}" for i in range(args.chunks)]
+    metadatas = [{} for _ in range(args.chunks)]
+
+    print(f"{'batch':>6} {'conc':>5} {'total s':>8} {'chunks/s':>10}")
+    for batch_size in args.batch_sizes:
+        for concurrency in args.concurrency:
+            pipeline = IngestionPipeline(
+                embed, upsert,
+                embed_batch_size=batch_size, upsert_batch_size=min(batch_size, 100),
+                embed_concurrency=concurrency, upsert_concurrency=concurrency
+            )
+            stats = pipeline.run(ids, texts, metadatas)
+            print(f"{batch_size:>6} {concurrency:>5} {stats['total_seconds']:>8.2f} {stats['chunks_per_second']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
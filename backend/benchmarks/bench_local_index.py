@@ -0,0 +1,58 @@
+"""
+Retrieval latency benchmark for the local in-process vector index.
+
+Fills a LocalVectorStore with random unit vectors and times single and
+batched top-k queries.
+
+Usage:
+    python benchmarks/bench_local_index.py [--vectors 5000] [--dimension 1024]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from local_vector_store import LocalVectorStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local vector index search")
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    store = LocalVectorStore(embedding=None, dimension=args.dimension)
+    store.add_vectors(
+        rng.standard_normal((args.vectors, args.dimension)).astype(np.float32),
+        [f"chunk {i}" for i in range(args.vectors)]
+    )
+    queries = rng.standard_normal((args.queries, args.dimension)).astype(np.float32)
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        store.similarity_search_by_vector_with_score(query, k=args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    start = time.perf_counter()
+    for i in range(0, args.queries, args.batch):
+        store.similarity_search_by_vectors_with_score(queries[i:i + args.batch], k=args.k)
+    batched_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+    print(f"vectors={args.vectors} dimension={args.dimension} k={args.k}")
+    print(f"single query  p50={statistics.median(latencies):.3f} ms  p99={latencies[int(len(latencies) * 0.99) - 1]:.3f} ms")
+    print(f"batched ({args.batch})  {batched_ms:.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
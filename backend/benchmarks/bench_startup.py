@@ -0,0 +1,100 @@
+"""
+Startup-time benchmark for the backend.
+
+Reports, per component, the import time in a fresh interpreter and the
+construction time. Without Pinecone credentials the local vector index is
+used, and a placeholder OpenAI key is set (client construction does no
+network work), so this runs offline.
+
+Usage:
+    python benchmarks/bench_startup.py [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+IMPORTS = ["config", "embeddings", "local_vector_store", "vector_store", "llm", "document_processor", "services", "api"]
+
+
+def _benchmark_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    if not env.get("PINECONE_API_KEY"):
+        env["VECTOR_STORE_BACKEND"] = "local"
+        env.setdefault("LOCAL_INDEX_PATH", tempfile.mkdtemp(prefix="jarvis-bench-index-"))
+    return env
+
+
+def measure_import(module: str, env: dict) -> float:
+    """Import a module in a fresh interpreter and return the import time in ms"""
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {BACKEND_DIR!r})\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_init() -> dict:
+    """Construct each component in this process and return construction times in ms"""
+    from document_processor import DocumentProcessor
+    from embeddings import get_embeddings_model
+    from llm import get_chat_model
+    from vector_store import VectorStoreManager
+    import services
+
+    timings = {}
+    for name, factory in [
+        ("document_processor", DocumentProcessor),
+        ("embeddings", get_embeddings_model),
+        ("chat_model", get_chat_model),
+        ("vector_store_manager", VectorStoreManager),
+        ("services.get_components", services.get_components),
+    ]:
+        start = time.perf_counter()
+        factory()
+        timings[name] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend import and initialisation time")
+    parser.add_argument("--json", action="store_true", help="Print a machine-readable report")
+    args = parser.parse_args()
+
+    env = _benchmark_env()
+    os.environ.update(env)
+
+    report = {
+        "import_ms": {module: measure_import(module, env) for module in IMPORTS},
+        "init_ms": measure_init(),
+        "vector_store_backend": env.get("VECTOR_STORE_BACKEND", "pinecone"),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"vector store backend: {report['vector_store_backend']}")
+    print("import (fresh interpreter)")
+    for module, ms in report["import_ms"].items():
+        print(f"  {module:<22} {ms:>9.1f} ms")
+    print("init")
+    for component, ms in report["init_ms"].items():
+        print(f"  {component:<22} {ms:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+"""
+Offline benchmark suite for the RAG pipeline.
+
+Runs the real API, ingestion and retrieval code against the fakes in
+benchmarks/fakes.py (deterministic hash embeddings, a chat model with
+configurable latency and the local vector index), so no OpenAI or Pinecone
+credentials are needed. Measures:
+
+- startup: import time of the api module in a fresh interpreter, and
+  component construction time
+- ingestion: throughput of the /upload path for generated PDFs of several sizes
+- query: /query throughput and latency percentiles per concurrency level
+- stream: time to first token and total time of streamed answers per concurrency level
+
+The report is JSON, so runs can be stored and compared; --compare exits
+non-zero when a key metric regressed by more than --tolerance.
+
+Usage:
+    python benchmarks/bench_suite.py [--output report.json] [--compare baseline.json] [--quick]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks.fakes import FakeChatModel, HashEmbeddings, build_components, generate_pdf, generate_text
+
+REPORT_VERSION = 1
+
+QUERIES = [
+    "What projects has Timal built with python and fastapi?",
+    "Which cloud platforms does Timal use, aws or azure?",
+    "Where did Timal study engineering?",
+    "How does the jarvis retrieval pipeline work?",
+    "What certifications does Timal hold?",
+]
+
+
+def percentiles(values: List[float]) -> dict:
+    """Mean and nearest-rank percentiles of latencies in seconds, reported in ms"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] * 1000
+
+    return {
+        "mean": sum(ordered) / len(ordered) * 1000,
+        "p50": rank(50),
+        "p90": rank(90),
+        "p95": rank(95),
+        "p99": rank(99),
+        "max": ordered[-1] * 1000,
+    }
+
+
+def bench_startup(measure_fresh_import: bool = True) -> dict:
+    """
+    Time importing the api module in a fresh interpreter, and building the
+    fake-backed components in this one, including the imports that triggers
+    """
+    result = {}
+    if measure_fresh_import:
+        from benchmarks.bench_startup import _benchmark_env, measure_import
+
+        result["import_api_ms"] = measure_import("api", _benchmark_env())
+
+    start = time.perf_counter()
+    build_components()
+    result["build_components_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def bench_ingestion(components: dict, page_counts: List[int], words_per_page: int) -> List[dict]:
+    """Ingest one generated PDF per size through the /upload path and report throughput"""
+    document_processor = components["document_processor"]
+    vector_store_manager = components["vector_store_manager"]
+
+    results = []
+    for pages in page_counts:
+        pdf = generate_pdf(pages, words_per_page=words_per_page, seed=pages)
+        filename = f"generated-{pages}-pages.pdf"
+
+        start = time.perf_counter()
+        chunks = document_processor.iter_pdf_chunks(pdf, filename)
+        added = vector_store_manager.add_document_stream(filename, chunks)
+        seconds = time.perf_counter() - start
+
+        results.append({
+            "pages": pages,
+            "bytes": len(pdf),
+            "chunks": added,
+            "seconds": seconds,
+            "pages_per_second": pages / seconds if seconds else 0.0,
+            "chunks_per_second": added / seconds if seconds else 0.0,
+            "embed_seconds": vector_store_manager.last_ingestion_stats["embed_seconds"],
+            "upsert_seconds": vector_store_manager.last_ingestion_stats["upsert_seconds"],
+        })
+    return results
+
+
+async def _closed_loop(concurrency: int, total: int, request_fn) -> tuple:
+    """Run total requests from concurrency workers, each sending its next request when the last completes"""
+    latencies, errors = [], 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                await request_fn(index)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors += 1
+                print(f"Benchmark request failed: {e}", file=sys.stderr)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, errors, time.perf_counter() - start
+
+
+async def bench_query(components: dict, concurrency_levels: List[int], requests_per_worker: int) -> List[dict]:
+    """Measure /query over the ASGI app, with distinct queries so no cache answers them"""
+    import httpx
+    import api
+    import services
+
+    previous_components = dict(services._components)
+    services._components.clear()
+    services._components.update(components)
+
+    results = []
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bench") as client:
+            for run, concurrency in enumerate(concurrency_levels, start=1):
+
+                async def send(index, run=run):
+                    response = await client.post(
+                        "/query", json={"query": f"{QUERIES[index % len(QUERIES)]} ({run}-{index})"}
+                    )
+                    response.raise_for_status()
+
+                total = max(concurrency * requests_per_worker, requests_per_worker)
+                latencies, errors, wall = await _closed_loop(concurrency, total, send)
+                results.append({
+                    "concurrency": concurrency,
+                    "requests": total,
+                    "errors": errors,
+                    "wall_seconds": wall,
+                    "throughput_rps": len(latencies) / wall if wall else 0.0,
+                    "latency_ms": percentiles(latencies),
+                })
+    finally:
+        services._components.clear()
+        services._components.update(previous_components)
+    return results
+
+
+async def bench_stream(components: dict, concurrency_levels: List[int], requests_per_worker: int) -> List[dict]:
+    """
+    Measure time to first token and total time of streamed answers
+
+    The stream is consumed from LLMManager directly: the in-process ASGI
+    transport buffers whole responses, which would hide the first token.
+    """
+    llm_manager = components["llm_manager"]
+
+    results = []
+    for run, concurrency in enumerate(concurrency_levels, start=1):
+        first_token_latencies = []
+
+        async def stream(index, run=run):
+            start = time.perf_counter()
+            first = None
+            async for event, _data in llm_manager.astream_response_with_rag(
+                f"{QUERIES[index % len(QUERIES)]} (stream {run}-{index})"
+            ):
+                if event == "token" and first is None:
+                    first = time.perf_counter() - start
+            if first is not None:
+                first_token_latencies.append(first)
+
+        total = max(concurrency * requests_per_worker, requests_per_worker)
+        latencies, errors, wall = await _closed_loop(concurrency, total, stream)
+        results.append({
+            "concurrency": concurrency,
+            "requests": total,
+            "errors": errors,
+            "wall_seconds": wall,
+            "throughput_rps": len(latencies) / wall if wall else 0.0,
+            "first_token_ms": percentiles(first_token_latencies),
+            "latency_ms": percentiles(latencies),
+        })
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(
+    concurrency_levels: List[int] = (1, 8, 32),
+    requests_per_worker: int = 4,
+    page_counts: List[int] = (5, 25, 100),
+    words_per_page: int = 400,
+    corpus_pages: int = 20,
+    embed_latency: float = 0.02,
+    embed_per_item_latency: float = 0.0002,
+    first_token_latency: float = 0.2,
+    token_latency: float = 0.005,
+    answer_tokens: int = 40,
+    measure_fresh_import: bool = True,
+) -> dict:
+    """
+    Run every benchmark and return the report
+
+    Returns:
+        JSON-serialisable report with the environment, parameters and one section per benchmark
+    """
+    parameters = {
+        "concurrency_levels": list(concurrency_levels),
+        "requests_per_worker": requests_per_worker,
+        "page_counts": list(page_counts),
+        "words_per_page": words_per_page,
+        "corpus_pages": corpus_pages,
+        "embed_latency": embed_latency,
+        "embed_per_item_latency": embed_per_item_latency,
+        "first_token_latency": first_token_latency,
+        "token_latency": token_latency,
+        "answer_tokens": answer_tokens,
+    }
+
+    startup = bench_startup(measure_fresh_import)
+
+    components = build_components(
+        embeddings=HashEmbeddings(latency=embed_latency, per_item_latency=embed_per_item_latency),
+        chat_model=FakeChatModel(first_token_latency, token_latency, answer_tokens)
+    )
+    # Every query is distinct, but near-duplicates must not be served from the response cache
+    components["llm_manager"].response_cache = None
+
+    ingestion = bench_ingestion(components, list(page_counts), words_per_page)
+
+    # Queries run against a fixed corpus, independent of the ingestion sizes
+    corpus = build_components(
+        embeddings=HashEmbeddings(latency=embed_latency, per_item_latency=0.0),
+        chat_model=FakeChatModel(first_token_latency, token_latency, answer_tokens)
+    )
+    corpus["llm_manager"].response_cache = None
+    corpus["vector_store_manager"].add_document_stream(
+        "corpus.pdf", corpus["document_processor"].iter_pdf_chunks(
+            generate_pdf(corpus_pages, words_per_page=words_per_page), "corpus.pdf"
+        )
+    )
+
+    start = time.perf_counter()
+    corpus["llm_manager"].generate_response_with_rag(generate_text(8, seed=1))
+    startup["first_query_ms"] = (time.perf_counter() - start) * 1000
+
+    query = asyncio.run(bench_query(corpus, list(concurrency_levels), requests_per_worker))
+    stream = asyncio.run(bench_stream(corpus, list(concurrency_levels), requests_per_worker))
+
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "git_commit": _git_commit(),
+        },
+        "parameters": parameters,
+        "startup": startup,
+        "ingestion": ingestion,
+        "query": query,
+        "stream": stream,
+    }
+
+
+def key_metrics(report: dict) -> dict:
+    """
+    Flatten the metrics tracked for regressions
+
+    Returns:
+        {metric name: (value, higher_is_better)}
+    """
+    metrics = {}
+    for name, value in report.get("startup", {}).items():
+        metrics[f"startup.{name}"] = (value, False)
+    for result in report.get("ingestion", []):
+        metrics[f"ingestion.{result['pages']}_pages.chunks_per_second"] = (result["chunks_per_second"], True)
+    for section in ("query", "stream"):
+        for result in report.get(section, []):
+            prefix = f"{section}.c{result['concurrency']}"
+            metrics[f"{prefix}.throughput_rps"] = (result["throughput_rps"], True)
+            for p in ("p50", "p99"):
+                if p in result["latency_ms"]:
+                    metrics[f"{prefix}.latency_{p}_ms"] = (result["latency_ms"][p], False)
+            if result.get("first_token_ms"):
+                metrics[f"{prefix}.first_token_p50_ms"] = (result["first_token_ms"]["p50"], False)
+    return metrics
+
+
+def compare_reports(baseline: dict, current: dict, tolerance: float = 0.2) -> List[str]:
+    """
+    List the key metrics that got worse than the baseline by more than tolerance
+
+    Metrics missing from either report, e.g. after changing the parameters, are skipped.
+    """
+    if baseline.get("parameters") != current.get("parameters"):
+        print("Warning: benchmark parameters differ from the baseline", file=sys.stderr)
+
+    baseline_metrics = key_metrics(baseline)
+    regressions = []
+    for name, (value, higher_is_better) in key_metrics(current).items():
+        if name not in baseline_metrics:
+            continue
+        previous = baseline_metrics[name][0]
+        if not previous:
+            continue
+        change = (value - previous) / previous
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{name}: {previous:.2f} -> {value:.2f} ({change:+.0%})")
+    return regressions
+
+
+def print_summary(report: dict):
+    startup = report["startup"]
+    print("startup")
+    for name, ms in startup.items():
+        print(f"  {name:<22} {ms:>9.1f} ms")
+
+    print(f"\n{'ingestion pages':<16} {'chunks':>7} {'seconds':>8} {'pages/s':>9} {'chunks/s':>9}")
+    for result in report["ingestion"]:
+        print(
+            f"{result['pages']:<16} {result['chunks']:>7} {result['seconds']:>8.2f} "
+            f"{result['pages_per_second']:>9.1f} {result['chunks_per_second']:>9.1f}"
+        )
+
+    print(f"\n{'/query conc':<12} {'req':>5} {'err':>4} {'rps':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for result in report["query"]:
+        latency = result["latency_ms"]
+        print(
+            f"{result['concurrency']:<12} {result['requests']:>5} {result['errors']:>4} {result['throughput_rps']:>7.1f} "
+            f"{latency.get('p50', 0):>8.1f} {latency.get('p90', 0):>8.1f} {latency.get('p99', 0):>8.1f}"
+        )
+
+    print(f"\n{'stream conc':<12} {'req':>5} {'err':>4} {'rps':>7} {'ttft p50':>9} {'ttft p99':>9} {'p99 ms':>8}")
+    for result in report["stream"]:
+        first_token = result["first_token_ms"]
+        print(
+            f"{result['concurrency']:<12} {result['requests']:>5} {result['errors']:>4} {result['throughput_rps']:>7.1f} "
+            f"{first_token.get('p50', 0):>9.1f} {first_token.get('p99', 0):>9.1f} "
+            f"{result['latency_ms'].get('p99', 0):>8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for the RAG pipeline")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests-per-worker", type=int, default=4)
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 25, 100], help="Generated PDF sizes to ingest")
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="Seconds per embeddings request")
+    parser.add_argument("--embed-per-item", type=float, default=0.0002, help="Seconds per embedded text")
+    parser.add_argument("--first-token-latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.005)
+    parser.add_argument("--quick", action="store_true", help="Small sizes and no simulated latency, for smoke runs")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON instead of tables")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression, e.g. 0.2 for 20%%")
+    args = parser.parse_args()
+
+    options = dict(
+        concurrency_levels=args.concurrency,
+        requests_per_worker=args.requests_per_worker,
+        page_counts=args.pages,
+        words_per_page=args.words_per_page,
+        embed_latency=args.embed_latency,
+        embed_per_item_latency=args.embed_per_item,
+        first_token_latency=args.first_token_latency,
+        token_latency=args.token_latency,
+    )
+    if args.quick:
+        options.update(
+            concurrency_levels=[1, 4], requests_per_worker=2, page_counts=[2, 10], corpus_pages=5,
+            embed_latency=0.0, embed_per_item_latency=0.0, first_token_latency=0.0, token_latency=0.0
+        )
+
+    report = run_suite(**options)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_summary(report)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare_reports(json.load(f), report, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
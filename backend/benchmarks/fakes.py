@@ -0,0 +1,224 @@
+"""
+Offline stand-ins for OpenAI and Pinecone, shared by the benchmarks.
+
+HashEmbeddings and FakeChatModel replace the OpenAI clients with
+deterministic output and configurable latency, and SlowVectorStore stands in
+for Pinecone with the local in-process index plus a fixed search latency;
+build_components wires them together, so the real RAG code paths run
+without credentials or network access.
+"""
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from local_vector_store import LocalVectorStore
+
+# Vocabulary for generated documents and queries; a small overlap of terms keeps
+# both the vector and the keyword retrievers busy
+WORDS = (
+    "timal built jarvis with python fastapi react typescript aws lambda azure docker kubernetes "
+    "pinecone openai langchain retrieval embeddings vector search project team lead mentor "
+    "certification university rmit melbourne engineer platform pipeline api frontend backend "
+    "cloud architecture testing deployment monitoring security performance latency throughput"
+).split()
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Deterministic embeddings derived from token hashes, with optional latency
+
+    Texts sharing words get similar vectors, so retrieval returns meaningful
+    neighbours. latency is charged per request and per_item_latency per text,
+    like a remote embeddings API.
+    """
+
+    def __init__(self, dimension: int = 256, latency: float = 0.0, per_item_latency: float = 0.0):
+        self.dimension = dimension
+        self.latency = latency
+        self.per_item_latency = per_item_latency
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in text.lower().split():
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimension
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency + self.per_item_latency * len(texts))
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency + self.per_item_latency * len(texts))
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+
+class FakeChatModel:
+    """
+    Chat model stand-in with a fixed time to first token and per-token delay
+
+    Responses report token_usage like the OpenAI client, so token accounting
+    and metrics are exercised too.
+    """
+
+    def __init__(self, first_token_latency: float = 0.0, token_latency: float = 0.0, answer_tokens: int = 40):
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.answer_tokens = answer_tokens
+
+    def _answer_tokens(self) -> List[str]:
+        return [f"{WORDS[i % len(WORDS)]} " for i in range(self.answer_tokens)]
+
+    def _response(self, messages) -> AIMessage:
+        prompt_tokens = self.get_num_tokens_from_messages(messages)
+        return AIMessage(
+            content="".join(self._answer_tokens()).strip(),
+            response_metadata={"token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": self.answer_tokens,
+                "total_tokens": prompt_tokens + self.answer_tokens
+            }}
+        )
+
+    def _total_latency(self) -> float:
+        return self.first_token_latency + self.token_latency * self.answer_tokens
+
+    def invoke(self, messages):
+        time.sleep(self._total_latency())
+        return self._response(messages)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self._total_latency())
+        return self._response(messages)
+
+    async def astream(self, messages):
+        await asyncio.sleep(self.first_token_latency)
+        for i, token in enumerate(self._answer_tokens()):
+            if i:
+                await asyncio.sleep(self.token_latency)
+            yield AIMessageChunk(content=token)
+
+    def get_num_tokens(self, text: str) -> int:
+        return len(text) // 4 + 1
+
+    def get_num_tokens_from_messages(self, messages) -> int:
+        return sum(
+            self.get_num_tokens(message["content"] if isinstance(message, dict) else message.content)
+            for message in messages
+        )
+
+
+class SlowVectorStore(LocalVectorStore):
+    """Local vector index whose searches block the calling thread, like a remote Pinecone query"""
+
+    def __init__(self, embedding: Embeddings, latency: float = 0.0):
+        super().__init__(embedding)
+        self.latency = latency
+
+    def search_with_vectors(self, embedding, k=4, filter=None):
+        time.sleep(self.latency)
+        return super().search_with_vectors(embedding, k=k, filter=filter)
+
+
+def generate_text(words: int, seed: int = 0) -> str:
+    """Return reproducible filler text drawn from WORDS"""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def generate_pdf(pages: int, words_per_page: int = 400, seed: int = 0) -> bytes:
+    """
+    Build a PDF with pages of generated Helvetica text, without a PDF library
+
+    Args:
+        pages: Number of pages
+        words_per_page: Words of text per page, wrapped at 12 words per line
+        seed: Seed for the generated text
+
+    Returns:
+        PDF file content
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for page in range(pages):
+        words = generate_text(words_per_page, seed=seed * 100003 + page).split()
+        lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+        content = "BT /F1 10 Tf 12 TL 72 760 Td " + " T* ".join(f"({line}) Tj" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {pages} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return out
+
+
+def build_components(
+    embeddings: Embeddings = None, chat_model: FakeChatModel = None, search_latency: float = 0.0
+) -> dict:
+    """
+    Build the same components as services.get_components, backed by the fakes
+
+    Nothing is persisted: the local index, manifest and keyword index live in memory.
+    search_latency is added to every vector search.
+
+    Returns:
+        Dictionary with the document processor, vector store manager, LLM manager,
+        ingestion queue and session store
+    """
+    from document_processor import DocumentProcessor
+    from ingestion import IngestionQueue
+    from keyword_index import KeywordIndex
+    from llm import LLMManager
+    from manifest import IngestionManifest
+    from sessions import InMemorySessionStore
+    from vector_store import VectorStoreManager
+
+    embeddings = embeddings or HashEmbeddings()
+    vector_store_manager = VectorStoreManager(
+        embeddings=embeddings,
+        vector_store=SlowVectorStore(embeddings, latency=search_latency),
+        manifest=IngestionManifest(),
+        keyword_index=KeywordIndex()
+    )
+    document_processor = DocumentProcessor()
+    return {
+        "document_processor": document_processor,
+        "vector_store_manager": vector_store_manager,
+        "llm_manager": LLMManager(vector_store_manager=vector_store_manager, llm=chat_model or FakeChatModel()),
+        "ingestion_queue": IngestionQueue(document_processor, vector_store_manager),
+        "session_store": InMemorySessionStore()
+    }
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """Bounded LRU cache of query embeddings with TTL expiry and optional persistence"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 86400, path: Optional[str] = None, clock=time.time):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        # key -> (stored_at, vector), least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.path:
+            self.load()
+
+    @staticmethod
+    def make_key(text: str, model: str, dimension: int) -> str:
+        """
+        Build a cache key from the normalized query text and embedding settings
+
+        Args:
+            text: Query text
+            model: Embedding model name
+            dimension: Embedding dimension
+
+        Returns:
+            Hex digest identifying the embedding
+        """
+        normalized = " ".join(text.lower().split())
+        return hashlib.sha256(f"{model}:{dimension}:{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return the cached vector for a key, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_expired(entry[0]):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, vector: List[float]):
+        """Store a vector, evicting the least recently used entries over max_size"""
+        with self._lock:
+            self._entries[key] = (self.clock(), list(vector))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+    def load(self):
+        """Load unexpired entries from the persistence file, if it exists"""
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+
+            with self._lock:
+                for key, stored_at, vector in data.get("entries", []):
+                    if not self._is_expired(stored_at):
+                        self._entries[key] = (stored_at, vector)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+            print(f"Loaded {len(self._entries)} cached query embeddings from {self.path}")
+        except Exception as e:
+            print(f"Error loading embedding cache: {e}")
+
+    def save(self):
+        """Write unexpired entries to the persistence file"""
+        if not self.path:
+            return
+
+        try:
+            with self._lock:
+                entries = [
+                    [key, stored_at, vector]
+                    for key, (stored_at, vector) in self._entries.items()
+                    if not self._is_expired(stored_at)
+                ]
+
+            # Write atomically so a crash never leaves a truncated cache file
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({"entries": entries}, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error saving embedding cache: {e}")
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and self.clock() - stored_at > self.ttl_seconds
+
+
+class SemanticResponseCache:
+    """Size-bounded cache of RAG answers, matched by cosine similarity of query embeddings"""
+
+    def __init__(self, max_size: int = 256, threshold: float = 0.95):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+
+        # Entries are only valid for the corpus they were generated from
+        self.index_version = 0
+
+        # entry id -> (unit query vector, system prompt hash, response), least recently used first
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_prompt(system_prompt: str) -> str:
+        """Hash a system prompt so answers are only reused under the same instructions"""
+        return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+
+    def lookup(self, query_embedding: List[float], prompt_hash: str, index_version: int) -> Optional[dict]:
+        """
+        Find a cached response for a semantically equivalent query
+
+        Args:
+            query_embedding: Embedding of the incoming query
+            prompt_hash: Hash of the system prompt in use
+            index_version: Current version of the vector index
+
+        Returns:
+            The cached response dictionary, or None on a miss
+        """
+        with self._lock:
+            self._sync_index_version(index_version)
+
+            candidates = [
+                (entry_id, vector)
+                for entry_id, (vector, entry_prompt_hash, _response) in self._entries.items()
+                if entry_prompt_hash == prompt_hash
+            ]
+            if not candidates:
+                self.misses += 1
+                return None
+
+            query = self._normalize(query_embedding)
+            similarities = np.stack([vector for _entry_id, vector in candidates]) @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            entry_id = candidates[best][0]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return dict(self._entries[entry_id][2])
+
+    def store(self, query_embedding: List[float], prompt_hash: str, index_version: int, response: dict):
+        """Cache a response, evicting the least recently used entries over max_size"""
+        with self._lock:
+            self._sync_index_version(index_version)
+            if index_version != self.index_version:
+                # Generated against a corpus that has since changed
+                return
+
+            self._entries[self._next_id] = (self._normalize(query_embedding), prompt_hash, dict(response))
+            self._next_id += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+    def _sync_index_version(self, index_version: int):
+        # A newer index version means /upload or /clear changed the corpus
+        if index_version > self.index_version:
+            self._entries.clear()
+            self.index_version = index_version
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
@@ -9,19 +9,163 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # Pinecone Configuration
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_ENVIRONMENT = os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
+# Cloud and region of the serverless index created when PINECONE_INDEX_NAME doesn't exist
+PINECONE_CLOUD = os.getenv("PINECONE_CLOUD", "aws")
+PINECONE_ENVIRONMENT = os.getenv("PINECONE_ENVIRONMENT", os.getenv("PINECONE_REGION", "us-east-1"))
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "supportmate-index")
 PINECONE_HOST = os.getenv("PINECONE_HOST", "https://supportmate-index-muxot6x.svc.aped-4627-b74a.pinecone.io")
 
+# Vector Store Configuration
+# "pinecone" or "local" (in-process NumPy index persisted under LOCAL_INDEX_PATH)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone").lower()
+LOCAL_INDEX_PATH = os.getenv(
+    "LOCAL_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_index")
+)
+# Pinecone namespace holding this deployment's corpus ("" is the default namespace);
+# the local index keeps each namespace in its own directory. Reindexing a source
+# rebuilds the corpus in "<namespace>-blue" or "<namespace>-green" and swaps over
+VECTOR_STORE_NAMESPACE = os.getenv("VECTOR_STORE_NAMESPACE", "")
+
 # Vector Embedding Configuration
-EMBEDDING_MODEL = "text-embedding-3-small"
-EMBEDDING_DIMENSION = 1024
+# "openai" or "local" (in-process model, no network hop)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# Must match the vector index; bge-small-en-v1.5, the default local model, outputs 384
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "384" if EMBEDDING_PROVIDER == "local" else "1024"))
+
+# Local Embedding Configuration
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")
+# "onnx" (fastembed), "torch" (sentence-transformers) or "auto" (onnx if installed)
+LOCAL_EMBEDDING_RUNTIME = os.getenv("LOCAL_EMBEDDING_RUNTIME", "auto").lower()
+# int8 dynamic quantization of the torch model's linear layers
+LOCAL_EMBEDDING_QUANTIZED = os.getenv("LOCAL_EMBEDDING_QUANTIZED", "false").lower() == "true"
+LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", str(os.cpu_count() or 1)))  # inference threads
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "64"))  # texts per forward pass
+# How long the first request of a batch waits for concurrent requests to join it
+LOCAL_EMBEDDING_MAX_WAIT_MS = float(os.getenv("LOCAL_EMBEDDING_MAX_WAIT_MS", "5"))
+LOCAL_EMBEDDING_WARM_UP = os.getenv("LOCAL_EMBEDDING_WARM_UP", "true").lower() == "true"
 
 # LLM Configuration
-LLM_MODEL = "gpt-4o"
-LLM_TEMPERATURE = 0.7
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
 
 # API Configuration
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-CHUNK_SIZE = 1000
-CHUNK_OVERLAP = 200 
\ No newline at end of file
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+# Comma-separated origins allowed to call the API from a browser
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()]
+
+# Startup Configuration
+# Build the RAG components in the background as soon as the server starts
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true"
+
+# Concurrency Configuration
+# Worker threads used to offload blocking Pinecone calls from the event loop
+RETRIEVAL_MAX_WORKERS = int(os.getenv("RETRIEVAL_MAX_WORKERS", "8"))
+
+# Ingestion Configuration
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))  # uploads processed concurrently
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))  # processes parsing PDFs in batch ingestion
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))  # chunks per embeddings request
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))  # vectors per upsert request
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "2"))  # embedding batches in flight
+UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "2"))  # upsert batches in flight
+INGESTION_MAX_RETRIES = int(os.getenv("INGESTION_MAX_RETRIES", "3"))
+INGESTION_RETRY_BACKOFF = float(os.getenv("INGESTION_RETRY_BACKOFF", "0.5"))  # seconds, doubled per retry
+# Off runs each upload inside its request, for serverless deployments
+INGESTION_IN_BACKGROUND = os.getenv("INGESTION_IN_BACKGROUND", "true").lower() == "true"
+INGESTION_JOB_HISTORY = int(os.getenv("INGESTION_JOB_HISTORY", "100"))  # finished jobs kept for polling
+# Re-uploading a document replaces its previous version: unchanged chunks are
+# skipped and chunks that disappeared are deleted
+INCREMENTAL_INGESTION = os.getenv("INCREMENTAL_INGESTION", "true").lower() == "true"
+INGESTION_MANIFEST_PATH = os.getenv(
+    "INGESTION_MANIFEST_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingestion_manifest.json")
+)
+
+# Query Embedding Cache Configuration
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+EMBEDDING_CACHE_TTL = int(os.getenv("EMBEDDING_CACHE_TTL", "86400"))  # seconds
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")  # unset keeps the cache in memory only
+
+# Query Embedding Batching Configuration
+# Concurrent query embeddings arriving within the window share one embeddings
+# request; 0 sends each query on its own
+QUERY_EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("QUERY_EMBEDDING_BATCH_WINDOW_MS", "5"))
+QUERY_EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("QUERY_EMBEDDING_MAX_BATCH_SIZE", "64"))
+QUERY_EMBEDDING_MAX_CONCURRENT = int(os.getenv("QUERY_EMBEDDING_MAX_CONCURRENT", "4"))  # batched requests in flight
+
+# Semantic Response Cache Configuration
+# Answers are reused for new queries without conversation history whose
+# embedding is at least RESPONSE_CACHE_THRESHOLD cosine-similar to a cached one
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.95"))
+
+# Conversation History Configuration
+# The most recent turns that fit in HISTORY_MAX_TOKENS are sent to the model;
+# older turns are dropped, or folded into a rolling summary when enabled
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", "2000"))
+HISTORY_SUMMARY_ENABLED = os.getenv("HISTORY_SUMMARY_ENABLED", "false").lower() == "true"
+HISTORY_SUMMARY_MAX_WORDS = int(os.getenv("HISTORY_SUMMARY_MAX_WORDS", "150"))
+HISTORY_SUMMARY_CACHE_SIZE = int(os.getenv("HISTORY_SUMMARY_CACHE_SIZE", "256"))
+
+# Conversation Session Configuration
+# Queries with a session_id use and extend history stored server-side
+# "memory" (per process), "sqlite" (SESSION_DB_PATH) or "redis" (SESSION_REDIS_URL, needs the redis package)
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory").lower()
+SESSION_TTL = int(os.getenv("SESSION_TTL", "86400"))  # seconds since the last message; 0 keeps sessions forever
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))  # in-memory store only
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", "100"))  # stored per session; the prompt is further trimmed to HISTORY_MAX_TOKENS
+SESSION_DB_PATH = os.getenv(
+    "SESSION_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.db")
+)
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+
+# Context Packing Configuration
+# Retrieved chunks are merged with their overlapping neighbours, near-duplicates
+# are dropped, and chunks are added in relevance order up to CONTEXT_MAX_TOKENS
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.9"))  # word-set Jaccard similarity
+
+# Hybrid Retrieval Configuration
+# "hybrid" fuses BM25 keyword matches with vector search by reciprocal rank fusion;
+# "vector" uses vector search only
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+KEYWORD_INDEX_PATH = os.getenv(
+    "KEYWORD_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "keyword_index.json")
+)
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))  # results fetched from each retriever before fusion
+RRF_K = int(os.getenv("RRF_K", "60"))  # reciprocal rank fusion constant
+
+# Retrieval Parameter Configuration
+# Defaults for the per-request "retrieval" options on /query
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "4"))  # chunks retrieved per query
+# Minimum cosine similarity for vector matches; unset keeps every match
+RETRIEVAL_SCORE_THRESHOLD = float(os.getenv("RETRIEVAL_SCORE_THRESHOLD")) if os.getenv("RETRIEVAL_SCORE_THRESHOLD") else None
+RETRIEVAL_MMR = os.getenv("RETRIEVAL_MMR", "false").lower() == "true"  # diversify results by maximal marginal relevance
+MMR_FETCH_K = int(os.getenv("MMR_FETCH_K", "20"))  # candidates MMR selects from
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.5"))  # 1 favours relevance, 0 favours diversity
+
+# Circuit Breaker Configuration
+# A dependency that fails BREAKER_FAILURE_THRESHOLD times in a row is skipped for
+# BREAKER_RESET_TIMEOUT seconds; retrieval failures answer without context
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))  # seconds
+EMBEDDINGS_TIMEOUT = float(os.getenv("EMBEDDINGS_TIMEOUT", "5"))  # seconds per query embedding
+RETRIEVAL_TIMEOUT = float(os.getenv("RETRIEVAL_TIMEOUT", "3"))  # seconds per vector store query
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))  # seconds per completion, or to the first streamed token
+
+# Tracing Configuration
+# "console" prints one JSON span per line, "file" appends them to TRACE_FILE_PATH,
+# "otel" hands spans to an OpenTelemetry SDK configured by the deployment
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACE_FILE_PATH = os.getenv(
+    "TRACE_FILE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces.jsonl")
+)
+REQUEST_ID_HEADER = os.getenv("REQUEST_ID_HEADER", "X-Request-ID")
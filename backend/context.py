@@ -0,0 +1,149 @@
+import re
+from typing import Callable, List, Optional
+
+from langchain_core.documents import Document
+
+import config
+
+# Shortest suffix/prefix match treated as a splitter overlap when chunks carry no start_index
+MIN_TEXT_OVERLAP = 20
+
+
+class ContextPacker:
+    """
+    Class to pack retrieved chunks into a token-budgeted prompt context
+
+    Chunks from the same source and page that overlap or touch are merged, so
+    the CHUNK_OVERLAP text shared by neighbouring chunks is sent once.
+    Near-duplicate chunks are dropped, and the remaining chunks are added in
+    relevance order while they fit in max_tokens.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        max_tokens: int = None,
+        duplicate_threshold: float = None,
+    ):
+        self.count_tokens = count_tokens
+        self.max_tokens = config.CONTEXT_MAX_TOKENS if max_tokens is None else max_tokens
+        self.duplicate_threshold = (
+            config.CONTEXT_DUPLICATE_THRESHOLD if duplicate_threshold is None else duplicate_threshold
+        )
+
+    def pack(self, docs: List[Document]) -> List[Document]:
+        """
+        Merge, deduplicate and budget retrieved chunks
+
+        Args:
+            docs: Retrieved documents, most relevant first
+
+        Returns:
+            Documents to place in the context, most relevant first
+        """
+        packed = []
+        used = 0
+        for doc in self._deduplicate(self._merge_neighbours(docs)):
+            tokens = self.count_tokens(doc.page_content)
+            if used + tokens <= self.max_tokens:
+                packed.append(doc)
+                used += tokens
+            elif not packed:
+                # Never send an empty context: cut the best chunk down to the budget
+                keep = max(1, len(doc.page_content) * self.max_tokens // max(tokens, 1))
+                packed.append(Document(page_content=doc.page_content[:keep], metadata=doc.metadata))
+                used = self.max_tokens
+
+        return packed
+
+    def _merge_neighbours(self, docs: List[Document]) -> List[Document]:
+        """Merge overlapping chunks of the same page; a merged chunk ranks as its best member"""
+        groups = []  # (rank, document)
+        for rank, doc in enumerate(docs):
+            group_rank, current = rank, doc
+
+            # A chunk can bridge two earlier ones, so keep merging until nothing overlaps
+            index = 0
+            while index < len(groups):
+                combined = self._merge_pair(groups[index][1], current)
+                if combined is None:
+                    index += 1
+                    continue
+                group_rank = min(group_rank, groups[index][0])
+                current = combined
+                del groups[index]
+                index = 0
+
+            groups.append((group_rank, current))
+
+        return [doc for _rank, doc in sorted(groups, key=lambda group: group[0])]
+
+    def _merge_pair(self, first: Document, second: Document) -> Optional[Document]:
+        """Return the two chunks merged into one, or None if they are not neighbours"""
+        first_metadata = first.metadata or {}
+        second_metadata = second.metadata or {}
+        if (first_metadata.get("source"), self._as_int(first_metadata.get("page"))) != \
+                (second_metadata.get("source"), self._as_int(second_metadata.get("page"))):
+            return None
+
+        # Pinecone returns numeric metadata as floats, which can't be slice indices
+        first_start = self._as_int(first_metadata.get("start_index"))
+        second_start = self._as_int(second_metadata.get("start_index"))
+        if first_start is not None and second_start is not None:
+            # Exact offsets from the splitter: merge when the ranges overlap or touch
+            if second_start < first_start:
+                first, second = second, first
+                first_start, second_start = second_start, first_start
+            first_end = first_start + len(first.page_content)
+            if second_start > first_end:
+                return None
+            text = first.page_content + second.page_content[first_end - second_start:]
+            return self._merged_document(first, text, first_start)
+
+        # Older chunks have no offsets: detect the splitter overlap from the text itself
+        for head, tail in ((first, second), (second, first)):
+            if tail.page_content in head.page_content:
+                return self._merged_document(first, head.page_content, None)
+            overlap = self._text_overlap(head.page_content, tail.page_content)
+            if overlap:
+                return self._merged_document(first, head.page_content + tail.page_content[overlap:], None)
+
+        return None
+
+    @staticmethod
+    def _as_int(value):
+        return int(value) if isinstance(value, float) and value.is_integer() else value
+
+    @staticmethod
+    def _text_overlap(head: str, tail: str) -> int:
+        """Length of the longest suffix of head that is a prefix of tail"""
+        longest = min(len(head), len(tail), config.CHUNK_OVERLAP)
+        for length in range(longest, MIN_TEXT_OVERLAP - 1, -1):
+            if head.endswith(tail[:length]):
+                return length
+        return 0
+
+    @staticmethod
+    def _merged_document(first: Document, text: str, start_index) -> Document:
+        metadata = dict(first.metadata or {})
+        if start_index is not None:
+            metadata["start_index"] = start_index
+        return Document(page_content=text, metadata=metadata)
+
+    def _deduplicate(self, docs: List[Document]) -> List[Document]:
+        """Drop chunks whose words mostly repeat a more relevant chunk"""
+        kept = []
+        kept_words = []
+        for doc in docs:
+            words = set(re.findall(r"\w+", doc.page_content.lower()))
+            if any(self._jaccard(words, other) >= self.duplicate_threshold for other in kept_words):
+                continue
+            kept.append(doc)
+            kept_words.append(words)
+        return kept
+
+    @staticmethod
+    def _jaccard(first: set, second: set) -> float:
+        if not first and not second:
+            return 1.0
+        return len(first & second) / len(first | second)
@@ -1,12 +1,15 @@
-import os
-from typing import List
-import tempfile
+import io
+import time
+from typing import BinaryIO, Iterator, List, Union
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
+from pypdf import PdfReader
 
 import config
+import metrics
+import tracing
 
 
 class DocumentProcessor:
@@ -16,7 +19,9 @@ class DocumentProcessor:
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=config.CHUNK_SIZE,
             chunk_overlap=config.CHUNK_OVERLAP,
-            separators=["\n\n", "\n", " ", ""]
+            separators=["\n\n", "\n", " ", ""],
+            # Chunk offsets let overlapping neighbours be merged when building the prompt context
+            add_start_index=True
         )
     
     def process_pdf(self, file_path: str) -> List[Document]:
@@ -55,24 +60,130 @@ class DocumentProcessor:
             List of Document objects with text chunks
         """
         try:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(file_content)
-                temp_path = temp_file.name
+            pages = self.load_pdf_from_upload(file_content, filename)
+            return self.split_documents(pages)
+        except Exception as e:
+            print(f"Error processing uploaded PDF: {e}")
+            raise
+    
+    def load_pdf_from_upload(self, file_content: bytes, filename: str) -> List[Document]:
+        """
+        Load the pages of an uploaded PDF file without splitting them
+        
+        Args:
+            file_content: Binary content of the PDF file
+            filename: Name of the uploaded file
             
-            # Process the PDF
-            chunks = self.process_pdf(temp_path)
+        Returns:
+            List of Document objects, one per page
+        """
+        return list(self.iter_pdf_pages(file_content, filename))
+    
+    def iter_pdf_pages(self, file: Union[bytes, BinaryIO], filename: str, progress_callback=None) -> Iterator[Document]:
+        """
+        Parse a PDF in memory, yielding one Document per page as it is extracted
+        
+        Args:
+            file: Binary content of the PDF file, or a seekable binary file object
+            filename: Name recorded as the source of each page
+            progress_callback: Optional callable receiving ("parsed", 1) per page
             
-            # Delete the temporary file
-            os.unlink(temp_path)
+        Yields:
+            Document objects, one per page
+        """
+        stream = io.BytesIO(file) if isinstance(file, (bytes, bytearray)) else file
+        reader = PdfReader(stream)
+        
+        for page_number, page in enumerate(reader.pages):
+            with metrics.INGESTION_STAGE_SECONDS.time(stage="parse"), \
+                    tracing.span("document_processor.parse_page", source=filename, page=page_number):
+                document = Document(
+                    page_content=page.extract_text(),
+                    metadata={"source": filename, "page": page_number}
+                )
+            if progress_callback:
+                progress_callback("parsed", 1)
+            yield document
+    
+    def iter_pdf_chunks(self, file: Union[bytes, BinaryIO], filename: str, progress_callback=None) -> Iterator[Document]:
+        """
+        Parse and split a PDF page by page, yielding chunks as soon as each page is split
+        
+        Only one page is held at a time, so downstream embedding can start
+        before parsing finishes and peak memory does not grow with page count.
+        
+        Args:
+            file: Binary content of the PDF file, or a seekable binary file object
+            filename: Name recorded as the source of each chunk
+            progress_callback: Optional callable receiving ("parsed", 1) per page
+                and ("split", count) per page's chunks
             
-            # Add metadata about the source file
-            for chunk in chunks:
-                if not chunk.metadata:
-                    chunk.metadata = {}
-                chunk.metadata["source"] = filename
+        Yields:
+            Document objects with text chunks
+        """
+        for page in self.iter_pdf_pages(file, filename, progress_callback):
+            with metrics.INGESTION_STAGE_SECONDS.time(stage="split"), \
+                    tracing.span("document_processor.split", source=filename, page=page.metadata["page"]) as span:
+                chunks = self.text_splitter.split_documents([page])
+                span.set_attribute("chunks", len(chunks))
+            metrics.INGESTION_CHUNKS.inc(len(chunks), stage="split")
+            if progress_callback:
+                progress_callback("split", len(chunks))
+            yield from chunks
+    
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Split loaded pages into chunks
+        
+        Args:
+            documents: List of Document objects to split
             
-            return chunks
-        except Exception as e:
-            print(f"Error processing uploaded PDF: {e}")
-            raise 
\ No newline at end of file
+        Returns:
+            List of Document objects with text chunks
+        """
+        with metrics.INGESTION_STAGE_SECONDS.time(stage="split"), \
+                tracing.span("document_processor.split", pages=len(documents)) as span:
+            chunks = self.text_splitter.split_documents(documents)
+            span.set_attribute("chunks", len(chunks))
+        metrics.INGESTION_CHUNKS.inc(len(chunks), stage="split")
+        print(f"Processed PDF with {len(chunks)} chunks")
+        return chunks
+
+
+# Per-process instance for parse_pdf_in_worker, so each pool worker builds its splitter once
+_worker_processor = None
+
+
+def parse_pdf_in_worker(file: Union[bytes, str], filename: str) -> dict:
+    """
+    Parse and split one PDF; entry point for process pool workers
+    
+    Args:
+        file: Binary content of the PDF file, or a path to it
+        filename: Name recorded as the source of each chunk
+        
+    Returns:
+        Dictionary with the chunks, page count and parse time in seconds
+    """
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = DocumentProcessor()
+    
+    start = time.perf_counter()
+    pages = []
+    
+    def count_pages(stage: str, count: int):
+        if stage == "parsed":
+            pages.append(count)
+    
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            chunks = list(_worker_processor.iter_pdf_chunks(f, filename, progress_callback=count_pages))
+    else:
+        chunks = list(_worker_processor.iter_pdf_chunks(file, filename, progress_callback=count_pages))
+    
+    return {
+        "chunks": chunks,
+        "pages": len(pages),
+        "parse_seconds": time.perf_counter() - start
+    }
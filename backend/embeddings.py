@@ -1,13 +1,18 @@
 from langchain_openai import OpenAIEmbeddings
-from langchain_community.embeddings import HuggingFaceEmbeddings
 import config
+from local_embeddings import LocalEmbeddings
 
 def get_embeddings_model():
     """
     Returns the embeddings model based on config settings.
-    
-    Currently using llama-text-embed-v2 via OpenAI.
+
+    EMBEDDING_PROVIDER selects OpenAI's text-embedding-3-small or the
+    in-process local model; the local model is also the fallback if the
+    OpenAI client cannot be created.
     """
+    if config.EMBEDDING_PROVIDER == "local":
+        return get_local_embeddings_model()
+
     try:
         # Initialize OpenAI embedding model
         embeddings = OpenAIEmbeddings(
@@ -18,9 +23,26 @@ def get_embeddings_model():
         return embeddings
     except Exception as e:
         print(f"Error initializing OpenAI embeddings: {e}")
-        
+
         # Fallback to local embedding model if OpenAI fails
-        return HuggingFaceEmbeddings(
-            model_name="BAAI/bge-small-en-v1.5",
-            model_kwargs={"device": "cpu"}
-        ) 
\ No newline at end of file
+        return get_local_embeddings_model()
+
+def get_local_embeddings_model() -> LocalEmbeddings:
+    """
+    Returns the local embeddings model, warmed up if LOCAL_EMBEDDING_WARM_UP is set
+    """
+    embeddings = LocalEmbeddings()
+    if config.LOCAL_EMBEDDING_WARM_UP:
+        embeddings.warm_up()
+    return embeddings
+
+def embedding_model_name(embeddings) -> str:
+    """
+    Returns the name of the model behind an embeddings instance, for cache keys
+
+    Taken from the instance rather than config, since get_embeddings_model
+    may have fallen back to the local model.
+    """
+    if isinstance(embeddings, LocalEmbeddings):
+        return embeddings.model_name
+    return getattr(embeddings, "model", None) or getattr(embeddings, "model_name", None) or type(embeddings).__name__
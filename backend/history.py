@@ -0,0 +1,159 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import config
+
+# Tokens OpenAI chat formatting adds around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+class ConversationHistoryManager:
+    """
+    Class to fit conversation history into a token budget
+
+    The most recent messages are kept while they fit in max_tokens. Older
+    messages are dropped or, when a summarizer is given, replaced by a rolling
+    summary. Summaries are cached by the exact messages they cover, so a
+    growing conversation only summarizes the turns that newly fell out of the
+    window, on top of the summary of the turns before them.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        max_tokens: int = None,
+        summarize_fn: Optional[Callable[[Optional[str], List[dict]], str]] = None,
+        asummarize_fn: Optional[Callable[[Optional[str], List[dict]], Awaitable[str]]] = None,
+        summary_cache_size: int = None,
+    ):
+        # History is resent every turn, so each message is only tokenized once
+        self._count_text = lru_cache(maxsize=4096)(count_tokens)
+        self.max_tokens = config.HISTORY_MAX_TOKENS if max_tokens is None else max_tokens
+        self.summarize_fn = summarize_fn
+        self.asummarize_fn = asummarize_fn
+        self.summary_cache_size = summary_cache_size or config.HISTORY_SUMMARY_CACHE_SIZE
+
+        # chained hash of the summarized messages -> summary, least recently used first
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count_message_tokens(self, message: dict) -> int:
+        """Return the prompt tokens a single chat message costs"""
+        return self._count_text(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+    def compact(self, history: List[dict]) -> Tuple[List[dict], int]:
+        """
+        Fit conversation history into the token budget
+
+        Args:
+            history: List of {"role", "content"} messages, oldest first
+
+        Returns:
+            Tuple of the messages to send and the number of tokens trimmed
+        """
+        older, recent, dropped_tokens = self._split(history)
+        if not older:
+            return recent, 0
+
+        summary = None
+        if self.summarize_fn:
+            prefix_length, previous_summary = self._cached_prefix(older)
+            summary = previous_summary
+            if prefix_length < len(older):
+                try:
+                    summary = self.summarize_fn(previous_summary, older[prefix_length:])
+                    self._store_summary(older, summary)
+                except Exception as e:
+                    print(f"Error summarizing conversation history: {e}")
+
+        return self._with_summary(recent, summary, dropped_tokens)
+
+    async def acompact(self, history: List[dict]) -> Tuple[List[dict], int]:
+        """
+        Async variant of compact; summaries are generated with asummarize_fn
+
+        Args:
+            history: List of {"role", "content"} messages, oldest first
+
+        Returns:
+            Tuple of the messages to send and the number of tokens trimmed
+        """
+        older, recent, dropped_tokens = self._split(history)
+        if not older:
+            return recent, 0
+
+        summary = None
+        if self.asummarize_fn:
+            prefix_length, previous_summary = self._cached_prefix(older)
+            summary = previous_summary
+            if prefix_length < len(older):
+                try:
+                    summary = await self.asummarize_fn(previous_summary, older[prefix_length:])
+                    self._store_summary(older, summary)
+                except Exception as e:
+                    print(f"Error summarizing conversation history: {e}")
+
+        return self._with_summary(recent, summary, dropped_tokens)
+
+    def _split(self, history: List[dict]) -> Tuple[List[dict], List[dict], int]:
+        """Split history into the older messages to drop and the recent ones that fit"""
+        history = list(history or [])
+        used = 0
+        start = len(history)
+        while start > 0:
+            tokens = self.count_message_tokens(history[start - 1])
+            if used + tokens > self.max_tokens:
+                break
+            used += tokens
+            start -= 1
+
+        # Don't open the window on an assistant reply whose question was dropped
+        while start < len(history) and start > 0 and history[start].get("role") == "assistant":
+            start += 1
+
+        older, recent = history[:start], history[start:]
+        return older, recent, sum(self.count_message_tokens(message) for message in older)
+
+    def _with_summary(self, recent: List[dict], summary: Optional[str], dropped_tokens: int) -> Tuple[List[dict], int]:
+        if not summary:
+            return recent, dropped_tokens
+
+        summary_message = {"role": "system", "content": f"{SUMMARY_PREFIX}{summary}"}
+        trimmed = max(0, dropped_tokens - self.count_message_tokens(summary_message))
+        return [summary_message] + recent, trimmed
+
+    @staticmethod
+    def _prefix_keys(messages: List[dict]) -> List[str]:
+        """Chained hashes identifying each prefix of a message list"""
+        keys = []
+        digest = ""
+        for message in messages:
+            payload = json.dumps([digest, message.get("role"), message.get("content")])
+            digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+            keys.append(digest)
+        return keys
+
+    def _cached_prefix(self, older: List[dict]) -> Tuple[int, Optional[str]]:
+        """Return the longest prefix of older with a cached summary, and that summary"""
+        keys = self._prefix_keys(older)
+        with self._lock:
+            for length in range(len(keys), 0, -1):
+                summary = self._summaries.get(keys[length - 1])
+                if summary is not None:
+                    self._summaries.move_to_end(keys[length - 1])
+                    return length, summary
+        return 0, None
+
+    def _store_summary(self, older: List[dict], summary: str):
+        key = self._prefix_keys(older)[-1]
+        with self._lock:
+            self._summaries[key] = summary
+            self._summaries.move_to_end(key)
+            while len(self._summaries) > self.summary_cache_size:
+                self._summaries.popitem(last=False)
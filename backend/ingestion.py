@@ -0,0 +1,198 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import config
+import tracing
+from batch_ingestion import BatchIngestor
+
+
+class IngestionJob:
+    """Progress record for one uploaded document"""
+
+    def __init__(self, filename: str):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = "queued"
+        self.pages_parsed = 0
+        self.chunks_total = 0
+        self.chunks_embedded = 0
+        self.vectors_upserted = 0
+        self.chunks_skipped = 0
+        self.vectors_deleted = 0
+        self.files = None  # per-file reports for batch jobs
+        self.chunks_per_second = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def record_progress(self, stage: str, count: int):
+        """Progress callback for parsing and ingestion; called from pipeline threads"""
+        with self._lock:
+            if stage == "parsed":
+                self.pages_parsed += count
+            elif stage == "split":
+                self.chunks_total += count
+            elif stage == "embedded":
+                self.chunks_embedded += count
+            elif stage == "upserted":
+                self.vectors_upserted += count
+            elif stage == "skipped":
+                self.chunks_skipped += count
+            elif stage == "deleted":
+                self.vectors_deleted += count
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "pages_parsed": self.pages_parsed,
+            "chunks_total": self.chunks_total,
+            "chunks_embedded": self.chunks_embedded,
+            "vectors_upserted": self.vectors_upserted,
+            "chunks_skipped": self.chunks_skipped,
+            "vectors_deleted": self.vectors_deleted,
+            "files": self.files,
+            "chunks_per_second": self.chunks_per_second,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class IngestionQueue:
+    """
+    Class to process uploaded PDFs in the background on a worker pool
+
+    With background off, submit runs the job before returning instead; for
+    serverless deployments, where work left running after the response may
+    be frozen with the instance.
+    """
+
+    def __init__(self, document_processor, vector_store_manager, max_workers: int = None, background: bool = None):
+        self.document_processor = document_processor
+        self.vector_store_manager = vector_store_manager
+        self.background = config.INGESTION_IN_BACKGROUND if background is None else background
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.INGESTION_WORKERS,
+            thread_name_prefix="ingestion"
+        )
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, file_content: bytes, filename: str, reindex: bool = False) -> IngestionJob:
+        """
+        Queue an uploaded PDF for parsing, embedding and upserting
+
+        Args:
+            file_content: Binary content of the PDF file
+            filename: Name of the uploaded file
+            reindex: Rebuild the source with a blue/green namespace swap
+                instead of updating it in place
+
+        Returns:
+            The queued job, or the finished job when not in the background
+        """
+        job = IngestionJob(filename)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+
+        self._dispatch(self._run, job, file_content, reindex)
+        return job
+
+    def submit_batch(self, files: List[Tuple[str, bytes]]) -> IngestionJob:
+        """
+        Queue several uploaded PDFs as one job, parsed across a process pool
+
+        Args:
+            files: List of (filename, content) pairs
+
+        Returns:
+            The queued job, or the finished job when not in the background
+        """
+        job = IngestionJob(", ".join(filename for filename, _content in files))
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+
+        self._dispatch(self._run_batch, job, files)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Return a job by id, or None if unknown or pruned"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _dispatch(self, run, *args):
+        if self.background:
+            # Bound to the upload request's context, so the job's spans join its trace
+            self._executor.submit(tracing.bind(run), *args)
+        else:
+            run(*args)
+
+    def _run(self, job: IngestionJob, file_content: bytes, reindex: bool = False):
+        job.status = "processing"
+        job.started_at = time.time()
+
+        try:
+            with tracing.span(
+                "ingestion.job", job_id=job.job_id, source=job.filename, bytes=len(file_content), reindex=reindex
+            ):
+                # Pages are parsed and split on demand while earlier chunks are embedded
+                chunks = self.document_processor.iter_pdf_chunks(
+                    file_content, job.filename, progress_callback=job.record_progress
+                )
+                if reindex:
+                    self.vector_store_manager.reindex_source(
+                        job.filename, chunks, progress_callback=job.record_progress
+                    )
+                else:
+                    self.vector_store_manager.add_document_stream(
+                        job.filename, chunks, progress_callback=job.record_progress
+                    )
+
+            job.status = "completed"
+        except Exception as e:
+            print(f"Error ingesting {job.filename}: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+
+    def _run_batch(self, job: IngestionJob, files: List[Tuple[str, bytes]]):
+        job.status = "processing"
+        job.started_at = time.time()
+
+        try:
+            with tracing.span("ingestion.batch_job", job_id=job.job_id, files=len(files)):
+                report = BatchIngestor(self.vector_store_manager).ingest(files, progress_callback=job.record_progress)
+            job.files = report["files"]
+            job.chunks_per_second = report["chunks_per_second"]
+
+            failed = [file_report["filename"] for file_report in report["files"] if file_report["status"] == "failed"]
+            if failed:
+                job.status = "failed"
+                job.error = f"Failed to ingest: {', '.join(failed)}"
+            else:
+                job.status = "completed"
+        except Exception as e:
+            print(f"Error ingesting batch: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        # Forget the oldest finished jobs beyond the configured history
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(0, len(self._jobs) - config.INGESTION_JOB_HISTORY)]:
+            del self._jobs[job_id]
@@ -0,0 +1,201 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from local_vector_store import matches_filter
+
+# Keeps codes and names such as "AZ-900", "node.js", "C++" and "C#" as single terms
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*[+#]*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have he her his i in is it its of on or she that the their "
+    "this to was were what when where which who will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into BM25 terms
+
+    Compound terms are indexed whole and by their parts, so "AZ-900" matches
+    queries for "AZ-900" as well as "AZ 900".
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        parts = re.findall(r"[a-z0-9]+", token)
+        if len(parts) > 1:
+            terms.extend(part for part in parts if part not in STOPWORDS)
+    return terms
+
+
+class KeywordIndex:
+    """
+    In-memory BM25 inverted index over chunk texts, persisted as JSON
+
+    Chunks are added and removed by id, so the index is updated incrementally
+    alongside the vector store. Only the chunk texts and metadata are written
+    to disk; postings are rebuilt when the index is loaded.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+
+        self._documents: Dict[str, Tuple[str, dict]] = {}  # id -> (text, metadata)
+        self._lengths: Dict[str, int] = {}  # id -> number of terms
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {id: term frequency}
+        self._total_length = 0
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+
+        if self.path and os.path.exists(self.path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, ids: List[str], texts: List[str], metadatas: Optional[List[dict]] = None):
+        """
+        Index chunks, replacing any already indexed under the same ids
+
+        Args:
+            ids: Chunk ids
+            texts: Chunk texts
+            metadatas: Metadata per chunk
+        """
+        metadatas = metadatas or [{} for _ in texts]
+        with self._lock:
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                self._remove(doc_id)
+                terms = Counter(tokenize(text))
+                for term, frequency in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = frequency
+                self._documents[doc_id] = (text, dict(metadata or {}))
+                self._lengths[doc_id] = sum(terms.values())
+                self._total_length += self._lengths[doc_id]
+            self._dirty = True
+
+    def delete(self, ids: List[str]):
+        """Remove chunks by id; unknown ids are ignored"""
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+            self._dirty = True
+
+    def ids(self, filter: Optional[dict] = None) -> List[str]:
+        """Return the ids of the indexed chunks whose metadata matches the filter"""
+        with self._lock:
+            return [doc_id for doc_id, (_text, metadata) in self._documents.items() if matches_filter(metadata, filter)]
+
+    def clear(self):
+        """Remove all chunks"""
+        with self._lock:
+            self._documents = {}
+            self._lengths = {}
+            self._postings = {}
+            self._total_length = 0
+            self._dirty = True
+
+    def search(self, query: str, k: int = 4, filter: Optional[dict] = None) -> List[Tuple[Document, float]]:
+        """
+        Rank chunks against a query with BM25
+
+        Args:
+            query: Query text
+            k: Number of results to return
+            filter: Optional metadata filter, as for the vector store
+
+        Returns:
+            List of (Document, score) pairs, best first; chunks sharing no term with the query are omitted
+        """
+        with self._lock:
+            if not self._documents:
+                return []
+
+            count = len(self._documents)
+            average_length = self._total_length / count
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            if filter:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if matches_filter(self._documents[doc_id][1], filter)
+                }
+
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [
+                (Document(page_content=self._documents[doc_id][0], metadata=dict(self._documents[doc_id][1])), score)
+                for doc_id, score in best
+            ]
+
+    def load(self):
+        """Load chunks from disk and rebuild the postings"""
+        try:
+            with open(self.path, "r") as f:
+                documents = json.load(f).get("documents", {})
+            self.clear()
+            self.add(
+                list(documents),
+                [entry["text"] for entry in documents.values()],
+                [entry["metadata"] for entry in documents.values()]
+            )
+            self._dirty = False
+        except Exception as e:
+            print(f"Error loading keyword index: {e}")
+
+    def save(self):
+        """Persist the chunks if the index changed since the last save"""
+        if not self.path:
+            return
+
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                documents = {
+                    doc_id: {"text": text, "metadata": metadata}
+                    for doc_id, (text, metadata) in self._documents.items()
+                }
+                self._dirty = False
+
+            try:
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, "w") as f:
+                    json.dump({"documents": documents}, f)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                print(f"Error saving keyword index: {e}")
+
+    def _remove(self, doc_id: str):
+        entry = self._documents.pop(doc_id, None)
+        if entry is None:
+            return
+
+        for term in set(tokenize(entry[0])):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
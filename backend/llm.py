@@ -1,114 +1,455 @@
+import asyncio
+import json
+import time
 from typing import List
-from langchain.chains import RetrievalQA
 from langchain_openai import ChatOpenAI
 from langchain_core.documents import Document
+from langchain_core.messages import convert_to_messages
 
 import config
+import metrics
+import tracing
+from cache import SemanticResponseCache
+from context import ContextPacker
+from history import ConversationHistoryManager
+from resilience import CircuitBreaker
 from vector_store import VectorStoreManager
 
 
+DEFAULT_SYSTEM_PROMPT = "You're JARVIS, a personal AI assistant for Timal Pathirana."
+
+
+def get_chat_model():
+    """
+    Returns the chat model based on config settings.
+    """
+    return ChatOpenAI(
+        model=config.LLM_MODEL,
+        temperature=config.LLM_TEMPERATURE,
+        api_key=config.OPENAI_API_KEY
+    )
+
+
 class LLMManager:
     """Class to manage LLM interactions with OpenAI"""
     
-    def __init__(self, vector_store_manager: VectorStoreManager = None):
+    def __init__(self, vector_store_manager: VectorStoreManager = None, llm=None):
         # Initialize the LLM
-        self.llm = ChatOpenAI(
-            model=config.LLM_MODEL,
-            temperature=config.LLM_TEMPERATURE,
-            api_key=config.OPENAI_API_KEY
-        )
+        self.llm = llm or get_chat_model()
         
         self.vector_store_manager = vector_store_manager or VectorStoreManager()
+        
+        # Answers to near-identical standalone questions are reused
+        self.response_cache = None
+        if config.RESPONSE_CACHE_ENABLED:
+            self.response_cache = SemanticResponseCache(
+                max_size=config.RESPONSE_CACHE_SIZE,
+                threshold=config.RESPONSE_CACHE_THRESHOLD
+            )
+        
+        # Conversation history is trimmed to a token budget before each call
+        self._tokenizer_available = True
+        self.history_manager = ConversationHistoryManager(
+            count_tokens=self._count_tokens,
+            summarize_fn=self._summarize_history if config.HISTORY_SUMMARY_ENABLED else None,
+            asummarize_fn=self._asummarize_history if config.HISTORY_SUMMARY_ENABLED else None
+        )
+        
+        # Completions fail fast while the model API keeps failing
+        self.llm_breaker = CircuitBreaker("llm", timeout=config.LLM_TIMEOUT)
+        
+        # Retrieved chunks are merged, deduplicated and fitted to a token budget
+        self.context_packer = ContextPacker(count_tokens=self._count_tokens)
     
-    def generate_response_with_rag(self, query: str, conversation_history=None, system_prompt=None) -> dict:
+    def generate_response_with_rag(
+        self, query: str, conversation_history=None, system_prompt=None, retrieval_options=None
+    ) -> dict:
         """
         Generate a response using RAG (Retrieval Augmented Generation)
         
+        If retrieval fails, times out or its circuit breaker is open, the
+        query is answered without context in the same single LLM call.
+        
         Args:
             query: User query
             conversation_history: List of previous messages in the conversation
             system_prompt: System prompt to define the assistant's behavior
+            retrieval_options: Optional similarity_search keyword arguments (k, score_threshold,
+                filter, mmr, mmr_lambda); defaults come from config
             
         Returns:
             Dictionary with the response and supporting documents
         """
+        # Set defaults if not provided
+        system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
+        retrieval_options = retrieval_options or {}
+        cache_scope = self._response_cache_scope(system_prompt, retrieval_options)
+        conversation_history, history_tokens_trimmed = self.history_manager.compact(conversation_history or [])
+        index_version = self.vector_store_manager.index_version
+        
+        # Serve near-identical standalone questions from the response cache
+        query_embedding = None
+        if self._use_response_cache(conversation_history):
+            query_embedding = self._embed_for_cache(query)
+            if query_embedding is not None:
+                cached = self._lookup_cached_response(query_embedding, cache_scope, index_version)
+                if cached:
+                    return cached
+        
+        # Retrieve relevant documents
+        docs, retrieval_error = None, None
         try:
-            # Set defaults if not provided
-            conversation_history = conversation_history or []
-            system_prompt = system_prompt or "You're JARVIS, a personal AI assistant for Timal Pathirana."
-            
-            # Retrieve relevant documents
-            docs = self.vector_store_manager.similarity_search(query, k=4)
-            
-            # Create context from retrieved documents
-            context = self._create_context_from_docs(docs)
-            
-            # Create messages format for the chat model
-            messages = [
-                {"role": "system", "content": self._create_system_prompt(system_prompt, context)}
-            ]
-            
-            # Add conversation history
-            for message in conversation_history:
-                messages.append(message)
-                
-            # Add the current query
-            messages.append({"role": "user", "content": query})
-            
-            # Generate response using OpenAI
-            response = self.llm.invoke(messages)
+            docs = self.vector_store_manager.similarity_search(query, **retrieval_options)
+        except Exception as e:
+            print(f"Error retrieving context, answering without it: {e}")
+            retrieval_error = str(e)
+        
+        # Generate response using OpenAI
+        messages = self._build_messages(query, conversation_history, self._system_content(system_prompt, docs))
+        with metrics.QUERY_STAGE_SECONDS.time(stage="llm"), tracing.span("llm.invoke", messages=len(messages)) as span:
+            response = self.llm_breaker.call(self.llm.invoke, messages)
+            span.set_attributes(self._token_usage_attributes(self._extract_token_usage(response)))
+        
+        return self._finish_response(
+            response, docs, retrieval_error, history_tokens_trimmed, query_embedding, cache_scope, index_version
+        )
+    
+    async def agenerate_response_with_rag(
+        self, query: str, conversation_history=None, system_prompt=None, retrieval_options=None
+    ) -> dict:
+        """
+        Async variant of generate_response_with_rag for use inside request handlers
+        
+        Retrieval and generation are awaited, so a slow completion does not
+        stall the event loop for other in-flight queries.
+        
+        Args:
+            query: User query
+            conversation_history: List of previous messages in the conversation
+            system_prompt: System prompt to define the assistant's behavior
+            retrieval_options: Optional similarity_search keyword arguments (k, score_threshold,
+                filter, mmr, mmr_lambda); defaults come from config
             
-            # Extract sources for citation
-            sources = self._extract_sources(docs)
+        Returns:
+            Dictionary with the response and supporting documents
+        """
+        system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
+        retrieval_options = retrieval_options or {}
+        cache_scope = self._response_cache_scope(system_prompt, retrieval_options)
+        conversation_history, history_tokens_trimmed = await self.history_manager.acompact(conversation_history or [])
+        index_version = self.vector_store_manager.index_version
+        
+        query_embedding = None
+        if self._use_response_cache(conversation_history):
+            query_embedding = await self._aembed_for_cache(query)
+            if query_embedding is not None:
+                cached = self._lookup_cached_response(query_embedding, cache_scope, index_version)
+                if cached:
+                    return cached
+        
+        docs, retrieval_error = None, None
+        try:
+            docs = await self.vector_store_manager.asimilarity_search(query, **retrieval_options)
+        except Exception as e:
+            print(f"Error retrieving context, answering without it: {e}")
+            retrieval_error = str(e)
+        
+        messages = self._build_messages(query, conversation_history, self._system_content(system_prompt, docs))
+        with metrics.QUERY_STAGE_SECONDS.time(stage="llm"), tracing.span("llm.invoke", messages=len(messages)) as span:
+            response = await self.llm_breaker.acall(self.llm.ainvoke, messages)
+            span.set_attributes(self._token_usage_attributes(self._extract_token_usage(response)))
+        
+        return self._finish_response(
+            response, docs, retrieval_error, history_tokens_trimmed, query_embedding, cache_scope, index_version
+        )
+    
+    async def astream_response_with_rag(
+        self, query: str, conversation_history=None, system_prompt=None, retrieval_options=None
+    ):
+        """
+        Stream a RAG response as (event, data) pairs
+        
+        Emits a "sources" event once retrieval finishes, a "token" event per
+        generated chunk, then a "done" event carrying the token usage and the
+        number of history tokens trimmed.
+        
+        Args:
+            query: User query
+            conversation_history: List of previous messages in the conversation
+            system_prompt: System prompt to define the assistant's behavior
+            retrieval_options: Optional similarity_search keyword arguments (k, score_threshold,
+                filter, mmr, mmr_lambda); defaults come from config
             
-            # Extract token usage (available in the underlying client response)
-            token_usage = {}
-            if hasattr(response, "llm_output") and response.llm_output:
-                token_usage = response.llm_output.get("token_usage", {})
+        Yields:
+            Tuples of event name and JSON-serialisable payload
+        """
+        system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
+        retrieval_options = retrieval_options or {}
+        cache_scope = self._response_cache_scope(system_prompt, retrieval_options)
+        conversation_history, history_tokens_trimmed = await self.history_manager.acompact(conversation_history or [])
+        index_version = self.vector_store_manager.index_version
+        
+        query_embedding = None
+        if self._use_response_cache(conversation_history):
+            query_embedding = await self._aembed_for_cache(query)
+            if query_embedding is not None:
+                cached = self._lookup_cached_response(query_embedding, cache_scope, index_version)
+                if cached:
+                    # Replay the cached answer as a single token
+                    yield "sources", {"sources": cached["sources"], "context_used": cached["context_used"], "cache_hit": True}
+                    yield "token", {"content": cached["answer"]}
+                    yield "done", {"token_usage": {}, "history_tokens_trimmed": history_tokens_trimmed}
+                    return
+        
+        docs, error = None, None
+        try:
+            docs = await self.vector_store_manager.asimilarity_search(query, **retrieval_options)
+        except Exception as e:
+            print(f"Error retrieving context for streamed response, answering without it: {e}")
+            error = str(e)
+        
+        messages = self._build_messages(query, conversation_history, self._system_content(system_prompt, docs))
+        sources = self._extract_sources(docs) if docs is not None else []
+        context_used = docs is not None
+        
+        yield "sources", {"sources": sources, "context_used": context_used, "cache_hit": False}
+        
+        answer_parts = []
+        token_usage = {}
+        async for chunk in self._astream_llm(messages):
+            if chunk.content:
+                answer_parts.append(chunk.content)
+                yield "token", {"content": chunk.content}
             
-            return {
-                "answer": response.content,
+            # Providers that report usage on the stream put it on the last chunk
+            usage = getattr(chunk, "usage_metadata", None)
+            if usage:
+                token_usage = {
+                    "prompt_tokens": usage.get("input_tokens", 0),
+                    "completion_tokens": usage.get("output_tokens", 0),
+                    "total_tokens": usage.get("total_tokens", 0)
+                }
+        
+        if not token_usage:
+            token_usage = self._estimate_token_usage(messages, "".join(answer_parts))
+        self._record_token_usage(token_usage)
+        
+        if query_embedding is not None and context_used:
+            self._store_cached_response(query_embedding, cache_scope, index_version, {
+                "answer": "".join(answer_parts),
                 "sources": sources,
-                "context_used": True,
-                "token_usage": token_usage
-            }
-            
+                "context_used": context_used
+            })
+        
+        done = {"token_usage": token_usage, "history_tokens_trimmed": history_tokens_trimmed}
+        if error:
+            done["error"] = error
+        yield "done", done
+    
+    def _system_content(self, system_prompt: str, docs) -> str:
+        """System prompt with the retrieved context, or the bare prompt when retrieval failed"""
+        if docs is None:
+            return system_prompt
+        with metrics.QUERY_STAGE_SECONDS.time(stage="context_build"), \
+                tracing.span("llm.create_system_prompt", documents=len(docs)):
+            return self._create_system_prompt(system_prompt, self._create_context_from_docs(docs))
+    
+    def _finish_response(
+        self, response, docs, retrieval_error, history_tokens_trimmed, query_embedding, cache_scope, index_version
+    ) -> dict:
+        """Build the response dictionary and cache answers that used context"""
+        result = {
+            "answer": response.content,
+            "sources": self._extract_sources(docs) if docs is not None else [],
+            "context_used": docs is not None,
+            "token_usage": self._extract_token_usage(response),
+            "cache_hit": False,
+            "history_tokens_trimmed": history_tokens_trimmed
+        }
+        self._record_token_usage(result["token_usage"])
+        
+        if retrieval_error:
+            result["error"] = retrieval_error
+        elif query_embedding is not None:
+            self._store_cached_response(query_embedding, cache_scope, index_version, result)
+        
+        return result
+    
+    def _embed_for_cache(self, query: str):
+        """Embed the query for a response cache lookup; None if embeddings are unavailable"""
+        try:
+            return self.vector_store_manager.embed_query(query)
         except Exception as e:
-            print(f"Error generating response: {e}")
-            
-            # Fallback to no-context response
-            messages = [
-                {"role": "system", "content": "You're JARVIS, a personal AI assistant for Timal Pathirana."}
-            ]
-            
-            # Add conversation history
-            if conversation_history:
-                for message in conversation_history:
-                    messages.append(message)
-            
-            # Add the current query
-            messages.append({"role": "user", "content": query})
-            
-            response = self.llm.invoke(messages)
-            
-            # Extract token usage
-            token_usage = {}
-            if hasattr(response, "llm_output") and response.llm_output:
-                token_usage = response.llm_output.get("token_usage", {})
+            print(f"Error embedding query for the response cache: {e}")
+            return None
+    
+    async def _aembed_for_cache(self, query: str):
+        """Async variant of _embed_for_cache"""
+        try:
+            return await self.vector_store_manager.aembed_query(query)
+        except Exception as e:
+            print(f"Error embedding query for the response cache: {e}")
+            return None
+    
+    async def _astream_llm(self, messages: List[dict]):
+        """Stream completion chunks through the LLM circuit breaker, timing out on the first chunk"""
+        self.llm_breaker.allow()
+        start = time.perf_counter()
+        # Not made current: the stream yields to the caller between chunks
+        span = tracing.start_span("llm.stream", messages=len(messages))
+        try:
+            stream = self.llm.astream(messages).__aiter__()
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), self.llm_breaker.timeout)
+            except StopAsyncIteration:
+                first = None
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"llm timed out after {self.llm_breaker.timeout}s waiting for the first token")
+            metrics.QUERY_STAGE_SECONDS.observe(time.perf_counter() - start, stage="llm_first_token")
+            span.add_event("first_token")
             
-            return {
-                "answer": response.content,
-                "sources": [],
-                "context_used": False,
-                "token_usage": token_usage,
-                "error": str(e)
-            }
+            if first is not None:
+                yield first
+                async for chunk in stream:
+                    yield chunk
+            metrics.QUERY_STAGE_SECONDS.observe(time.perf_counter() - start, stage="llm")
+        except Exception as e:
+            self.llm_breaker.record_failure(e)
+            span.record_exception(e)
+            raise
+        except BaseException:
+            # The client went away mid-stream; that says nothing about the model
+            self.llm_breaker.release()
+            span.add_event("cancelled")
+            raise
+        finally:
+            span.end()
+        self.llm_breaker.record_success()
+    
+    def _use_response_cache(self, conversation_history) -> bool:
+        """Only standalone questions are answered from the response cache"""
+        return self.response_cache is not None and not conversation_history
+    
+    def _response_cache_scope(self, system_prompt: str, retrieval_options: dict) -> str:
+        """Answers are only shared between queries with the same prompt and retrieval options"""
+        if not retrieval_options:
+            return system_prompt
+        return f"{system_prompt}\x00{json.dumps(retrieval_options, sort_keys=True)}"
+    
+    def _lookup_cached_response(self, query_embedding: List[float], cache_scope: str, index_version: int):
+        """Return a cached response marked as a cache hit, or None"""
+        cached = self.response_cache.lookup(
+            query_embedding, SemanticResponseCache.hash_prompt(cache_scope), index_version
+        )
+        if cached is None:
+            return None
+        
+        # A cache hit spends no tokens
+        return {**cached, "token_usage": {}, "cache_hit": True}
+    
+    def _store_cached_response(self, query_embedding: List[float], cache_scope: str, index_version: int, result: dict):
+        """Cache the parts of a response that are reusable for a similar query"""
+        self.response_cache.store(
+            query_embedding,
+            SemanticResponseCache.hash_prompt(cache_scope),
+            index_version,
+            {"answer": result["answer"], "sources": result["sources"], "context_used": result["context_used"]}
+        )
+    
+    def _build_messages(self, query: str, conversation_history, system_content: str) -> List[dict]:
+        """Create the chat messages: system prompt, conversation history, then the query"""
+        messages = [{"role": "system", "content": system_content}]
+        
+        # Add conversation history
+        if conversation_history:
+            messages.extend(conversation_history)
+        
+        # Add the current query
+        messages.append({"role": "user", "content": query})
+        
+        return messages
+    
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens with the model's tokenizer, or estimate when it is unavailable"""
+        if self._tokenizer_available:
+            try:
+                return self.llm.get_num_tokens(text)
+            except Exception as e:
+                # e.g. the tokenizer files cannot be downloaded; don't retry on every message
+                print(f"Error loading tokenizer, estimating token counts: {e}")
+                self._tokenizer_available = False
+        
+        return len(text) // 4 + 1
+    
+    def _summary_messages(self, previous_summary, messages: List[dict]) -> List[dict]:
+        """Create the chat messages asking the model to fold older turns into a summary"""
+        transcript = "\n".join(f"{message.get('role', 'user')}: {message.get('content', '')}" for message in messages)
+        if previous_summary:
+            transcript = f"Summary so far: {previous_summary}\n\n{transcript}"
+        
+        return [
+            {
+                "role": "system",
+                "content": (
+                    f"Summarize the conversation below in at most {config.HISTORY_SUMMARY_MAX_WORDS} words. "
+                    f"Keep names, facts and any open questions the user asked."
+                )
+            },
+            {"role": "user", "content": transcript}
+        ]
+    
+    def _summarize_history(self, previous_summary, messages: List[dict]) -> str:
+        """Summarize older conversation turns on top of the previous summary"""
+        return self.llm.invoke(self._summary_messages(previous_summary, messages)).content
+    
+    async def _asummarize_history(self, previous_summary, messages: List[dict]) -> str:
+        """Async variant of _summarize_history"""
+        response = await self.llm.ainvoke(self._summary_messages(previous_summary, messages))
+        return response.content
+    
+    def _extract_token_usage(self, response) -> dict:
+        """Extract token usage from a chat model response, if the provider reported it"""
+        token_usage = {}
+        if getattr(response, "response_metadata", None):
+            token_usage = response.response_metadata.get("token_usage", {})
+        elif hasattr(response, "llm_output") and response.llm_output:
+            token_usage = response.llm_output.get("token_usage", {})
+        
+        # Keep the flat counters; newer clients also nest per-category details
+        return {key: value for key, value in token_usage.items() if isinstance(value, int)}
+    
+    @staticmethod
+    def _token_usage_attributes(token_usage: dict) -> dict:
+        return {f"llm.{key}": value for key, value in token_usage.items()}
+    
+    @staticmethod
+    def _record_token_usage(token_usage: dict):
+        """Add a call's prompt and completion tokens to the metrics"""
+        for direction, key in (("prompt", "prompt_tokens"), ("completion", "completion_tokens")):
+            if token_usage.get(key):
+                metrics.LLM_TOKENS.inc(token_usage[key], direction=direction)
+                metrics.LLM_TOKENS_PER_REQUEST.observe(token_usage[key], direction=direction)
+    
+    def _estimate_token_usage(self, messages: List[dict], answer: str) -> dict:
+        """Count tokens locally when the streaming API does not report usage"""
+        try:
+            prompt_tokens = self.llm.get_num_tokens_from_messages(convert_to_messages(messages))
+            completion_tokens = self.llm.get_num_tokens(answer)
+        except Exception as e:
+            print(f"Error estimating token usage: {e}")
+            return {}
+        
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
             
     def _create_context_from_docs(self, docs: List[Document]) -> str:
-        """Create context string from retrieved documents"""
+        """Create context string from retrieved documents, packed to the context token budget"""
         context_parts = []
         
-        for i, doc in enumerate(docs):
+        for i, doc in enumerate(self.context_packer.pack(docs)):
             context_parts.append(f"Document {i+1}:\n{doc.page_content}")
         
         return "\n\n".join(context_parts)
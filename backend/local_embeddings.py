@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+import config
+import metrics
+from batching import MicroBatcher
+
+
+def _onnx_encoder(model_name: str, threads: int, batch_size: int) -> Callable[[List[str]], np.ndarray]:
+    # Optional dependency, only needed for this runtime; fastembed runs ONNX
+    # exports of the common sentence-embedding models without torch
+    from fastembed import TextEmbedding
+
+    model = TextEmbedding(model_name=model_name, threads=threads)
+
+    def encode(texts: List[str]) -> np.ndarray:
+        return np.asarray(list(model.embed(texts, batch_size=batch_size)), dtype=np.float32)
+
+    return encode
+
+
+def _torch_encoder(model_name: str, threads: int, batch_size: int, quantized: bool) -> Callable[[List[str]], np.ndarray]:
+    # Optional dependency, only needed for this runtime
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    model = SentenceTransformer(model_name, device="cpu")
+    if quantized:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def encode(texts: List[str]) -> np.ndarray:
+        with torch.inference_mode():
+            return model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+    return encode
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    Class to embed texts in-process with a sentence-embedding model on the CPU
+
+    All requests go through a MicroBatcher that runs one forward pass at a
+    time with every inference thread. Requests arriving within max_wait_ms of
+    each other are coalesced into a single batch of up to batch_size texts,
+    so concurrent query embeddings share a forward pass and large ingestion
+    batches keep every core busy.
+    """
+
+    def __init__(
+        self,
+        model_name: str = None,
+        runtime: str = None,
+        quantized: bool = None,
+        threads: int = None,
+        batch_size: int = None,
+        max_wait_ms: float = None,
+        encoder: Optional[Callable[[List[str]], np.ndarray]] = None,
+    ):
+        self.model_name = model_name or config.LOCAL_EMBEDDING_MODEL
+        self.runtime = runtime or config.LOCAL_EMBEDDING_RUNTIME
+        self.quantized = config.LOCAL_EMBEDDING_QUANTIZED if quantized is None else quantized
+        self.threads = threads or config.LOCAL_EMBEDDING_THREADS
+        self.batch_size = batch_size or config.LOCAL_EMBEDDING_BATCH_SIZE
+        max_wait_ms = config.LOCAL_EMBEDDING_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+
+        # Built on first use or warm-up, since loading the model takes seconds
+        self._encoder = encoder
+        self._encoder_lock = threading.Lock()
+
+        # One forward pass at a time, so each pass gets every inference thread
+        self._batcher = MicroBatcher(
+            self._encode_batch,
+            max_batch_size=self.batch_size,
+            max_wait_ms=max_wait_ms,
+            max_concurrent=1,
+            name="local-embeddings"
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, split into batch_size pieces that may share forward passes with other requests
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One L2-normalized vector per text
+        """
+        futures = [self._batcher.submit(texts[i:i + self.batch_size]) for i in range(0, len(texts), self.batch_size)]
+        return [vector for future in futures for vector in future.result()]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._batcher.submit([text]).result()[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        futures = [self._batcher.submit(texts[i:i + self.batch_size]) for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(*[asyncio.wrap_future(future) for future in futures])
+        return [vector for result in results for vector in result]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await asyncio.wrap_future(self._batcher.submit([text])))[0]
+
+    def warm_up(self) -> int:
+        """
+        Load the model and run one forward pass, so the first request pays neither
+
+        Returns:
+            The model's embedding dimension
+        """
+        start = time.perf_counter()
+        dimension = len(self.embed_query("warm up"))
+        print(f"Warmed up local embeddings {self.model_name} ({self.runtime}) in {time.perf_counter() - start:.2f}s")
+        if dimension != config.EMBEDDING_DIMENSION:
+            print(
+                f"Warning: {self.model_name} outputs {dimension} dimensions but EMBEDDING_DIMENSION is "
+                f"{config.EMBEDDING_DIMENSION}; the vector index must match the model"
+            )
+        return dimension
+
+    def _get_encoder(self) -> Callable[[List[str]], np.ndarray]:
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None:
+                    self._encoder = self._load_encoder()
+        return self._encoder
+
+    def _load_encoder(self) -> Callable[[List[str]], np.ndarray]:
+        if self.runtime in ("onnx", "auto"):
+            try:
+                return _onnx_encoder(self.model_name, self.threads, self.batch_size)
+            except ImportError:
+                if self.runtime == "onnx":
+                    raise ImportError("LOCAL_EMBEDDING_RUNTIME=onnx needs the fastembed package")
+        try:
+            return _torch_encoder(self.model_name, self.threads, self.batch_size, self.quantized)
+        except ImportError:
+            raise ImportError(
+                "Local embeddings need fastembed (ONNX runtime) or sentence-transformers (torch) installed"
+            )
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        try:
+            start = time.perf_counter()
+            vectors = np.asarray(self._get_encoder()(texts), dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        except Exception as e:
+            print(f"Error computing local embeddings: {e}")
+            raise
+        metrics.LOCAL_EMBEDDING_BATCH_SECONDS.observe(time.perf_counter() - start)
+        metrics.LOCAL_EMBEDDING_BATCH_TEXTS.observe(len(texts))
+        return vectors.tolist()
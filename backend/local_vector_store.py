@@ -0,0 +1,407 @@
+import json
+import os
+import threading
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from resilience import InvalidRequestError
+
+_COMPARISONS = {
+    "$eq": lambda value, target: value == target,
+    "$ne": lambda value, target: value != target,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+}
+
+
+class InvalidFilterError(InvalidRequestError):
+    """Raised for a metadata filter with an unsupported operator or shape"""
+
+
+def validate_filter(filter: Optional[dict]):
+    """
+    Check a metadata filter only uses the operators matches_filter supports
+
+    Raises:
+        InvalidFilterError: If the filter is malformed
+    """
+    if filter is None:
+        return
+    if not isinstance(filter, dict):
+        raise InvalidFilterError("A filter must be an object")
+
+    for field, condition in filter.items():
+        if field in ("$and", "$or"):
+            if not isinstance(condition, list) or not condition:
+                raise InvalidFilterError(f"{field} takes a non-empty list of filters")
+            for clause in condition:
+                if not isinstance(clause, dict):
+                    raise InvalidFilterError(f"{field} takes a non-empty list of filters")
+                validate_filter(clause)
+        elif field.startswith("$"):
+            raise InvalidFilterError(f"Unsupported filter operator {field}")
+        elif isinstance(condition, dict):
+            for operator, target in condition.items():
+                if operator not in _COMPARISONS:
+                    raise InvalidFilterError(f"Unsupported filter operator {operator} on {field}")
+                if operator in ("$in", "$nin") and not isinstance(target, list):
+                    raise InvalidFilterError(f"{operator} on {field} takes a list")
+
+
+def matches_filter(metadata: dict, filter: Optional[dict]) -> bool:
+    """
+    Evaluate a Pinecone-style metadata filter against a chunk's metadata
+
+    Supports field equality, the $eq, $ne, $in, $nin, $gt, $gte, $lt and $lte
+    operators, and $and / $or lists, e.g. {"source": {"$in": ["cv.pdf"]}}.
+
+    Raises:
+        InvalidFilterError: If the filter uses an unsupported operator
+    """
+    if not filter:
+        return True
+
+    for field, condition in filter.items():
+        if field == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif field == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(field)
+            for operator, target in condition.items():
+                if operator not in _COMPARISONS:
+                    raise InvalidFilterError(f"Unsupported filter operator {operator} on {field}")
+                if not _COMPARISONS[operator](value, target):
+                    return False
+        elif metadata.get(field) != condition:
+            return False
+    return True
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store backed by a contiguous float32 matrix
+
+    Vectors are stored L2-normalized so cosine similarity is a single matrix
+    product. The matrix is persisted as a .npy file and memory-mapped on load,
+    with ids, texts and metadata kept alongside in a JSON file.
+
+    New vectors are appended into spare rows of a buffer that grows by
+    doubling, so a stream of upserts costs linear time overall. Searches
+    work on a snapshot taken under the lock; rows and list entries inside
+    a snapshot are never modified, only appended after it or replaced by
+    copies.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    METADATA_FILE = "metadata.json"
+
+    def __init__(self, embedding: Embeddings, path: Optional[str] = None, dimension: Optional[int] = None):
+        self._embedding = embedding
+        self.path = path
+        self.dimension = dimension
+
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._positions = {}  # id -> row, only used by writers under the lock
+        self._buffer = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._vectors = self._buffer  # the first len(self._ids) rows of the buffer
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        if self.path:
+            self._load()
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        """
+        Embed and upsert texts; existing ids are overwritten
+
+        Args:
+            texts: Texts to add
+            metadatas: Optional metadata per text
+            ids: Optional ids per text, generated if not given
+
+        Returns:
+            Ids of the added texts
+        """
+        texts = list(texts)
+        vectors = self._embedding.embed_documents(texts)
+        return self.add_vectors(vectors, texts, metadatas=metadatas, ids=ids)
+
+    def add_vectors(
+        self,
+        vectors: List[List[float]],
+        texts: List[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        save: bool = True,
+    ) -> List[str]:
+        """
+        Upsert pre-computed embeddings with their texts and metadata
+
+        Args:
+            save: Persist the index now; callers upserting a stream of batches
+                pass False and call save() once at the end
+        """
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        matrix = self._normalize(np.asarray(vectors, dtype=np.float32))
+
+        with self._lock:
+            if self.dimension is None or not self._ids:
+                if self.dimension != matrix.shape[1]:
+                    self._buffer = np.zeros((0, matrix.shape[1]), dtype=np.float32)
+                self.dimension = matrix.shape[1]
+            if matrix.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Vector dimension {matrix.shape[1]} does not match index dimension {self.dimension}"
+                )
+
+            positions = self._positions
+            updates = []
+            new_rows = []
+            # An id repeated within the batch keeps its last vector
+            for doc_id, row in {doc_id: row for row, doc_id in enumerate(ids)}.items():
+                if doc_id in positions:
+                    updates.append((positions[doc_id], row))
+                else:
+                    positions[doc_id] = len(self._ids) + len(new_rows)
+                    new_rows.append(row)
+
+            count = len(self._ids)
+            buffer, id_list, text_list, metadata_list = self._buffer, self._ids, self._texts, self._metadatas
+            if updates:
+                # Rows and entries seen by in-flight searches are replaced by copies, never changed in place
+                buffer = np.array(buffer, dtype=np.float32)
+                id_list, text_list, metadata_list = list(id_list), list(text_list), list(metadata_list)
+                for position, row in updates:
+                    buffer[position] = matrix[row]
+                    text_list[position] = texts[row]
+                    metadata_list[position] = dict(metadatas[row])
+
+            needed = count + len(new_rows)
+            if needed > len(buffer) or not buffer.flags.writeable:
+                # Grow by doubling; also copies the read-only memory map on the first write
+                grown = np.empty((max(needed, 2 * len(buffer)), self.dimension), dtype=np.float32)
+                grown[:count] = buffer[:count]
+                buffer = grown
+            if new_rows:
+                buffer[count:needed] = matrix[new_rows]
+                for row in new_rows:
+                    id_list.append(ids[row])
+                    text_list.append(texts[row])
+                    metadata_list.append(dict(metadatas[row]))
+
+            self._buffer = buffer
+            self._vectors = buffer[:needed]
+            self._ids, self._texts, self._metadatas = id_list, text_list, metadata_list
+            self._dirty = True
+            if save:
+                self._save()
+
+        return ids
+
+    def save(self):
+        """Persist upserts made with save=False"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def snapshot(self) -> Tuple[np.ndarray, List[str], List[str], List[dict]]:
+        """
+        Return the current vectors, ids, texts and metadatas
+
+        The lists may grow after the snapshot is taken; only their first
+        len(vectors) entries belong to it.
+        """
+        with self._lock:
+            return self._vectors, self._ids, self._texts, self._metadatas
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        """Return the k documents most similar to the query text"""
+        embedding = self._embedding.embed_query(query)
+        return [doc for doc, _score in self.similarity_search_by_vector_with_score(embedding, k=k)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _score in self.similarity_search_by_vector_with_score(embedding, k=k)]
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """Return the k documents most similar to an embedding, with cosine similarity scores"""
+        if filter:
+            return [(doc, score) for doc, score, _vector in self.search_with_vectors(embedding, k=k, filter=filter)]
+        return self.similarity_search_by_vectors_with_score([embedding], k=k)[0]
+
+    def search_with_vectors(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None
+    ) -> List[Tuple[Document, float, np.ndarray]]:
+        """
+        Top-k cosine search that also returns the stored vectors
+
+        Args:
+            embedding: Query embedding
+            k: Number of results
+            filter: Optional metadata filter, see matches_filter
+
+        Returns:
+            List of (Document, score, normalized vector) triples, best match first
+        """
+        vectors, _ids, texts, metadatas = self.snapshot()
+        count = len(vectors)
+        if not count:
+            return []
+
+        query = self._normalize(np.asarray([embedding], dtype=np.float32))[0]
+        scores = vectors @ query
+        if filter:
+            allowed = np.fromiter((matches_filter(metadata, filter) for metadata in metadatas[:count]), dtype=bool, count=count)
+            scores = np.where(allowed, scores, -np.inf)
+            k = min(k, int(allowed.sum()))
+        k = min(k, count)
+        if k == 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (Document(page_content=texts[i], metadata=dict(metadatas[i])), float(scores[i]), np.asarray(vectors[i]))
+            for i in top
+        ]
+
+    def similarity_search_by_vectors_with_score(
+        self, embeddings: List[List[float]], k: int = 4
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Batched top-k cosine search
+
+        Args:
+            embeddings: Query embeddings
+            k: Number of results per query
+
+        Returns:
+            One list of (Document, score) pairs per query, best match first
+        """
+        # Snapshot so concurrent upserts don't change the matrix mid-search
+        vectors, _ids, texts, metadatas = self.snapshot()
+        if not len(vectors):
+            return [[] for _ in embeddings]
+
+        queries = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        scores = queries @ vectors.T
+        k = min(k, len(vectors))
+
+        results = []
+        for row in scores:
+            # argpartition finds the top k in linear time; only those k get sorted
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            results.append([
+                (Document(page_content=texts[i], metadata=dict(metadatas[i])), float(row[i]))
+                for i in top
+            ])
+        return results
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: Optional[bool] = None, **kwargs: Any) -> bool:
+        """Delete vectors by id, or all vectors"""
+        with self._lock:
+            if delete_all:
+                keep = []
+            else:
+                remove = set(ids or [])
+                keep = [i for i, doc_id in enumerate(self._ids) if doc_id not in remove]
+
+            self._buffer = np.ascontiguousarray(np.asarray(self._vectors)[keep], dtype=np.float32)
+            self._vectors = self._buffer
+            self._ids = [self._ids[i] for i in keep]
+            self._texts = [self._texts[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            self._save()
+        return True
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        path: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding, path=path)
+        store.add_texts(texts, metadatas=metadatas, **kwargs)
+        return store
+
+    def _load(self):
+        vectors_path = os.path.join(self.path, self.VECTORS_FILE)
+        metadata_path = os.path.join(self.path, self.METADATA_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(metadata_path)):
+            return
+
+        with open(metadata_path, "r") as f:
+            data = json.load(f)
+
+        self._ids = data["ids"]
+        self._texts = data["texts"]
+        self._metadatas = data["metadatas"]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self.dimension = data["dimension"]
+
+        # Memory-map the matrix so startup doesn't read the whole file up front
+        self._buffer = np.load(vectors_path, mmap_mode="r")
+        self._vectors = self._buffer
+        print(f"Loaded local vector index with {len(self._ids)} vectors from {self.path}")
+
+    def _save(self):
+        self._dirty = False
+        if not self.path:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        vectors_path = os.path.join(self.path, self.VECTORS_FILE)
+        metadata_path = os.path.join(self.path, self.METADATA_FILE)
+
+        # Write to temp files and swap in, so readers never see a partial index
+        with open(f"{vectors_path}.tmp", "wb") as f:
+            np.save(f, np.asarray(self._vectors, dtype=np.float32))
+        with open(f"{metadata_path}.tmp", "w") as f:
+            json.dump({
+                "dimension": self.dimension,
+                "ids": self._ids,
+                "texts": self._texts,
+                "metadatas": self._metadatas
+            }, f)
+        os.replace(f"{vectors_path}.tmp", vectors_path)
+        os.replace(f"{metadata_path}.tmp", metadata_path)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+
+
+def chunk_id(source: str, page, text: str) -> str:
+    """
+    Deterministic vector id for a chunk
+
+    Args:
+        source: Source document name
+        page: Page number, or None
+        text: Chunk text
+
+    Returns:
+        Hex digest identifying the chunk content and location
+    """
+    key = f"{source}\x00{'' if page is None else page}\x00{text}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class IngestionManifest:
+    """
+    Record of the chunk ids ingested per source document, persisted as JSON
+
+    The manifest also records the vector store namespace the chunks live in,
+    so a reindex's namespace swap takes effect on restart too.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        # source -> {"chunk_ids": [...], "updated_at": timestamp}
+        self._sources: Dict[str, dict] = {}
+        self.namespace: Optional[str] = None
+        self._lock = threading.Lock()
+
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self._sources = data.get("sources", {})
+                self.namespace = data.get("namespace")
+            except Exception as e:
+                print(f"Error loading ingestion manifest: {e}")
+
+    def get(self, source: str) -> Set[str]:
+        """Return the chunk ids recorded for a source"""
+        with self._lock:
+            return set(self._sources.get(source, {}).get("chunk_ids", []))
+
+    def set(self, source: str, chunk_ids: Iterable[str]):
+        """Replace the chunk ids recorded for a source"""
+        with self._lock:
+            self._sources[source] = {"chunk_ids": sorted(set(chunk_ids)), "updated_at": time.time()}
+            self._save()
+
+    def remove(self, source: str):
+        """Forget a source"""
+        with self._lock:
+            self._sources.pop(source, None)
+            self._save()
+
+    def clear(self):
+        """Forget all sources"""
+        with self._lock:
+            self._sources = {}
+            self._save()
+
+    def adopt(self, other: "IngestionManifest", namespace: str):
+        """
+        Replace all sources with another manifest's, in one write
+
+        Args:
+            other: Manifest of the rebuilt corpus
+            namespace: Namespace the rebuilt corpus is stored in
+        """
+        with other._lock:
+            sources = {source: dict(entry) for source, entry in other._sources.items()}
+        with self._lock:
+            self._sources = sources
+            self.namespace = namespace
+            self._save()
+
+    def sources(self) -> Dict[str, dict]:
+        """Return chunk counts and update times per source"""
+        with self._lock:
+            return {
+                source: {"chunks": len(entry["chunk_ids"]), "updated_at": entry["updated_at"]}
+                for source, entry in self._sources.items()
+            }
+
+    def _save(self):
+        if not self.path:
+            return
+
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({"sources": self._sources, "namespace": self.namespace}, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error saving ingestion manifest: {e}")
@@ -0,0 +1,238 @@
+"""
+Process-local metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms are updated in place by the code they measure; callback
+gauges are evaluated at scrape time, for values such as cache hit ratios that
+already live on other objects.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Seconds; spans cache hits (sub-millisecond) to slow completions
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Iterable[str], values: Iterable, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), register: bool = True):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if register:
+            with _registry_lock:
+                _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), register: bool = True):
+        super().__init__(name, documentation, labelnames, register)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, optionally per label set"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        register: bool = True,
+    ):
+        super().__init__(name, documentation, labelnames, register)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of a block, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry[2] if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()}
+
+        lines = []
+        for key, (bucket_counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), register: bool = True):
+        super().__init__(name, documentation, labelnames, register)
+        self._callbacks: List[Callable[[], Dict[tuple, float]]] = []
+
+    def set_function(self, fn: Callable[[], Dict[tuple, float]]):
+        """Add a callback returning {label values: value}; samples from all callbacks are merged"""
+        with self._lock:
+            self._callbacks.append(fn)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            callbacks = list(self._callbacks)
+
+        values = {}
+        for fn in callbacks:
+            try:
+                values.update(fn())
+            except Exception as e:
+                print(f"Error collecting {self.name}: {e}")
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+def render() -> str:
+    """Render every registered metric in the Prometheus text format"""
+    with _registry_lock:
+        metrics = list(_registry)
+    return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+# RAG query path
+QUERY_STAGE_SECONDS = Histogram(
+    "jarvis_query_stage_seconds",
+    "Time spent per query stage (embedding, vector_search, keyword_search, context_build, llm_first_token, llm)",
+    ("stage",)
+)
+LLM_TOKENS = Counter("jarvis_llm_tokens_total", "Tokens sent to and generated by the chat model", ("direction",))
+LLM_TOKENS_PER_REQUEST = Histogram(
+    "jarvis_llm_tokens_per_request",
+    "Prompt and completion tokens per chat model call",
+    ("direction",),
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+)
+
+# Ingestion
+INGESTION_STAGE_SECONDS = Histogram(
+    "jarvis_ingestion_stage_seconds",
+    "Time spent per ingestion stage (parse and split per page, parse_file per file parsed in a worker process, embed and upsert per batch)",
+    ("stage",)
+)
+INGESTION_CHUNKS = Counter("jarvis_ingestion_chunks_total", "Chunks processed per ingestion stage", ("stage",))
+
+# Query embeddings coalesced into one embeddings request
+QUERY_EMBEDDING_BATCH_SIZE = Histogram(
+    "jarvis_query_embedding_batch_size",
+    "Queries per batched embeddings request",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+# Local embedding model
+LOCAL_EMBEDDING_BATCH_SECONDS = Histogram(
+    "jarvis_local_embedding_batch_seconds", "Time per forward pass of the local embedding model"
+)
+LOCAL_EMBEDDING_BATCH_TEXTS = Histogram(
+    "jarvis_local_embedding_batch_texts",
+    "Texts per forward pass of the local embedding model, after coalescing concurrent requests",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+
+# HTTP
+HTTP_REQUEST_SECONDS = Histogram(
+    "jarvis_http_request_duration_seconds",
+    "Time until the response body has been sent, per route; streamed answers are timed to their last event",
+    ("method", "route", "status")
+)
+
+# Failures that used to be visible only in the logs
+ERRORS = Counter("jarvis_errors_total", "Failures per component", ("component",))
+
+# Read from the live components at scrape time
+CACHE_REQUESTS = CallbackGauge("jarvis_cache_requests", "Cache lookups since startup", ("cache", "result"))
+CACHE_HIT_RATIO = CallbackGauge("jarvis_cache_hit_ratio", "Cache hits divided by lookups since startup", ("cache",))
+CIRCUIT_BREAKER_OPEN = CallbackGauge(
+    "jarvis_circuit_breaker_open", "1 if the dependency's circuit breaker is open or half-open", ("dependency",)
+)
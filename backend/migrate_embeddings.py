@@ -0,0 +1,322 @@
+"""
+Migration of the vector index to another embedding model or dimension.
+
+The stored chunk texts and metadata are read back from the live index,
+re-embedded with the target model in parallel batches and written to a new
+index under the same ids, so the ingestion manifest and keyword index stay
+valid. Upserted batches are checkpointed every --checkpoint-every batches,
+once the target has them durably; running the same command again resumes
+where it stopped. Once every chunk is migrated, --cutover writes the
+target settings to the .env file the API loads on startup. The old index is
+left in place for rollback.
+
+Usage:
+    python migrate_embeddings.py --dimension 512 --target-index jarvis-512 [--model NAME]
+        [--provider openai|local] [--batch-size N] [--concurrency N] [--checkpoint PATH]
+        [--checkpoint-every N] [--cutover]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import config
+from local_vector_store import LocalVectorStore
+from pipeline import IngestionPipeline
+from vector_store import EmbeddingDimensionError, local_index_path
+
+
+class MigrationCheckpoint:
+    """
+    Append-only record of the chunk ids already written to the target index
+
+    The first line describes the target, so a checkpoint is never resumed
+    against a different migration. Each upserted batch appends one line of
+    ids; a line cut short by a crash is ignored and its batch redone.
+    """
+
+    def __init__(self, path: str, target: dict):
+        self.path = path
+        self.target = target
+        self.done: Set[str] = set()
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            self._load()
+        else:
+            with open(self.path, "w") as f:
+                f.write(json.dumps({"target": target}) + "\n")
+
+    def record(self, ids: List[str]):
+        """Mark ids as migrated, durably"""
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(ids) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.done.update(ids)
+
+    def _load(self):
+        with open(self.path, "r") as f:
+            lines = f.read().splitlines()
+
+        header = json.loads(lines[0]) if lines else {}
+        if header.get("target") != self.target:
+            raise ValueError(
+                f"Checkpoint {self.path} belongs to another migration ({header.get('target')}); "
+                f"delete it or pass a different --checkpoint"
+            )
+        for line in lines[1:]:
+            try:
+                self.done.update(json.loads(line))
+            except ValueError:
+                continue
+
+
+class EmbeddingMigration:
+    """
+    Class to re-embed the chunks of a vector store into a target index, resumably
+
+    Upserted ids are checkpointed every checkpoint_every batches, after
+    flush_fn (if given) has made the target durable, so a target that is
+    rewritten as a whole, like the local index, is not saved per batch.
+    """
+
+    def __init__(
+        self,
+        source_manager,
+        embeddings,
+        upsert_fn: Callable[[List[str], List[List[float]], List[str], List[dict]], None],
+        checkpoint: MigrationCheckpoint,
+        batch_size: int = None,
+        concurrency: int = None,
+        flush_fn: Optional[Callable[[], None]] = None,
+        checkpoint_every: int = 1,
+    ):
+        self.source_manager = source_manager
+        self.embeddings = embeddings
+        self.upsert_fn = upsert_fn
+        self.checkpoint = checkpoint
+        self.flush_fn = flush_fn
+        self.checkpoint_every = max(1, checkpoint_every)
+        self._pending_ids: List[List[str]] = []
+        self._pending_lock = threading.RLock()
+        self.pipeline = IngestionPipeline(
+            embed_fn=embeddings.embed_documents,
+            upsert_fn=self._upsert_and_record,
+            embed_batch_size=batch_size,
+            embed_concurrency=concurrency
+        )
+
+    def run(self, progress_callback=None) -> dict:
+        """
+        Migrate every chunk not yet in the checkpoint
+
+        Args:
+            progress_callback: Optional callable receiving ("embedded" | "upserted", count)
+
+        Returns:
+            Dictionary with the chunk totals, the ids still missing from the
+            target, and re-embedding throughput
+        """
+        source_ids = set()
+        resumed = {"chunks": 0}
+
+        def pending_chunks():
+            for ids, _vectors, texts, metadatas in self.source_manager.export_vectors():
+                for doc_id, text, metadata in zip(ids, texts, metadatas):
+                    source_ids.add(doc_id)
+                    if doc_id in self.checkpoint.done:
+                        resumed["chunks"] += 1
+                        continue
+                    yield doc_id, text, metadata
+
+        start = time.perf_counter()
+        try:
+            stats = self.pipeline.run_stream(pending_chunks(), progress_callback=progress_callback)
+        finally:
+            # Batches upserted before a failure are kept, so a resumed run skips them
+            self._checkpoint_pending()
+        missing = sorted(source_ids - self.checkpoint.done)
+
+        return {
+            "total": len(source_ids),
+            "migrated": stats["chunks"],
+            "resumed": resumed["chunks"],
+            "missing": missing,
+            "retries": stats["retries"],
+            "seconds": time.perf_counter() - start,
+            "chunks_per_second": stats["chunks_per_second"]
+        }
+
+    def _upsert_and_record(self, ids: List[str], vectors: List[List[float]], texts: List[str], metadatas: List[dict]):
+        self.upsert_fn(ids, vectors, texts, metadatas)
+        with self._pending_lock:
+            self._pending_ids.append(list(ids))
+            if len(self._pending_ids) >= self.checkpoint_every:
+                self._checkpoint_pending()
+
+    def _checkpoint_pending(self):
+        with self._pending_lock:
+            if not self._pending_ids:
+                return
+            # The target must hold the batches before the checkpoint says it does
+            if self.flush_fn:
+                self.flush_fn()
+            self.checkpoint.record([doc_id for ids in self._pending_ids for doc_id in ids])
+            self._pending_ids = []
+
+
+def build_embeddings(provider: str, model: str, dimension: int):
+    """Create the target embeddings model and check it produces vectors of the target dimension"""
+    if provider == "local":
+        from local_embeddings import LocalEmbeddings
+        embeddings = LocalEmbeddings(model_name=model)
+    else:
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(model=model, openai_api_key=config.OPENAI_API_KEY, dimensions=dimension)
+
+    probe_dimension = len(embeddings.embed_query("dimension probe"))
+    if probe_dimension != dimension:
+        raise EmbeddingDimensionError(f"{model} produces {probe_dimension} dimensions, not {dimension}")
+    return embeddings
+
+
+def pinecone_target(source_manager, index_name: str, dimension: int) -> Callable:
+    """
+    Create (or reuse) the target Pinecone index and return an upsert function for it
+
+    Vectors are written to the same namespace as the live corpus, so the
+    namespace recorded in the ingestion manifest stays valid after cutover.
+    """
+    from pinecone import ServerlessSpec
+
+    pc = source_manager.pc
+    if index_name in [index.name for index in pc.list_indexes()]:
+        existing_dimension = pc.describe_index(index_name).dimension
+        if existing_dimension != dimension:
+            raise EmbeddingDimensionError(f"Target index {index_name} already exists with dimension {existing_dimension}")
+    else:
+        print(f"Creating Pinecone index {index_name} with dimension {dimension}")
+        pc.create_index(
+            name=index_name,
+            dimension=dimension,
+            metric="cosine",
+            spec=ServerlessSpec(cloud=config.PINECONE_CLOUD, region=config.PINECONE_ENVIRONMENT)
+        )
+
+    index = pc.Index(index_name)
+    namespace = source_manager.namespace
+
+    def upsert(ids, vectors, texts, metadatas):
+        # Same layout as VectorStoreManager._upsert_vectors
+        index.upsert(vectors=[
+            {"id": doc_id, "values": vector, "metadata": {**metadata, "text": text}}
+            for doc_id, vector, text, metadata in zip(ids, vectors, texts, metadatas)
+        ], namespace=namespace)
+
+    return upsert
+
+
+def local_target(source_manager, base_path: str, dimension: int, embeddings) -> Tuple[Callable, Callable]:
+    """
+    Open the target local index, in the live corpus's namespace
+
+    Returns:
+        (upsert, save) functions; upserts stay in memory until save writes the index
+    """
+    store = LocalVectorStore(embeddings, path=local_index_path(source_manager.namespace, base_path), dimension=dimension)
+    if len(store) and store.dimension != dimension:
+        raise EmbeddingDimensionError(f"Target index {store.path} already exists with dimension {store.dimension}")
+
+    def upsert(ids, vectors, texts, metadatas):
+        store.add_vectors(vectors, texts, metadatas=metadatas, ids=ids, save=False)
+
+    return upsert, store.save
+
+
+def cutover(env_path: str, settings: Dict[str, str]):
+    """Write the target settings to the .env file, replacing existing values"""
+    from dotenv import set_key
+
+    if not os.path.exists(env_path):
+        open(env_path, "a").close()
+    for key, value in settings.items():
+        set_key(env_path, key, value, quote_mode="never")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed the vector index with another embedding model or dimension")
+    parser.add_argument("--dimension", type=int, required=True, help="Target embedding dimension")
+    parser.add_argument("--provider", choices=["openai", "local"], default=config.EMBEDDING_PROVIDER)
+    parser.add_argument("--model", help="Target embedding model (default: the configured model for the provider)")
+    parser.add_argument("--target-index", help="Target Pinecone index name (Pinecone backend)")
+    parser.add_argument("--target-path", help="Target local index directory (local backend)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Chunks per embeddings request (default: EMBEDDING_BATCH_SIZE)")
+    parser.add_argument("--concurrency", type=int, default=None, help="Embedding batches in flight (default: EMBEDDING_CONCURRENCY)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: next to the ingestion manifest)")
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=None,
+        help="Upserted batches per checkpoint; the local index is saved at each one (default: 20 local, 1 Pinecone)"
+    )
+    parser.add_argument("--cutover", action="store_true", help="Point the .env file at the target once every chunk is migrated")
+    parser.add_argument("--env-file", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+    args = parser.parse_args()
+
+    from vector_store import VectorStoreManager
+
+    local = config.VECTOR_STORE_BACKEND == "local"
+    target_name = args.target_path if local else args.target_index
+    if not target_name:
+        parser.error("--target-path is required for the local backend" if local else "--target-index is required")
+    model = args.model or (config.LOCAL_EMBEDDING_MODEL if args.provider == "local" else config.EMBEDDING_MODEL)
+
+    embeddings = build_embeddings(args.provider, model, args.dimension)
+    # The source index was built with the current model, so its dimension is expected to differ
+    source_manager = VectorStoreManager(embeddings=embeddings, verify_dimension=False)
+    flush = None
+    if local:
+        upsert, flush = local_target(source_manager, args.target_path, args.dimension, embeddings)
+    else:
+        upsert = pinecone_target(source_manager, args.target_index, args.dimension)
+    checkpoint_every = args.checkpoint_every or (20 if local else 1)
+
+    target = {"target": target_name, "provider": args.provider, "model": model, "dimension": args.dimension}
+    checkpoint_path = args.checkpoint or f"{config.INGESTION_MANIFEST_PATH}.{os.path.basename(target_name)}.migration"
+    checkpoint = MigrationCheckpoint(checkpoint_path, target)
+    if checkpoint.done:
+        print(f"Resuming from {checkpoint_path}: {len(checkpoint.done)} chunks already migrated")
+
+    migration = EmbeddingMigration(
+        source_manager, embeddings, upsert, checkpoint, batch_size=args.batch_size, concurrency=args.concurrency,
+        flush_fn=flush, checkpoint_every=checkpoint_every
+    )
+    report = migration.run()
+    print(
+        f"Migrated {report['migrated']} chunks ({report['resumed']} from earlier runs) of {report['total']} "
+        f"in {report['seconds']:.1f}s ({report['chunks_per_second']:.1f} chunks/sec, {report['retries']} retries)"
+    )
+
+    if report["missing"]:
+        print(f"{len(report['missing'])} chunks are not migrated yet; run the command again to resume")
+        raise SystemExit(1)
+
+    settings = {
+        "EMBEDDING_PROVIDER": args.provider,
+        "LOCAL_EMBEDDING_MODEL" if args.provider == "local" else "EMBEDDING_MODEL": model,
+        "EMBEDDING_DIMENSION": str(args.dimension),
+        "LOCAL_INDEX_PATH" if local else "PINECONE_INDEX_NAME": os.path.abspath(target_name) if local else target_name,
+    }
+    if not args.cutover:
+        print("Every chunk is migrated. Rerun with --cutover, or set: " + " ".join(f"{k}={v}" for k, v in settings.items()))
+        return
+
+    cutover(args.env_file, settings)
+    old_index = local_index_path(source_manager.namespace) if local else config.PINECONE_INDEX_NAME
+    print(f"Wrote {', '.join(settings)} to {args.env_file}; restart the API to switch. {old_index} is kept for rollback")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import config
+import metrics
+import tracing
+
+
+class IngestionPipeline:
+    """
+    Class to embed and upsert chunks in batches with the two stages overlapped
+
+    Embedding batches are submitted to one pool and each finished batch is
+    handed to a separate upsert pool, so the upsert of batch N runs while
+    batch N+1 is being embedded. Chunks can be pulled lazily from a
+    generator. Failed batches are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        upsert_fn: Callable[[List[str], List[List[float]], List[str], List[dict]], None],
+        embed_batch_size: int = None,
+        upsert_batch_size: int = None,
+        embed_concurrency: int = None,
+        upsert_concurrency: int = None,
+        max_retries: int = None,
+        retry_backoff: float = None,
+    ):
+        self.embed_fn = embed_fn
+        self.upsert_fn = upsert_fn
+        self.embed_batch_size = embed_batch_size or config.EMBEDDING_BATCH_SIZE
+        self.upsert_batch_size = upsert_batch_size or config.UPSERT_BATCH_SIZE
+        self.embed_concurrency = embed_concurrency or config.EMBEDDING_CONCURRENCY
+        self.upsert_concurrency = upsert_concurrency or config.UPSERT_CONCURRENCY
+        self.max_retries = config.INGESTION_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_backoff = config.INGESTION_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+
+    def run(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[dict],
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+    ) -> dict:
+        """
+        Embed and upsert all chunks
+
+        Args:
+            ids: Vector id per chunk
+            texts: Chunk texts
+            metadatas: Metadata per chunk
+            progress_callback: Called with ("embedded" | "upserted", count) as batches finish
+
+        Returns:
+            Dictionary with chunk count, per-stage busy time and throughput
+        """
+        return self.run_stream(zip(ids, texts, metadatas), progress_callback=progress_callback)
+
+    def run_stream(
+        self,
+        chunks: Iterable[Tuple[str, str, dict]],
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+    ) -> dict:
+        """
+        Embed and upsert chunks pulled lazily from an iterable
+
+        At most embed_concurrency + 1 embedding batches and a bounded number of
+        upsert batches are in flight, so a producer that parses pages on demand
+        keeps peak memory flat regardless of document size.
+
+        Args:
+            chunks: Iterable of (id, text, metadata) tuples
+            progress_callback: Called with ("embedded" | "upserted", count) as batches finish
+
+        Returns:
+            Dictionary with chunk count, per-stage busy time and throughput
+        """
+        stats = {"chunks": 0, "embed_seconds": 0.0, "upsert_seconds": 0.0, "retries": 0}
+        lock = threading.Lock()
+        start = time.perf_counter()
+
+        def embed(batch_texts):
+            batch_start = time.perf_counter()
+            with tracing.span("ingestion.embed_batch", chunks=len(batch_texts)):
+                vectors = self._with_retry(self.embed_fn, stats, lock, batch_texts)
+            elapsed = time.perf_counter() - batch_start
+            with lock:
+                stats["embed_seconds"] += elapsed
+            metrics.INGESTION_STAGE_SECONDS.observe(elapsed, stage="embed")
+            metrics.INGESTION_CHUNKS.inc(len(batch_texts), stage="embed")
+            return vectors
+
+        def upsert(batch_ids, vectors, batch_texts, batch_metadatas):
+            batch_start = time.perf_counter()
+            with tracing.span("ingestion.upsert_batch", chunks=len(batch_ids)):
+                self._with_retry(self.upsert_fn, stats, lock, batch_ids, vectors, batch_texts, batch_metadatas)
+            elapsed = time.perf_counter() - batch_start
+            with lock:
+                stats["upsert_seconds"] += elapsed
+            metrics.INGESTION_STAGE_SECONDS.observe(elapsed, stage="upsert")
+            metrics.INGESTION_CHUNKS.inc(len(batch_ids), stage="upsert")
+            if progress_callback:
+                progress_callback("upserted", len(batch_ids))
+
+        with ThreadPoolExecutor(self.embed_concurrency, thread_name_prefix="embed") as embed_pool, \
+                ThreadPoolExecutor(self.upsert_concurrency, thread_name_prefix="upsert") as upsert_pool:
+            pending_embeds = deque()
+            pending_upserts = deque()
+
+            def hand_off_oldest_embed():
+                batch, embed_future = pending_embeds.popleft()
+                vectors = embed_future.result()
+                if progress_callback:
+                    progress_callback("embedded", len(vectors))
+
+                # Hand the batch to the upsert pool while later batches keep embedding
+                for offset in range(0, len(batch), self.upsert_batch_size):
+                    part = batch[offset:offset + self.upsert_batch_size]
+                    pending_upserts.append(upsert_pool.submit(
+                        tracing.bind(upsert),
+                        [doc_id for doc_id, _text, _metadata in part],
+                        vectors[offset:offset + self.upsert_batch_size],
+                        [text for _doc_id, text, _metadata in part],
+                        [metadata for _doc_id, _text, metadata in part]
+                    ))
+
+                while len(pending_upserts) > self.upsert_concurrency * 2:
+                    pending_upserts.popleft().result()
+
+            for batch in self._batched(chunks, self.embed_batch_size):
+                stats["chunks"] += len(batch)
+                pending_embeds.append((batch, embed_pool.submit(
+                    tracing.bind(embed), [text for _doc_id, text, _metadata in batch]
+                )))
+                if len(pending_embeds) > self.embed_concurrency:
+                    hand_off_oldest_embed()
+
+            while pending_embeds:
+                hand_off_oldest_embed()
+            while pending_upserts:
+                pending_upserts.popleft().result()
+
+        stats["total_seconds"] = time.perf_counter() - start
+        stats["chunks_per_second"] = stats["chunks"] / stats["total_seconds"] if stats["total_seconds"] else 0.0
+        return stats
+
+    @staticmethod
+    def _batched(items: Iterable, size: int) -> Iterator[list]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _with_retry(self, fn, stats, lock, *args):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn(*args)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    metrics.ERRORS.inc(component="ingestion")
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                print(f"Ingestion batch failed ({e}), retrying in {delay:.1f}s")
+                tracing.current_span().add_event("retry", attempt=attempt + 1, error=str(e), delay_seconds=delay)
+                with lock:
+                    stats["retries"] += 1
+                time.sleep(delay)
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+import config
+import metrics
+import tracing
+
+# Runs sync calls that have a timeout; a call that times out keeps its thread
+# until the underlying client gives up, but the caller is released at once
+_timeout_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="breaker")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open"""
+
+
+class InvalidRequestError(ValueError):
+    """Raised for a request no dependency could serve, e.g. a malformed filter"""
+
+
+def is_client_error(error: Exception) -> bool:
+    """
+    Whether an error was caused by the request rather than the dependency
+
+    Invalid requests and 4xx responses (Pinecone's status, OpenAI's
+    status_code) other than timeouts and rate limits say nothing about
+    the dependency's health.
+    """
+    if isinstance(error, InvalidRequestError):
+        return True
+    status = getattr(error, "status", None) or getattr(error, "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in (408, 429)
+
+
+class CircuitBreaker:
+    """
+    Class to fail fast on a dependency that keeps failing
+
+    After failure_threshold consecutive failures or timeouts the breaker
+    opens and calls are rejected immediately with CircuitOpenError. Once
+    reset_timeout seconds have passed a single trial call is let through
+    (half-open): success closes the breaker, failure opens it again. Client
+    errors are raised without counting as failures, so malformed requests
+    can't open the breaker for everyone.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: Optional[float] = None,
+        failure_threshold: int = None,
+        reset_timeout: float = None,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold or config.BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = config.BREAKER_RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        self.clock = clock
+
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.opened_at = None
+        self.last_error = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+
+            self.total_rejected += 1
+            raise CircuitOpenError(f"{self.name} circuit is open after repeated failures: {self.last_error}")
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """Give up a half-open trial without a verdict, e.g. when the caller was cancelled"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.total_failures += 1
+            self.last_error = str(error) or type(error).__name__
+            self._trial_in_flight = False
+            metrics.ERRORS.inc(component=self.name)
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"Opening {self.name} circuit breaker: {self.last_error}")
+                self.state = "open"
+                self.opened_at = self.clock()
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Call a blocking function through the breaker
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            TimeoutError: If the call takes longer than the breaker's timeout
+        """
+        self.allow()
+        try:
+            if self.timeout:
+                future = _timeout_executor.submit(tracing.bind(fn), *args, **kwargs)
+                try:
+                    result = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    raise TimeoutError(f"{self.name} timed out after {self.timeout}s")
+            else:
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_client_error(e):
+                self.release()
+            else:
+                self.record_failure(e)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, fn, *args, **kwargs):
+        """
+        Await a coroutine function (or a function returning an awaitable) through the breaker
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            TimeoutError: If the call takes longer than the breaker's timeout
+        """
+        self.allow()
+        try:
+            if self.timeout:
+                try:
+                    result = await asyncio.wait_for(fn(*args, **kwargs), self.timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{self.name} timed out after {self.timeout}s")
+            else:
+                result = await fn(*args, **kwargs)
+        except Exception as e:
+            if is_client_error(e):
+                self.release()
+            else:
+                self.record_failure(e)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict:
+        """Return the breaker state for health reporting"""
+        with self._lock:
+            state = self.state
+            if state == "open" and self.clock() - self.opened_at >= self.reset_timeout:
+                state = "half_open"  # the next call is a trial
+            return {
+                "state": state,
+                "consecutive_failures": self.consecutive_failures,
+                "total_failures": self.total_failures,
+                "total_rejected": self.total_rejected,
+                "last_error": self.last_error,
+                "timeout_seconds": self.timeout,
+            }
@@ -0,0 +1,676 @@
+"""
+The JARVIS FastAPI app, shared by both deployments.
+
+create_app builds the app around one set of routes: api.py serves it locally
+and api/index.py serves it on Vercel under /api, behind an API key. Every
+route gets its components from the services module.
+"""
+import json
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Sequence
+from fastapi import APIRouter, FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+
+import config
+import metrics
+import tracing
+from services import aget_components, built_components, get_components
+from sessions import new_session_id
+
+
+def _report_warm_up(future):
+    if future.exception():
+        print(f"Error warming up components: {future.exception()}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the components in the background; startup itself doesn't wait,
+    # and the first request blocks on the same lock if warm-up is still running
+    if config.WARM_UP_ON_STARTUP:
+        warm_up = asyncio.get_running_loop().run_in_executor(None, get_components)
+        warm_up.add_done_callback(_report_warm_up)
+    yield
+
+
+# Routes are shared by every deployment; create_app mounts them
+router = APIRouter()
+
+
+def _after_body(response, callback):
+    """
+    Call callback(error) once the response body has been sent
+
+    call_next returns as soon as the headers are ready, which for a streamed
+    answer is before its first token. error is the exception that ended the
+    body early, or None.
+    """
+    body = response.body_iterator
+    
+    async def body_then_callback():
+        error = None
+        try:
+            async for chunk in body:
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            callback(error)
+    
+    response.body_iterator = body_then_callback()
+    return response
+
+
+async def trace_request(request: Request, call_next):
+    # Reuse the caller's request id when it is well-formed, so logs and traces line up across services
+    request_id = request.headers.get(config.REQUEST_ID_HEADER)
+    if not tracing.valid_request_id(request_id):
+        request_id = tracing.new_request_id()
+    
+    with tracing.request_context(request_id):
+        span = tracing.start_span("http.request", **{"http.method": request.method, "http.target": request.url.path})
+        try:
+            with span.activate():
+                response = await call_next(request)
+        except Exception as e:
+            span.record_exception(e)
+            span.end()
+            raise
+    
+    route = request.scope.get("route")
+    if route is not None:
+        span.update_name(f"{request.method} {route.path}")
+        span.set_attribute("http.route", route.path)
+    span.set_attribute("http.status_code", response.status_code)
+    
+    # The span stays open until the body is sent, so streamed answers are traced to their last event
+    def end_span(error):
+        if error is not None:
+            span.record_exception(error)
+        span.end()
+    
+    response.headers[config.REQUEST_ID_HEADER] = request_id
+    return _after_body(response, end_span)
+
+
+async def record_request_duration(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    
+    def observe(error):
+        # Label by route template, so ids in paths don't create a series per request
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=response.status_code
+        )
+        if error is not None:
+            metrics.ERRORS.inc(component="http")
+    
+    return _after_body(response, observe)
+
+
+# Default system prompt for queries that don't send one
+JARVIS_SYSTEM_PROMPT = """
+You are JARVIS, a dedicated AI assistant created by Timal Pathirana.
+
+Your role is to assist recruiters, hiring managers, and curious minds in learning more about Timal — including his career, technical skills, education, professional projects, values, and personal development journey.
+
+Use the RAG context to retrieve accurate, relevant information from Timal’s background documents. Always respond with clarity, professionalism, and a warm, helpful tone.
+
+Your scope includes:
+- Timal’s work experience, projects, and achievements  
+- His education and learning path  
+- His engineering philosophy, creativity, and team values  
+- Personal projects and side ventures he has built  
+- Career growth, certifications, and skills  
+
+Do **not** answer questions unrelated to Timal’s professional or personal journey.  
+If a question falls outside your scope, reply:
+
+> "I'm here to assist with questions about Timal’s career, projects, and journey. Let’s keep it focused on that. 😊"
+
+🧠 Keep every response **concise and focused** — no fluff, no filler. Assume the reader is busy.  
+Avoid long explanations or redundant praise. Just answer directly with insight and relevance.
+
+Always speak as JARVIS, Timal’s personal AI assistant — and never refer to yourself as an LLM or generic AI.
+"""
+
+
+# Models
+class RetrievalOptions(BaseModel):
+    k: Optional[int] = Field(default=None, ge=1, le=50)  # chunks retrieved
+    score_threshold: Optional[float] = None  # minimum cosine similarity for vector matches
+    filter: Optional[Dict[str, Any]] = None  # metadata filter, e.g. {"source": "cv.pdf"}
+    mmr: Optional[bool] = None  # diversify results by maximal marginal relevance
+    mmr_lambda: Optional[float] = Field(default=None, ge=0, le=1)
+    
+    @field_validator("filter")
+    @classmethod
+    def check_filter(cls, value):
+        # Rejected here with a 422, rather than failing inside the retrieval breaker
+        from local_vector_store import validate_filter
+        validate_filter(value)
+        return value
+
+
+class QueryRequest(BaseModel):
+    query: str
+    # With a session_id the server keeps the history, so clients only send the new query
+    session_id: Optional[str] = None
+    conversation_history: List[Dict[str, str]] = []  # [{"role": "user", "content": "..."}, {"role": "assistant", "content": "..."}]
+    system_prompt: Optional[str] = None  # defaults to the session's prompt, then JARVIS_SYSTEM_PROMPT
+    retrieval: Optional[RetrievalOptions] = None  # unset options use the RETRIEVAL_* config defaults
+
+
+class QueryResponse(BaseModel):
+    answer: str
+    sources: List[Dict[str, Any]]
+    context_used: bool
+    token_usage: Dict[str, int] = {}
+    cache_hit: bool = False
+    history_tokens_trimmed: int = 0  # conversation history tokens dropped or summarized to fit HISTORY_MAX_TOKENS
+    session_id: Optional[str] = None
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+    history: List[Dict[str, str]] = []
+    system_prompt: Optional[str] = None
+
+
+class UploadResponse(BaseModel):
+    message: str
+    job_id: str
+    status: str
+    filename: str
+
+
+class BatchUploadResponse(BaseModel):
+    message: str
+    job_id: str
+    status: str
+    filenames: List[str]
+
+
+class DocumentsResponse(BaseModel):
+    namespace: str
+    documents: Dict[str, Dict[str, Any]]  # source -> chunk count and last update time
+
+
+class UploadStatusResponse(BaseModel):
+    job_id: str
+    filename: str
+    status: str  # queued, processing, completed or failed
+    pages_parsed: int
+    chunks_total: int
+    chunks_embedded: int
+    vectors_upserted: int
+    chunks_skipped: int = 0  # unchanged since the last upload of this document
+    vectors_deleted: int = 0  # chunks of the previous version no longer present
+    files: Optional[List[Dict[str, Any]]] = None  # per-file reports for batch uploads
+    chunks_per_second: Optional[float] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+# Routes
+@router.get("/")
+async def root():
+    return {"message": "JARVIS RAG API is running"}
+
+
+async def _read_pdf_upload(file: UploadFile) -> bytes:
+    """Validate an uploaded file is a PDF within the size limit and return its content"""
+    # Check file extension
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    
+    # Read file content
+    file_content = await file.read()
+    
+    # Check file size
+    if len(file_content) > config.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"File size exceeds maximum allowed ({config.MAX_FILE_SIZE / 1024 / 1024} MB)"
+        )
+    
+    return file_content
+
+
+@router.post("/upload", response_model=UploadResponse, status_code=202)
+async def upload_document(file: UploadFile = File(...)):
+    """
+    Upload a PDF document to be processed and stored in the vector database
+    
+    Processing happens in the background; poll /upload/{job_id} for progress.
+    With INGESTION_IN_BACKGROUND off, the response waits for the finished job.
+    """
+    file_content = await _read_pdf_upload(file)
+    
+    try:
+        components = await aget_components()
+        
+        # Parse, embed and upsert on the ingestion worker pool, or inline
+        job = await run_in_threadpool(components["ingestion_queue"].submit, file_content, file.filename)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing document: {str(e)}")
+    
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Error processing document: {job.error}")
+    
+    return UploadResponse(
+        message="Document processed" if job.finished_at else "Document queued for processing",
+        job_id=job.job_id,
+        status=job.status,
+        filename=file.filename
+    )
+
+
+@router.post("/upload/batch", response_model=BatchUploadResponse, status_code=202)
+async def upload_documents_batch(files: List[UploadFile] = File(...)):
+    """
+    Upload several PDF documents to be processed as one background job
+    
+    Files are parsed in parallel worker processes; poll /upload/{job_id} for
+    progress and per-file timings.
+    """
+    contents = [(file.filename, await _read_pdf_upload(file)) for file in files]
+    
+    try:
+        components = await aget_components()
+        job = await run_in_threadpool(components["ingestion_queue"].submit_batch, contents)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing documents: {str(e)}")
+    
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Error processing documents: {job.error}")
+    
+    return BatchUploadResponse(
+        message="Documents processed" if job.finished_at else "Documents queued for processing",
+        job_id=job.job_id,
+        status=job.status,
+        filenames=[filename for filename, _content in contents]
+    )
+
+
+@router.get("/upload/{job_id}", response_model=UploadStatusResponse)
+async def upload_status(job_id: str):
+    """
+    Report the progress of a background upload
+    """
+    components = await aget_components()
+    job = components["ingestion_queue"].get(job_id)
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    
+    return UploadStatusResponse(**job.to_dict())
+
+
+async def _load_conversation(request: QueryRequest, session_store):
+    """
+    Resolve the history and system prompt for a query
+    
+    A known session supplies both; otherwise the request's own history is used.
+    
+    Returns:
+        Tuple of the stored session (or None), the conversation history and the system prompt
+    """
+    session = None
+    if request.session_id:
+        session = await run_in_threadpool(session_store.get, request.session_id)
+    
+    if session:
+        system_prompt = request.system_prompt or session["system_prompt"] or JARVIS_SYSTEM_PROMPT
+        return session, session["history"], system_prompt
+    
+    return None, request.conversation_history, request.system_prompt or JARVIS_SYSTEM_PROMPT
+
+
+def _retrieval_options(request: QueryRequest) -> Optional[dict]:
+    """Return the retrieval options the request set explicitly"""
+    if request.retrieval is None:
+        return None
+    return request.retrieval.model_dump(exclude_none=True) or None
+
+
+async def _record_turn(request: QueryRequest, session: Optional[dict], answer: str, session_store):
+    """Append the query and its answer to the request's session, seeding a new session with any posted history"""
+    messages = [] if session else list(request.conversation_history)
+    messages += [{"role": "user", "content": request.query}, {"role": "assistant", "content": answer}]
+    await run_in_threadpool(session_store.append, request.session_id, messages, request.system_prompt)
+
+
+@router.post("/query", response_model=QueryResponse)
+async def query_documents(request: QueryRequest):
+    """
+    Query the RAG system with a question
+    """
+    try:
+        components = await aget_components()
+        session, conversation_history, system_prompt = await _load_conversation(request, components["session_store"])
+        response = await components["llm_manager"].agenerate_response_with_rag(
+            request.query,
+            conversation_history=conversation_history,
+            system_prompt=system_prompt,
+            retrieval_options=_retrieval_options(request)
+        )
+        
+        if request.session_id:
+            await _record_turn(request, session, response["answer"], components["session_store"])
+        
+        return QueryResponse(
+            answer=response["answer"],
+            sources=response["sources"],
+            context_used=response["context_used"],
+            token_usage=response.get("token_usage", {}),
+            cache_hit=response.get("cache_hit", False),
+            history_tokens_trimmed=response.get("history_tokens_trimmed", 0),
+            session_id=request.session_id
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating response: {str(e)}")
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/query/stream")
+async def query_documents_stream(request: QueryRequest):
+    """
+    Query the RAG system and stream the answer as Server-Sent Events
+    
+    Emits a "sources" event, then "token" events as the answer is generated,
+    and a final "done" event with token usage.
+    """
+    async def event_stream():
+        try:
+            components = await aget_components()
+            session, conversation_history, system_prompt = await _load_conversation(request, components["session_store"])
+            
+            answer_parts = []
+            async for event, data in components["llm_manager"].astream_response_with_rag(
+                request.query,
+                conversation_history=conversation_history,
+                system_prompt=system_prompt,
+                retrieval_options=_retrieval_options(request)
+            ):
+                if event == "token":
+                    answer_parts.append(data["content"])
+                elif event == "done" and request.session_id:
+                    # Record the turn before the client sees the end of the stream
+                    await _record_turn(request, session, "".join(answer_parts), components["session_store"])
+                    data = {**data, "session_id": request.session_id}
+                yield _sse_event(event, data)
+        except Exception as e:
+            # The 200 status is already sent, so the failure is only visible here
+            metrics.ERRORS.inc(component="query_stream")
+            tracing.current_span().record_exception(e)
+            yield _sse_event("error", {"detail": f"Error generating response: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/sessions", response_model=SessionResponse, status_code=201)
+async def create_session():
+    """
+    Start a conversation session; pass its session_id on /query
+    """
+    session_id = new_session_id()
+    components = await aget_components()
+    # Stored empty, so the session can be read or deleted before its first query
+    await run_in_threadpool(components["session_store"].append, session_id, [])
+    return SessionResponse(session_id=session_id)
+
+
+@router.get("/sessions/{session_id}", response_model=SessionResponse)
+async def get_session(session_id: str):
+    """
+    Return the stored history of a conversation session
+    """
+    components = await aget_components()
+    session = await run_in_threadpool(components["session_store"].get, session_id)
+    
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return SessionResponse(session_id=session_id, **session)
+
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """
+    Forget a conversation session
+    """
+    components = await aget_components()
+    deleted = await run_in_threadpool(components["session_store"].delete, session_id)
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return {"message": "Session deleted successfully"}
+
+
+# Helper endpoints
+@router.get("/documents", response_model=DocumentsResponse)
+async def list_documents():
+    """
+    List the ingested documents with their chunk counts
+    """
+    components = await aget_components()
+    vector_store_manager = components["vector_store_manager"]
+    return DocumentsResponse(namespace=vector_store_manager.namespace, documents=vector_store_manager.manifest.sources())
+
+
+@router.delete("/documents/{source:path}")
+async def delete_document(source: str):
+    """
+    Delete every chunk of one document, leaving the rest of the index untouched
+    """
+    try:
+        components = await aget_components()
+        deleted = await run_in_threadpool(components["vector_store_manager"].delete_source, source)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    return {"message": "Document deleted successfully", "source": source, "chunks_deleted": deleted}
+
+
+@router.post("/reindex", response_model=UploadResponse, status_code=202)
+async def reindex_document(file: UploadFile = File(...)):
+    """
+    Rebuild one document from a new upload with a blue/green namespace swap
+    
+    The document is re-embedded into a fresh namespace alongside copies of the
+    other documents' vectors; queries switch over only once it is complete.
+    Poll /upload/{job_id} for progress.
+    """
+    file_content = await _read_pdf_upload(file)
+    
+    try:
+        components = await aget_components()
+        job = await run_in_threadpool(components["ingestion_queue"].submit, file_content, file.filename, reindex=True)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reindexing document: {str(e)}")
+    
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Error reindexing document: {job.error}")
+    
+    return UploadResponse(
+        message="Document reindexed" if job.finished_at else "Document queued for reindexing",
+        job_id=job.job_id,
+        status=job.status,
+        filename=file.filename
+    )
+
+
+@router.post("/clear")
+async def clear_vector_store():
+    """
+    Clear all vectors from the store (admin use only)
+    """
+    try:
+        components = await aget_components()
+        # Waits for in-flight uploads and reindexes, so keep it off the event loop
+        success = await run_in_threadpool(components["vector_store_manager"].delete_all)
+        
+        if success:
+            return {"message": "Vector store cleared successfully"}
+        else:
+            raise HTTPException(status_code=500, detail="Failed to clear vector store")
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error clearing vector store: {str(e)}")
+
+
+@router.get("/health")
+async def health():
+    """
+    Report circuit breaker state per dependency
+    
+    Components are not built by this endpoint; before the first query (or
+    warm-up) only the process is reported.
+    """
+    components = built_components()
+    if not components:
+        return {"status": "starting", "breakers": {}}
+    
+    breakers = _breaker_snapshots(components)
+    
+    # Retrieval down means answers without context; the LLM down means no answers
+    if breakers["llm"]["state"] == "open":
+        status = "down"
+    elif any(breaker["state"] != "closed" for breaker in breakers.values()):
+        status = "degraded"
+    else:
+        status = "ok"
+    
+    return {"status": status, "breakers": breakers}
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Report hit/miss counters for the in-process caches
+    """
+    return _cache_stats(await aget_components())
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Expose latency histograms, token counters and cache hit ratios in the Prometheus text format
+    
+    Like /health, this does not build the components; cache and breaker
+    gauges appear once they exist.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _breaker_snapshots(components: dict) -> dict:
+    vector_store_manager = components["vector_store_manager"]
+    return {
+        "embeddings": vector_store_manager.embeddings_breaker.snapshot(),
+        "retrieval": vector_store_manager.retrieval_breaker.snapshot(),
+        "llm": components["llm_manager"].llm_breaker.snapshot()
+    }
+
+
+def _cache_stats(components: dict) -> dict:
+    stats = {"query_embeddings": components["vector_store_manager"].query_embedding_cache.stats()}
+    if components["llm_manager"].response_cache:
+        stats["responses"] = components["llm_manager"].response_cache.stats()
+    return stats
+
+
+def _cache_request_samples() -> dict:
+    components = built_components()
+    if not components:
+        return {}
+    samples = {}
+    for cache, stats in _cache_stats(components).items():
+        samples[(cache, "hit")] = stats["hits"]
+        samples[(cache, "miss")] = stats["misses"]
+    return samples
+
+
+def _cache_hit_ratio_samples() -> dict:
+    components = built_components()
+    if not components:
+        return {}
+    return {(cache,): stats["hit_ratio"] for cache, stats in _cache_stats(components).items()}
+
+
+def _breaker_open_samples() -> dict:
+    components = built_components()
+    if not components:
+        return {}
+    return {
+        (name,): 0 if snapshot["state"] == "closed" else 1
+        for name, snapshot in _breaker_snapshots(components).items()
+    }
+
+
+def create_app(prefix: str = "", dependencies: Optional[Sequence[Any]] = None) -> FastAPI:
+    """
+    Create the JARVIS FastAPI app
+    
+    Args:
+        prefix: Path every route is served under, e.g. "/api"
+        dependencies: FastAPI dependencies applied to every route, e.g. an API key check
+        
+    Returns:
+        The app, with CORS, tracing and request metrics middleware
+    """
+    app = FastAPI(
+        title="JARVIS RAG API",
+        description="API for RAG-enabled document search and question answering",
+        lifespan=lifespan
+    )
+    
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=config.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[config.REQUEST_ID_HEADER],
+    )
+    # Added after CORS, so they wrap it; the duration middleware is outermost
+    app.middleware("http")(trace_request)
+    app.middleware("http")(record_request_duration)
+    
+    app.include_router(router, prefix=prefix, dependencies=list(dependencies or []))
+    return app
+
+
+metrics.CACHE_REQUESTS.set_function(_cache_request_samples)
+metrics.CACHE_HIT_RATIO.set_function(_cache_hit_ratio_samples)
+metrics.CIRCUIT_BREAKER_OPEN.set_function(_breaker_open_samples)
+
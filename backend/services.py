@@ -0,0 +1,67 @@
+"""
+Service factory shared by every deployment.
+
+The local server (api.py) and the Vercel function (api/index.py) both serve
+the app from server.py, which gets its RAG components here. They are built
+once per process, on first use or by the startup warm-up, and reused by
+every request after that.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.concurrency import run_in_threadpool
+
+
+# Components are built on first use, so importing the app does no network work
+_components = {}
+_components_lock = threading.Lock()
+
+
+def get_components() -> dict:
+    """
+    Build the RAG components once per process
+
+    The Pinecone setup and the OpenAI client construction run concurrently.
+    Heavy modules are imported here rather than at module import.
+
+    Returns:
+        Dictionary with the document processor, vector store manager, LLM manager,
+        ingestion queue and session store
+    """
+    if not _components:
+        with _components_lock:
+            if not _components:
+                from document_processor import DocumentProcessor
+                from ingestion import IngestionQueue
+                from llm import LLMManager, get_chat_model
+                from sessions import get_session_store
+                from vector_store import VectorStoreManager
+
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    vector_store_future = pool.submit(VectorStoreManager)
+                    chat_model_future = pool.submit(get_chat_model)
+                    vector_store_manager = vector_store_future.result()
+                    chat_model = chat_model_future.result()
+
+                document_processor = DocumentProcessor()
+
+                _components.update(
+                    document_processor=document_processor,
+                    vector_store_manager=vector_store_manager,
+                    llm_manager=LLMManager(vector_store_manager=vector_store_manager, llm=chat_model),
+                    ingestion_queue=IngestionQueue(document_processor, vector_store_manager),
+                    session_store=get_session_store()
+                )
+    return _components
+
+
+async def aget_components() -> dict:
+    """Return the RAG components, building them off the event loop on first use"""
+    if _components:
+        return _components
+    return await run_in_threadpool(get_components)
+
+
+def built_components() -> dict:
+    """Return the RAG components if they are built, or an empty dict, without building them"""
+    return _components
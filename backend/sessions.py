@@ -0,0 +1,221 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+import config
+
+
+def new_session_id() -> str:
+    """Return a fresh random session id"""
+    return uuid.uuid4().hex
+
+
+def _new_session() -> dict:
+    return {"history": [], "system_prompt": None}
+
+
+def _append_to_session(session: dict, messages: List[dict], system_prompt: Optional[str], max_messages: int) -> dict:
+    """Append messages to a session record, keeping only the newest max_messages"""
+    session["history"] = (session["history"] + list(messages))[-max_messages:]
+    if system_prompt:
+        session["system_prompt"] = system_prompt
+    return session
+
+
+class InMemorySessionStore:
+    """Bounded LRU store of conversation sessions with TTL expiry, kept in process memory"""
+
+    def __init__(self, max_sessions: int = None, ttl_seconds: float = None, max_messages: int = None, clock=time.time):
+        self.max_sessions = max_sessions or config.SESSION_MAX_SESSIONS
+        self.ttl_seconds = config.SESSION_TTL if ttl_seconds is None else ttl_seconds
+        self.max_messages = max_messages or config.SESSION_MAX_MESSAGES
+        self.clock = clock
+
+        # session_id -> (updated_at, session), least recently used first
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[dict]:
+        """
+        Return a session's history and system prompt
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Dictionary with "history" and "system_prompt", or None if unknown or expired
+        """
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if self._is_expired(entry[0]):
+                del self._sessions[session_id]
+                return None
+
+            self._sessions.move_to_end(session_id)
+            session = entry[1]
+            return {"history": list(session["history"]), "system_prompt": session["system_prompt"]}
+
+    def append(self, session_id: str, messages: List[dict], system_prompt: Optional[str] = None):
+        """
+        Append messages to a session, creating it if needed
+
+        Args:
+            session_id: Session identifier
+            messages: Chat messages to append, oldest first
+            system_prompt: Optional system prompt to remember for the session
+        """
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            session = entry[1] if entry and not self._is_expired(entry[0]) else _new_session()
+            self._sessions[session_id] = (
+                self.clock(), _append_to_session(session, messages, system_prompt, self.max_messages)
+            )
+            self._sessions.move_to_end(session_id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> bool:
+        """Delete a session; returns False if it did not exist"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "sessions": len(self._sessions), "max_sessions": self.max_sessions}
+
+    def _is_expired(self, updated_at: float) -> bool:
+        return self.ttl_seconds > 0 and self.clock() - updated_at > self.ttl_seconds
+
+
+class SQLiteSessionStore:
+    """Conversation sessions persisted in a SQLite file, so they survive restarts and are shared between workers"""
+
+    def __init__(self, path: str = None, ttl_seconds: float = None, max_messages: int = None, clock=time.time):
+        self.path = path or config.SESSION_DB_PATH
+        self.ttl_seconds = config.SESSION_TTL if ttl_seconds is None else ttl_seconds
+        self.max_messages = max_messages or config.SESSION_MAX_MESSAGES
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def get(self, session_id: str) -> Optional[dict]:
+        """Return a session's history and system prompt, or None if unknown or expired"""
+        with self._lock:
+            return self._load(session_id)
+
+    def append(self, session_id: str, messages: List[dict], system_prompt: Optional[str] = None):
+        """Append messages to a session, creating it if needed"""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                session = _append_to_session(
+                    self._load(session_id) or _new_session(), messages, system_prompt, self.max_messages
+                )
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO sessions (id, data, updated_at) VALUES (?, ?, ?)",
+                    (session_id, json.dumps(session), self.clock())
+                )
+                if self.ttl_seconds > 0:
+                    self._connection.execute(
+                        "DELETE FROM sessions WHERE updated_at < ?", (self.clock() - self.ttl_seconds,)
+                    )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id: str) -> bool:
+        """Delete a session; returns False if it did not exist"""
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            return cursor.rowcount > 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            return {"backend": "sqlite", "sessions": count}
+
+    def _load(self, session_id: str) -> Optional[dict]:
+        row = self._connection.execute(
+            "SELECT data, updated_at FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None or (self.ttl_seconds > 0 and self.clock() - row[1] > self.ttl_seconds):
+            return None
+        return json.loads(row[0])
+
+
+class RedisSessionStore:
+    """Conversation sessions kept in Redis, with the TTL enforced by key expiry"""
+
+    def __init__(self, url: str = None, ttl_seconds: float = None, max_messages: int = None, client=None):
+        self.ttl_seconds = config.SESSION_TTL if ttl_seconds is None else ttl_seconds
+        self.max_messages = max_messages or config.SESSION_MAX_MESSAGES
+
+        # Optional dependency, only needed for this backend
+        import redis
+        from redis.exceptions import WatchError
+
+        self.client = client or redis.Redis.from_url(url or config.SESSION_REDIS_URL)
+        self._watch_error = WatchError
+
+    def get(self, session_id: str) -> Optional[dict]:
+        """Return a session's history and system prompt, or None if unknown or expired"""
+        data = self.client.get(self._key(session_id))
+        return json.loads(data) if data else None
+
+    def append(self, session_id: str, messages: List[dict], system_prompt: Optional[str] = None):
+        """Append messages to a session, creating it if needed"""
+        key = self._key(session_id)
+
+        # Optimistic transaction, retried if another request updates the session concurrently
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    data = pipe.get(key)
+                    session = _append_to_session(
+                        json.loads(data) if data else _new_session(), messages, system_prompt, self.max_messages
+                    )
+                    pipe.multi()
+                    if self.ttl_seconds > 0:
+                        pipe.set(key, json.dumps(session), ex=int(self.ttl_seconds))
+                    else:
+                        pipe.set(key, json.dumps(session))
+                    pipe.execute()
+                    return
+                except self._watch_error:
+                    continue
+
+    def delete(self, session_id: str) -> bool:
+        """Delete a session; returns False if it did not exist"""
+        return self.client.delete(self._key(session_id)) > 0
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"jarvis:session:{session_id}"
+
+
+def get_session_store():
+    """
+    Returns the session store based on config settings.
+    """
+    if config.SESSION_STORE_BACKEND == "sqlite":
+        return SQLiteSessionStore()
+    if config.SESSION_STORE_BACKEND == "redis":
+        return RedisSessionStore()
+    return InMemorySessionStore()
@@ -1,12 +1,24 @@
 import unittest
 import os
 import json
+import importlib.util
+import asyncio
+import threading
+import httpx
+from langchain_core.messages import AIMessageChunk
 from fastapi.testclient import TestClient
+from unittest.mock import patch
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import metrics
+import server
+import services
 from api import app
+from benchmarks.fakes import FakeChatModel, build_components
+from server import JARVIS_SYSTEM_PROMPT
+from sessions import InMemorySessionStore
 
 
 class TestJarvisAPI(unittest.TestCase):
@@ -52,5 +64,225 @@ class TestJarvisAPI(unittest.TestCase):
             os.remove("test_file.txt")
 
 
+
+class FakeLLMManager:
+    """Answers with the number of history messages it was given"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def agenerate_response_with_rag(self, query, conversation_history=None, system_prompt=None, retrieval_options=None):
+        self.calls.append((query, list(conversation_history), system_prompt, retrieval_options))
+        return {"answer": f"answer {len(conversation_history)}", "sources": [], "context_used": True}
+
+
+class TestSessionQueries(unittest.TestCase):
+    """Test cases for server-side conversation sessions"""
+
+    def setUp(self):
+        self.llm_manager = FakeLLMManager()
+        self.previous_components = dict(services._components)
+        services._components.clear()
+        services._components.update(llm_manager=self.llm_manager, session_store=InMemorySessionStore())
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        services._components.clear()
+        services._components.update(self.previous_components)
+
+    def test_session_history_is_kept_server_side(self):
+        """Test follow-up queries only send the new question"""
+        session_id = self.client.post("/sessions").json()["session_id"]
+
+        first = self.client.post("/query", json={"query": "Who is Timal?", "session_id": session_id})
+        second = self.client.post("/query", json={"query": "Where did he study?", "session_id": session_id})
+
+        self.assertEqual(first.json()["session_id"], session_id)
+        self.assertEqual(second.json()["answer"], "answer 2")
+        self.assertEqual(self.llm_manager.calls[1][1], [
+            {"role": "user", "content": "Who is Timal?"},
+            {"role": "assistant", "content": "answer 0"}
+        ])
+        self.assertEqual(self.llm_manager.calls[1][2], JARVIS_SYSTEM_PROMPT)
+        self.assertEqual(len(self.client.get(f"/sessions/{session_id}").json()["history"]), 4)
+
+    def test_retrieval_options_are_passed_through(self):
+        """Test only the retrieval options a request sets are forwarded, and invalid ones are rejected"""
+        self.client.post("/query", json={"query": "Who is Timal?"})
+        self.client.post("/query", json={"query": "Who is Timal?", "retrieval": {"k": 2, "filter": {"source": "cv.pdf"}}})
+
+        self.assertIsNone(self.llm_manager.calls[0][3])
+        self.assertEqual(self.llm_manager.calls[1][3], {"k": 2, "filter": {"source": "cv.pdf"}})
+        self.assertEqual(self.client.post("/query", json={"query": "Who?", "retrieval": {"k": 0}}).status_code, 422)
+        bad_filter = {"query": "Who?", "retrieval": {"filter": {"page": {"$bogus": 1}}}}
+        self.assertEqual(self.client.post("/query", json=bad_filter).status_code, 422)
+        self.assertEqual(len(self.llm_manager.calls), 2)
+
+    def test_created_session_exists_before_its_first_query(self):
+        """Test a new session can be read and deleted right away"""
+        session_id = self.client.post("/sessions").json()["session_id"]
+
+        self.assertEqual(self.client.get(f"/sessions/{session_id}").json()["history"], [])
+        self.assertEqual(self.client.delete(f"/sessions/{session_id}").status_code, 200)
+
+    def test_delete_session(self):
+        """Test deleted sessions are no longer found"""
+        self.client.post("/query", json={"query": "Who is Timal?", "session_id": "abc"})
+
+        self.assertEqual(self.client.delete("/sessions/abc").status_code, 200)
+        self.assertEqual(self.client.get("/sessions/abc").status_code, 404)
+
+    def test_clear_waits_off_the_event_loop(self):
+        """Test other requests are served while /clear waits for in-flight ingestion"""
+        release = threading.Event()
+
+        class BlockedVectorStoreManager:
+            def delete_all(self):
+                release.wait(5)
+                return True
+
+        services._components["vector_store_manager"] = BlockedVectorStoreManager()
+
+        async def clear_during_query():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                clear = asyncio.ensure_future(client.post("/clear"))
+                await asyncio.sleep(0.05)
+                query = await asyncio.wait_for(client.post("/query", json={"query": "Who is Timal?"}), 2)
+                self.assertFalse(clear.done())
+                release.set()
+                return query, await clear
+
+        query, clear = asyncio.run(clear_during_query())
+        self.assertEqual((query.status_code, clear.status_code), (200, 200))
+
+
+class FailingChatModel(FakeChatModel):
+    """FakeChatModel whose stream breaks after two tokens"""
+
+    async def astream(self, messages):
+        for token in ["Timal ", "built "]:
+            yield AIMessageChunk(content=token)
+        raise ConnectionError("stream dropped")
+
+
+def parse_sse(body: str) -> list:
+    """Return the (event, data) pairs of a Server-Sent Events body"""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestStreamingQueries(unittest.TestCase):
+    """Test cases for answers streamed over /query/stream"""
+
+    def setUp(self):
+        self.previous_components = dict(services._components)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        services._components.clear()
+        services._components.update(self.previous_components)
+
+    def use(self, chat_model):
+        services._components.clear()
+        services._components.update(build_components(chat_model=chat_model))
+
+    def stream(self, query="What has Timal built?"):
+        response = self.client.post("/query/stream", json={"query": query})
+        self.assertEqual(response.status_code, 200)
+        return parse_sse(response.text)
+
+    def test_sources_then_tokens_then_done(self):
+        """Test the event order, and token usage estimated when the model reports none"""
+        chat_model = FakeChatModel(answer_tokens=5)
+        self.use(chat_model)
+
+        events = self.stream()
+
+        self.assertEqual([event for event, _data in events], ["sources", "token", "token", "token", "token", "token", "done"])
+        self.assertFalse(events[0][1]["cache_hit"])
+        answer = "".join(data["content"] for event, data in events if event == "token")
+        usage = events[-1][1]["token_usage"]
+        self.assertEqual(usage["completion_tokens"], chat_model.get_num_tokens(answer))
+        self.assertGreater(usage["prompt_tokens"], 0)
+        self.assertEqual(usage["total_tokens"], usage["prompt_tokens"] + usage["completion_tokens"])
+
+    def test_cached_answer_is_replayed(self):
+        """Test a repeated question replays the cached answer as one token"""
+        self.use(FakeChatModel(answer_tokens=5))
+
+        first = self.stream()
+        second = self.stream()
+
+        answer = "".join(data["content"] for event, data in first if event == "token")
+        self.assertEqual([event for event, _data in second], ["sources", "token", "done"])
+        self.assertTrue(second[0][1]["cache_hit"])
+        self.assertEqual(second[1][1]["content"], answer)
+        self.assertEqual(second[2][1]["token_usage"], {})
+
+    def test_llm_failure_mid_stream_sends_error_frame(self):
+        """Test tokens already sent are followed by an error event instead of done"""
+        self.use(FailingChatModel())
+
+        events = self.stream()
+
+        self.assertEqual([event for event, _data in events], ["sources", "token", "token", "error"])
+        self.assertIn("stream dropped", events[-1][1]["detail"])
+
+    def test_request_duration_covers_the_whole_stream(self):
+        """Test the request metric times the stream to its last event, and counts a failed stream"""
+        self.use(FakeChatModel(token_latency=0.05, answer_tokens=5))
+        with patch.object(metrics.HTTP_REQUEST_SECONDS, "observe", wraps=metrics.HTTP_REQUEST_SECONDS.observe) as observe:
+            self.stream()
+        duration, = observe.call_args.args
+        self.assertEqual(observe.call_args.kwargs["route"], "/query/stream")
+        self.assertGreaterEqual(duration, 0.2)
+
+        errors = metrics.ERRORS.value(component="query_stream")
+        self.use(FailingChatModel())
+        self.stream()
+        self.assertEqual(metrics.ERRORS.value(component="query_stream"), errors + 1)
+
+
+class TestVercelApp(unittest.TestCase):
+    """Test cases for the Vercel entrypoint serving the same app under /api"""
+
+    @classmethod
+    def setUpClass(cls):
+        index_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "api", "index.py")
+        spec = importlib.util.spec_from_file_location("vercel_index", index_path)
+        cls.index = importlib.util.module_from_spec(spec)
+        # The entrypoint sets serverless defaults in the environment; keep them out of other tests
+        with patch.dict(os.environ):
+            spec.loader.exec_module(cls.index)
+
+    def setUp(self):
+        self.llm_manager = FakeLLMManager()
+        self.previous_components = dict(services._components)
+        services._components.clear()
+        services._components.update(llm_manager=self.llm_manager, session_store=InMemorySessionStore())
+        self.client = TestClient(self.index.app)
+
+    def tearDown(self):
+        services._components.clear()
+        services._components.update(self.previous_components)
+
+    def test_routes_require_the_api_key(self):
+        """Test shared routes are served under /api and reject requests without the key"""
+        headers = {"X-API-Key": self.index.API_KEY}
+
+        self.assertEqual(self.client.post("/api/query", json={"query": "Who is Timal?"}).status_code, 403)
+        response = self.client.post("/api/query", json={"query": "Who is Timal?"}, headers=headers)
+        self.assertEqual(response.json()["answer"], "answer 0")
+        self.assertEqual(self.client.get("/api/", headers=headers).json(), {"message": "JARVIS RAG API is running"})
+
+    def test_components_are_shared_with_the_local_app(self):
+        """Test both entrypoints use the same service factory"""
+        self.assertIs(self.index.create_app, server.create_app)
+        self.assertIs(services.built_components()["llm_manager"], self.llm_manager)
+
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,92 @@
+import unittest
+import os
+import tempfile
+import multiprocessing
+from unittest.mock import patch
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_ingestion import BatchIngestor, find_pdfs
+from document_processor import parse_pdf_in_worker
+from tests.test_document_processor import make_pdf
+
+
+def parse_or_die_in_worker(file, filename):
+    """Parses in this process but kills any pool worker that runs it"""
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return parse_pdf_in_worker(file, filename)
+
+
+class RecordingVectorStoreManager:
+    """Records the chunks handed to the shared embedding stage"""
+
+    def __init__(self):
+        self.sources = {}
+
+    def add_document_stream(self, source, chunks, progress_callback=None):
+        self.sources[source] = [chunk.page_content for chunk in chunks]
+        return len(self.sources[source])
+
+
+class TestBatchIngestor(unittest.TestCase):
+    """Test cases for process-pool batch ingestion"""
+
+    def test_ingests_files_and_reports(self):
+        """Test every file is parsed in a worker and reported, including failures"""
+        vector_store_manager = RecordingVectorStoreManager()
+        files = [
+            ("cv.pdf", make_pdf(["Timal built JARVIS", "Timal studied at RMIT"])),
+            ("certs.pdf", make_pdf(["AWS Certified"])),
+            ("broken.pdf", b"not a pdf"),
+        ]
+
+        report = BatchIngestor(vector_store_manager, max_workers=2).ingest(files)
+
+        by_name = {file_report["filename"]: file_report for file_report in report["files"]}
+        self.assertEqual(by_name["cv.pdf"]["pages"], 2)
+        self.assertEqual(by_name["cv.pdf"]["added"], 2)
+        self.assertEqual(by_name["broken.pdf"]["status"], "failed")
+        self.assertEqual(vector_store_manager.sources["certs.pdf"], ["AWS Certified"])
+        self.assertEqual(report["total_chunks"], 3)
+
+    def test_parses_in_process_without_a_process_pool(self):
+        """Test files are still ingested where worker processes cannot be started"""
+        vector_store_manager = RecordingVectorStoreManager()
+        files = [("cv.pdf", make_pdf(["Timal built JARVIS"])), ("certs.pdf", make_pdf(["AWS Certified"]))]
+
+        with patch("batch_ingestion.ProcessPoolExecutor", side_effect=OSError("no shared memory")):
+            report = BatchIngestor(vector_store_manager, max_workers=2).ingest(files)
+
+        self.assertEqual([file_report["status"] for file_report in report["files"]], ["completed", "completed"])
+        self.assertEqual(vector_store_manager.sources["certs.pdf"], ["AWS Certified"])
+
+    def test_parses_in_process_after_a_worker_dies(self):
+        """Test a broken process pool falls back to parsing the remaining files in-process"""
+        vector_store_manager = RecordingVectorStoreManager()
+        files = [("cv.pdf", make_pdf(["Timal built JARVIS"])), ("certs.pdf", make_pdf(["AWS Certified"]))]
+
+        with patch("batch_ingestion.parse_pdf_in_worker", parse_or_die_in_worker):
+            report = BatchIngestor(vector_store_manager, max_workers=2).ingest(files)
+
+        self.assertEqual(sorted(file_report["filename"] for file_report in report["files"]), ["certs.pdf", "cv.pdf"])
+        self.assertTrue(all(file_report["status"] == "completed" for file_report in report["files"]))
+        self.assertEqual(vector_store_manager.sources["cv.pdf"], ["Timal built JARVIS"])
+
+    def test_find_pdfs(self):
+        """Test only PDFs are picked up, subdirectories only when recursive"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "old"))
+            for name in ("a.pdf", "notes.txt", os.path.join("old", "b.PDF")):
+                open(os.path.join(tmp_dir, name), "wb").close()
+
+            self.assertEqual([name for name, _path in find_pdfs(tmp_dir)], ["a.pdf"])
+            self.assertEqual(
+                sorted(name for name, _path in find_pdfs(tmp_dir, recursive=True)),
+                ["a.pdf", os.path.join("old", "b.PDF")]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
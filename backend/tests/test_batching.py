@@ -0,0 +1,107 @@
+import unittest
+import os
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batching import CoalescingEmbeddings, MicroBatcher
+from benchmarks.fakes import HashEmbeddings
+
+
+class RecordingEmbeddings(HashEmbeddings):
+    """HashEmbeddings that records every embed_documents call"""
+
+    def __init__(self, latency: float = 0.0, fail: bool = False):
+        super().__init__(dimension=16, latency=latency)
+        self.fail = fail
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self.lock:
+            self.calls.append(list(texts))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.fail:
+                raise RuntimeError("embeddings API down")
+            return super().embed_documents(texts)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """Test cases for the request coalescer"""
+
+    def test_results_fan_out_in_order(self):
+        batcher = MicroBatcher(lambda texts: [text.upper() for text in texts], max_batch_size=8, max_wait_ms=20)
+
+        futures = [batcher.submit(["a", "b"]), batcher.submit([]), batcher.submit(["c"])]
+        self.assertEqual([future.result() for future in futures], [["A", "B"], [], ["C"]])
+
+    def test_requests_join_while_every_call_is_busy(self):
+        calls = []
+
+        def slow_upper(texts):
+            calls.append(len(texts))
+            time.sleep(0.05)
+            return [text.upper() for text in texts]
+
+        batcher = MicroBatcher(slow_upper, max_batch_size=64, max_wait_ms=0, max_concurrent=1)
+        first = batcher.submit(["first"])
+        time.sleep(0.01)
+        rest = [batcher.submit([f"text {i}"]) for i in range(5)]
+
+        self.assertEqual(first.result(), ["FIRST"])
+        self.assertEqual([future.result()[0] for future in rest], [f"TEXT {i}" for i in range(5)])
+        self.assertEqual(calls, [1, 5])
+
+
+class TestCoalescingEmbeddings(unittest.TestCase):
+    """Test cases for batching concurrent query embeddings"""
+
+    def test_burst_of_queries_shares_requests(self):
+        model = RecordingEmbeddings(latency=0.02)
+        embeddings = CoalescingEmbeddings(model, window_ms=20, max_batch_size=64, max_concurrent=2)
+        queries = [f"query {i % 10}" for i in range(40)]
+
+        with ThreadPoolExecutor(max_workers=40) as pool:
+            vectors = list(pool.map(embeddings.embed_query, queries))
+
+        self.assertEqual(vectors, [model._embed(query) for query in queries])
+        self.assertLess(len(model.calls), 10)
+        self.assertLessEqual(model.max_in_flight, 2)
+        # Identical queries in a batch are embedded once
+        self.assertTrue(all(len(call) == len(set(call)) for call in model.calls))
+
+    def test_async_queries_and_errors(self):
+        model = RecordingEmbeddings()
+        embeddings = CoalescingEmbeddings(model, window_ms=10, max_batch_size=64, max_concurrent=1)
+
+        async def burst():
+            return await asyncio.gather(*[embeddings.aembed_query(f"query {i}") for i in range(5)])
+
+        self.assertEqual(asyncio.run(burst()), [model._embed(f"query {i}") for i in range(5)])
+        self.assertEqual(len(model.calls), 1)
+
+        model.fail = True
+        with self.assertRaises(RuntimeError):
+            embeddings.embed_query("query")
+
+    def test_documents_pass_through(self):
+        model = RecordingEmbeddings()
+        embeddings = CoalescingEmbeddings(model, window_ms=10, max_batch_size=2, max_concurrent=1)
+
+        self.assertEqual(len(embeddings.embed_documents(["a", "b", "c"])), 3)
+        self.assertEqual(model.calls, [["a", "b", "c"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
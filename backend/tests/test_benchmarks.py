@@ -0,0 +1,67 @@
+import unittest
+import os
+import json
+import asyncio
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_suite import compare_reports, run_suite
+from benchmarks.fakes import HashEmbeddings, generate_pdf
+from document_processor import DocumentProcessor
+
+
+class TestFakes(unittest.TestCase):
+    """Test cases for the offline stand-ins"""
+
+    def test_hash_embeddings_are_deterministic(self):
+        embeddings = HashEmbeddings(dimension=32)
+        self.assertEqual(embeddings.embed_query("timal built jarvis"), embeddings.embed_query("timal built jarvis"))
+        self.assertNotEqual(embeddings.embed_query("timal built jarvis"), embeddings.embed_query("aws lambda"))
+
+    def test_generated_pdf_parses(self):
+        pages = list(DocumentProcessor().iter_pdf_pages(generate_pdf(3, words_per_page=24), "generated.pdf"))
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(len(pages[0].page_content.split()), 24)
+
+
+class TestConcurrencyBenchmark(unittest.TestCase):
+    """Smoke test of the concurrency benchmark"""
+
+    def test_run_level_answers_every_query(self):
+        from benchmarks.bench_concurrency import build_llm_manager, run_level
+
+        llm_manager = build_llm_manager(embed_latency=0.0, search_latency=0.0, llm_latency=0.0)
+        for use_async in (False, True):
+            result = asyncio.run(run_level(llm_manager, concurrency=3, use_async=use_async))
+            self.assertGreater(result["qps"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Smoke test of the suite and its regression check"""
+
+    def test_quick_run_produces_a_report(self):
+        report = run_suite(
+            concurrency_levels=[1, 2], requests_per_worker=1, page_counts=[2], words_per_page=50, corpus_pages=2,
+            embed_latency=0.0, embed_per_item_latency=0.0, first_token_latency=0.0, token_latency=0.0,
+            answer_tokens=5, measure_fresh_import=False
+        )
+
+        json.dumps(report)
+        self.assertEqual([result["concurrency"] for result in report["query"]], [1, 2])
+        self.assertEqual(sum(result["errors"] for result in report["query"] + report["stream"]), 0)
+        self.assertGreater(report["ingestion"][0]["chunks"], 0)
+        self.assertIn("p99", report["stream"][0]["first_token_ms"])
+
+    def test_compare_reports_flags_regressions(self):
+        baseline = {"query": [{"concurrency": 1, "throughput_rps": 10.0, "latency_ms": {"p50": 100.0, "p99": 200.0}}]}
+        current = {"query": [{"concurrency": 1, "throughput_rps": 9.5, "latency_ms": {"p50": 100.0, "p99": 300.0}}]}
+
+        regressions = compare_reports(baseline, current, tolerance=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("query.c1.latency_p99_ms"))
+
+
+if __name__ == "__main__":
+    unittest.main()
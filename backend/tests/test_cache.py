@@ -0,0 +1,106 @@
+import unittest
+import os
+import tempfile
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import EmbeddingCache, SemanticResponseCache
+
+
+class FakeClock:
+    """Controllable time source for TTL tests"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test cases for the query embedding cache"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = EmbeddingCache(max_size=2, ttl_seconds=60, clock=self.clock)
+
+    def test_key_normalizes_query_text(self):
+        """Test keys ignore case and whitespace but not model settings"""
+        key = EmbeddingCache.make_key("What projects has Timal worked on?", "text-embedding-3-small", 1024)
+        self.assertEqual(key, EmbeddingCache.make_key("  what projects  has timal worked on? ", "text-embedding-3-small", 1024))
+        self.assertNotEqual(key, EmbeddingCache.make_key("What projects has Timal worked on?", "text-embedding-3-small", 1536))
+
+    def test_hit_and_miss_counters(self):
+        """Test lookups are counted"""
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.put("a", [0.1, 0.2])
+        self.assertEqual(self.cache.get("a"), [0.1, 0.2])
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 1, 1))
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        self.cache.put("a", [1.0])
+        self.cache.put("b", [2.0])
+        self.cache.get("a")
+        self.cache.put("c", [3.0])
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), [1.0])
+
+    def test_ttl_expiry(self):
+        """Test entries older than the TTL are treated as misses"""
+        self.cache.put("a", [1.0])
+        self.clock.now += 61
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_persistence_round_trip(self):
+        """Test entries survive a save and reload"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "embeddings.json")
+            cache = EmbeddingCache(path=path, clock=self.clock)
+            cache.put("a", [1.0, 2.0])
+            cache.save()
+
+            reloaded = EmbeddingCache(path=path, clock=self.clock)
+            self.assertEqual(reloaded.get("a"), [1.0, 2.0])
+
+
+
+class TestSemanticResponseCache(unittest.TestCase):
+    """Test cases for the semantic response cache"""
+
+    def setUp(self):
+        self.cache = SemanticResponseCache(max_size=2, threshold=0.95)
+        self.prompt_hash = SemanticResponseCache.hash_prompt("You're JARVIS")
+        self.response = {"answer": "JARVIS", "sources": [], "context_used": True}
+
+    def test_similar_query_hits(self):
+        """Test a query above the cosine threshold reuses the cached answer"""
+        self.cache.store([1.0, 0.0], self.prompt_hash, 0, self.response)
+        self.assertEqual(self.cache.lookup([0.99, 0.05], self.prompt_hash, 0), self.response)
+        self.assertIsNone(self.cache.lookup([0.0, 1.0], self.prompt_hash, 0))
+
+    def test_different_system_prompt_misses(self):
+        """Test answers are not shared across system prompts"""
+        self.cache.store([1.0, 0.0], self.prompt_hash, 0, self.response)
+        other_hash = SemanticResponseCache.hash_prompt("Something else")
+        self.assertIsNone(self.cache.lookup([1.0, 0.0], other_hash, 0))
+
+    def test_index_version_change_invalidates(self):
+        """Test a corpus change drops cached answers"""
+        self.cache.store([1.0, 0.0], self.prompt_hash, 0, self.response)
+        self.assertIsNone(self.cache.lookup([1.0, 0.0], self.prompt_hash, 1))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_size_bound(self):
+        """Test the oldest entry is evicted over max_size"""
+        for vector in ([1.0, 0.0], [0.0, 1.0], [-1.0, 0.0]):
+            self.cache.store(vector, self.prompt_hash, 0, self.response)
+        self.assertEqual(self.cache.stats()["size"], 2)
+        self.assertIsNone(self.cache.lookup([1.0, 0.0], self.prompt_hash, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
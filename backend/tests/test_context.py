@@ -0,0 +1,102 @@
+import unittest
+import os
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from context import ContextPacker
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def chunk(text, source="cv.pdf", page=0, start_index=None):
+    metadata = {"source": source, "page": page}
+    if start_index is not None:
+        metadata["start_index"] = start_index
+    return Document(page_content=text, metadata=metadata)
+
+
+class TestContextPacker(unittest.TestCase):
+    """Test cases for token-budgeted context packing"""
+
+    def setUp(self):
+        self.packer = ContextPacker(count_words, max_tokens=1000, duplicate_threshold=0.9)
+
+    def test_merges_overlapping_chunks_by_offset(self):
+        """Test neighbours on the same page are merged once, at the rank of the best one"""
+        page = "Timal built JARVIS with FastAPI. He deployed it on Vercel. It answers recruiter questions."
+        docs = [
+            chunk("Unrelated certification text", page=3),
+            chunk(page[33:], start_index=33),
+            chunk(page[:58], start_index=0),
+        ]
+
+        packed = self.packer.pack(docs)
+
+        self.assertEqual([doc.page_content for doc in packed], ["Unrelated certification text", page])
+        self.assertEqual(packed[1].metadata["start_index"], 0)
+
+    def test_merges_chunks_with_float_metadata(self):
+        """Test offsets and pages returned as floats, as Pinecone does, are merged like ints"""
+        page = "Timal built JARVIS with FastAPI. He deployed it on Vercel. It answers recruiter questions."
+        docs = [chunk(page[33:], page=2.0, start_index=33.0), chunk(page[:58], page=2, start_index=0.0)]
+
+        packed = self.packer.pack(docs)
+
+        self.assertEqual([doc.page_content for doc in packed], [page])
+        self.assertEqual(packed[0].metadata["start_index"], 0)
+
+    def test_merges_overlapping_chunks_by_text(self):
+        """Test chunks without offsets are merged on their shared overlap text"""
+        overlap = "He deployed it on Vercel with a custom domain."
+        docs = [chunk(f"{overlap} It answers recruiter questions."), chunk(f"Timal built JARVIS. {overlap}")]
+
+        packed = self.packer.pack(docs)
+
+        self.assertEqual(len(packed), 1)
+        self.assertEqual(packed[0].page_content, f"Timal built JARVIS. {overlap} It answers recruiter questions.")
+
+    def test_chunks_from_other_pages_are_not_merged(self):
+        """Test matching text on a different page is kept separate"""
+        docs = [chunk("Timal built JARVIS", start_index=0), chunk("with FastAPI", page=1, start_index=18)]
+
+        self.assertEqual(len(self.packer.pack(docs)), 2)
+
+    def test_near_duplicates_are_dropped(self):
+        """Test a chunk repeating a more relevant one is dropped"""
+        docs = [
+            chunk("Timal studied computer science at RMIT University", source="cv.pdf"),
+            chunk("Timal studied Computer Science at RMIT university.", source="profile.pdf"),
+            chunk("Timal holds AWS certifications", source="certs.pdf"),
+        ]
+
+        packed = self.packer.pack(docs)
+
+        self.assertEqual([doc.metadata["source"] for doc in packed], ["cv.pdf", "certs.pdf"])
+
+    def test_fills_budget_in_relevance_order(self):
+        """Test chunks that don't fit are skipped while smaller later ones still fit"""
+        packer = ContextPacker(count_words, max_tokens=6)
+        docs = [
+            chunk("one two three four", page=0),
+            chunk("five six seven eight", page=1),
+            chunk("nine ten", page=2),
+        ]
+
+        self.assertEqual([doc.page_content for doc in packer.pack(docs)], ["one two three four", "nine ten"])
+
+    def test_oversized_best_chunk_is_truncated(self):
+        """Test the context is never empty"""
+        packer = ContextPacker(count_words, max_tokens=2)
+
+        packed = packer.pack([chunk("one two three four")])
+
+        self.assertEqual(packed[0].page_content, "one two t")
+
+
+if __name__ == "__main__":
+    unittest.main()
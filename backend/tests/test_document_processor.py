@@ -0,0 +1,70 @@
+import unittest
+import io
+import os
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_processor import DocumentProcessor
+
+
+def make_pdf(pages):
+    """Build a minimal PDF with one line of Helvetica text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for text in pages:
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(pages)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return out
+
+
+class TestDocumentProcessor(unittest.TestCase):
+    """Test cases for in-memory PDF parsing"""
+
+    def setUp(self):
+        self.processor = DocumentProcessor()
+        self.pdf = make_pdf(["Timal built JARVIS", "Timal studied at RMIT"])
+
+    def test_chunks_carry_source_and_page(self):
+        """Test chunks are parsed from bytes with source, page and offset metadata"""
+        chunks = list(self.processor.iter_pdf_chunks(self.pdf, "cv.pdf"))
+        self.assertEqual([chunk.page_content for chunk in chunks], ["Timal built JARVIS", "Timal studied at RMIT"])
+        self.assertEqual([chunk.metadata for chunk in chunks], [
+            {"source": "cv.pdf", "page": 0, "start_index": 0},
+            {"source": "cv.pdf", "page": 1, "start_index": 0}
+        ])
+
+    def test_pages_are_parsed_lazily(self):
+        """Test the first chunk is available before later pages are parsed"""
+        progress = []
+        chunks = self.processor.iter_pdf_chunks(io.BytesIO(self.pdf), "cv.pdf", progress_callback=lambda stage, count: progress.append(stage))
+
+        next(chunks)
+        self.assertEqual(progress, ["parsed", "split"])
+
+    def test_upload_matches_stream(self):
+        """Test the list-based upload path produces the same chunks"""
+        self.assertEqual(
+            self.processor.process_pdf_from_upload(self.pdf, "cv.pdf"),
+            list(self.processor.iter_pdf_chunks(self.pdf, "cv.pdf"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
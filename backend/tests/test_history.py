@@ -0,0 +1,92 @@
+import unittest
+import os
+import asyncio
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import ConversationHistoryManager, SUMMARY_PREFIX
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def make_history(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i} about Timal"})
+        history.append({"role": "assistant", "content": f"answer {i}"})
+    return history
+
+
+class TestConversationHistoryManager(unittest.TestCase):
+    """Test cases for token-budgeted conversation history"""
+
+    def test_short_history_is_kept(self):
+        """Test history within the budget is returned unchanged"""
+        manager = ConversationHistoryManager(count_words, max_tokens=1000)
+        history = make_history(3)
+
+        self.assertEqual(manager.compact(history), (history, 0))
+
+    def test_keeps_most_recent_turns_within_budget(self):
+        """Test older turns are dropped, the window starts on a user turn and trimmed tokens are reported"""
+        manager = ConversationHistoryManager(count_words, max_tokens=20)
+        history = make_history(4)  # user messages cost 8 tokens, assistant replies 6
+
+        messages, trimmed = manager.compact(history)
+
+        self.assertEqual(messages, history[-2:])
+        self.assertEqual(messages[0]["role"], "user")
+        self.assertEqual(trimmed, sum(manager.count_message_tokens(message) for message in history[:-2]))
+
+    def test_rolling_summary_is_cached(self):
+        """Test dropped turns are summarized once and later summaries build on the cached one"""
+        calls = []
+
+        def summarize(previous_summary, messages):
+            calls.append((previous_summary, [message["content"] for message in messages]))
+            return f"summary of {len(messages)} messages"
+
+        manager = ConversationHistoryManager(count_words, max_tokens=20, summarize_fn=summarize)
+        history = make_history(4)
+
+        messages, trimmed = manager.compact(history)
+        self.assertEqual(messages[0], {"role": "system", "content": f"{SUMMARY_PREFIX}summary of 6 messages"})
+        self.assertEqual(messages[1:], history[-2:])
+        self.assertGreater(trimmed, 0)
+
+        # The same history reuses the cached summary
+        manager.compact(history)
+        self.assertEqual(len(calls), 1)
+
+        # One more turn only summarizes the newly dropped messages
+        manager.compact(make_history(5))
+        self.assertEqual(calls[1], ("summary of 6 messages", ["question 3 about Timal", "answer 3"]))
+
+    def test_failed_summary_falls_back_to_trimming(self):
+        """Test a summarizer error still returns the trimmed history"""
+        def summarize(previous_summary, messages):
+            raise RuntimeError("rate limited")
+
+        manager = ConversationHistoryManager(count_words, max_tokens=20, summarize_fn=summarize)
+
+        messages, _trimmed = manager.compact(make_history(4))
+
+        self.assertEqual(messages, make_history(4)[-2:])
+
+    def test_acompact_uses_async_summarizer(self):
+        """Test the async path summarizes with asummarize_fn"""
+        async def asummarize(previous_summary, messages):
+            return "async summary"
+
+        manager = ConversationHistoryManager(count_words, max_tokens=20, asummarize_fn=asummarize)
+
+        messages, _trimmed = asyncio.run(manager.acompact(make_history(4)))
+
+        self.assertEqual(messages[0]["content"], f"{SUMMARY_PREFIX}async summary")
+
+
+if __name__ == "__main__":
+    unittest.main()
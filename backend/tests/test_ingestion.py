@@ -0,0 +1,95 @@
+import unittest
+import os
+import time
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from ingestion import IngestionQueue
+
+
+class FakeDocumentProcessor:
+    """Returns a fixed number of pages and chunks without parsing"""
+
+    def __init__(self, pages=3, chunks_per_page=5, fail=False):
+        self.pages = pages
+        self.chunks_per_page = chunks_per_page
+        self.fail = fail
+
+    def iter_pdf_chunks(self, file_content, filename, progress_callback=None):
+        if self.fail:
+            raise ValueError("Corrupt PDF")
+        for page in range(self.pages):
+            progress_callback("parsed", 1)
+            progress_callback("split", self.chunks_per_page)
+            for _ in range(self.chunks_per_page):
+                yield Document(page_content="chunk", metadata={"source": filename, "page": page})
+
+
+class FakeVectorStoreManager:
+    """Records batches instead of embedding them"""
+
+    def __init__(self, batch_size=4):
+        self.batch_size = batch_size
+        self.batches = []
+
+    def add_document_stream(self, source, chunks, progress_callback=None):
+        documents = list(chunks)
+        for start in range(0, len(documents), self.batch_size):
+            batch = documents[start:start + self.batch_size]
+            self.batches.append(len(batch))
+            progress_callback("embedded", len(batch))
+            progress_callback("upserted", len(batch))
+        return len(documents)
+
+
+def wait_for(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while job.finished_at is None and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+class TestIngestionQueue(unittest.TestCase):
+    """Test cases for background PDF ingestion"""
+
+    def test_job_reports_progress(self):
+        """Test a completed job reports pages, chunks and vectors in batches"""
+        vector_store_manager = FakeVectorStoreManager()
+        queue = IngestionQueue(FakeDocumentProcessor(), vector_store_manager, max_workers=2)
+
+        job = wait_for(queue.submit(b"%PDF", "cv.pdf"))
+
+        self.assertEqual(job.status, "completed")
+        self.assertEqual((job.pages_parsed, job.chunks_total), (3, 15))
+        self.assertEqual((job.chunks_embedded, job.vectors_upserted), (15, 15))
+        self.assertEqual(vector_store_manager.batches, [4, 4, 4, 3])
+        self.assertIs(queue.get(job.job_id), job)
+
+    def test_failed_job_records_error(self):
+        """Test a parsing failure marks the job as failed"""
+        queue = IngestionQueue(FakeDocumentProcessor(fail=True), FakeVectorStoreManager(), max_workers=1)
+
+        job = wait_for(queue.submit(b"not a pdf", "broken.pdf"))
+
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Corrupt PDF", job.error)
+
+    def test_job_runs_inline_when_not_in_background(self):
+        """Test submit returns the finished job when background processing is off"""
+        queue = IngestionQueue(FakeDocumentProcessor(), FakeVectorStoreManager(), max_workers=1, background=False)
+
+        job = queue.submit(b"%PDF", "cv.pdf")
+
+        self.assertEqual((job.status, job.vectors_upserted), ("completed", 15))
+
+    def test_unknown_job(self):
+        """Test unknown job ids return None"""
+        queue = IngestionQueue(FakeDocumentProcessor(), FakeVectorStoreManager(), max_workers=1)
+        self.assertIsNone(queue.get("missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+import tempfile
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_index import KeywordIndex, tokenize
+
+
+class TestKeywordIndex(unittest.TestCase):
+    """Test cases for the BM25 keyword index"""
+
+    def setUp(self):
+        self.index = KeywordIndex()
+        self.index.add(
+            ["a", "b", "c"],
+            [
+                "Timal built JARVIS with FastAPI and React",
+                "Timal passed the AZ-900 Azure Fundamentals exam",
+                "Timal studied software engineering at RMIT",
+            ],
+            [{"source": "cv.pdf", "page": 0}, {"source": "certs.pdf", "page": 0}, {"source": "cv.pdf", "page": 1}]
+        )
+
+    def test_tokenize_keeps_codes_and_parts(self):
+        """Test compound terms are indexed whole and split, without stopwords"""
+        self.assertEqual(tokenize("The AZ-900 and C++ exams"), ["az-900", "az", "900", "c++", "exams"])
+
+    def test_exact_terms_rank_first(self):
+        """Test chunks containing the rare query term rank first, with metadata"""
+        results = self.index.search("AZ-900 certification", k=2)
+
+        self.assertEqual(len(results), 1)
+        doc, score = results[0]
+        self.assertIn("AZ-900", doc.page_content)
+        self.assertEqual(doc.metadata, {"source": "certs.pdf", "page": 0})
+        self.assertGreater(score, 0)
+
+    def test_incremental_updates(self):
+        """Test replaced and deleted chunks no longer match"""
+        self.index.add(["b"], ["Timal passed the AWS SAA-C03 exam"])
+        self.index.delete(["a"])
+
+        self.assertEqual(self.index.search("AZ-900"), [])
+        self.assertEqual(self.index.search("FastAPI"), [])
+        self.assertEqual(len(self.index.search("SAA-C03")), 1)
+        self.assertEqual(len(self.index), 2)
+
+    def test_persistence(self):
+        """Test the index is rebuilt from disk"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "keyword_index.json")
+            index = KeywordIndex(path)
+            index.add(["a"], ["Timal built JARVIS"], [{"source": "cv.pdf"}])
+            index.save()
+
+            results = KeywordIndex(path).search("JARVIS")
+
+            self.assertEqual(results[0][0].metadata, {"source": "cv.pdf"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import patch
+
+import config
+import embeddings as embeddings_module
+from local_embeddings import LocalEmbeddings
+
+
+class RecordingEncoder:
+    """Encoder stand-in that records the size of every forward pass"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(len(texts))
+        if self.fail:
+            raise RuntimeError("model failed")
+        return np.array([[len(text), 1.0, 0.0] for text in texts], dtype=np.float32)
+
+
+class TestLocalEmbeddings(unittest.TestCase):
+    """Test cases for the batched local embedding engine"""
+
+    def make_embeddings(self, encoder, batch_size=8, max_wait_ms=50):
+        return LocalEmbeddings(model_name="test", batch_size=batch_size, max_wait_ms=max_wait_ms, encoder=encoder)
+
+    def test_vectors_are_normalized_and_ordered(self):
+        embeddings = self.make_embeddings(RecordingEncoder())
+
+        vectors = embeddings.embed_documents(["a", "bbb"])
+        self.assertEqual(len(vectors), 2)
+        for vector in vectors:
+            self.assertAlmostEqual(float(np.linalg.norm(vector)), 1.0, places=5)
+        self.assertGreater(vectors[1][0], vectors[0][0])
+
+    def test_concurrent_queries_share_a_forward_pass(self):
+        encoder = RecordingEncoder()
+        embeddings = self.make_embeddings(encoder, batch_size=64, max_wait_ms=200)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(embeddings.embed_query, [f"query {i}" for i in range(8)]))
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(sum(encoder.batches), 8)
+        self.assertLess(len(encoder.batches), 8)
+
+    def test_documents_are_split_at_batch_size(self):
+        encoder = RecordingEncoder()
+        embeddings = self.make_embeddings(encoder, batch_size=4, max_wait_ms=0)
+
+        vectors = embeddings.embed_documents([f"chunk {i}" for i in range(10)])
+        self.assertEqual(len(vectors), 10)
+        self.assertTrue(all(size <= 4 for size in encoder.batches))
+
+    def test_errors_reach_every_caller(self):
+        embeddings = self.make_embeddings(RecordingEncoder(fail=True))
+
+        with self.assertRaises(RuntimeError):
+            embeddings.embed_query("query")
+        with self.assertRaises(RuntimeError):
+            asyncio.run(embeddings.aembed_documents(["a", "b"]))
+
+    def test_async_and_warm_up(self):
+        encoder = RecordingEncoder()
+        embeddings = self.make_embeddings(encoder)
+
+        self.assertEqual(embeddings.warm_up(), 3)
+        vector = asyncio.run(embeddings.aembed_query("query"))
+        self.assertEqual(vector, embeddings.embed_query("query"))
+        self.assertEqual(asyncio.run(embeddings.aembed_documents([])), [])
+
+    def test_fallback_model_names_its_cache_keys(self):
+        """Test cached query vectors are keyed by the model actually in use, not the configured one"""
+        with patch.object(config, "EMBEDDING_PROVIDER", "openai"), \
+                patch.object(config, "LOCAL_EMBEDDING_WARM_UP", False), \
+                patch.object(embeddings_module, "OpenAIEmbeddings", side_effect=ValueError("no API key")):
+            fallback = embeddings_module.get_embeddings_model()
+
+        self.assertIsInstance(fallback, LocalEmbeddings)
+        self.assertEqual(embeddings_module.embedding_model_name(fallback), config.LOCAL_EMBEDDING_MODEL)
+        self.assertNotEqual(embeddings_module.embedding_model_name(fallback), config.EMBEDDING_MODEL)
+
+
+if __name__ == "__main__":
+    unittest.main()
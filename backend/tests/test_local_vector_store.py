@@ -0,0 +1,146 @@
+import unittest
+import os
+import tempfile
+import threading
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import Embeddings
+
+from local_vector_store import InvalidFilterError, LocalVectorStore, matches_filter, validate_filter
+
+
+class KeywordEmbeddings(Embeddings):
+    """Deterministic embeddings: one dimension per known keyword"""
+
+    KEYWORDS = ["python", "react", "aws", "rmit"]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        text = text.lower()
+        return [float(keyword in text) + 0.01 for keyword in self.KEYWORDS]
+
+
+class TestLocalVectorStore(unittest.TestCase):
+    """Test cases for the in-process vector index"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = LocalVectorStore(KeywordEmbeddings(), path=self.tmp_dir.name)
+        self.store.add_texts(
+            ["Built APIs in Python", "Frontend work in React", "Certified on AWS"],
+            metadatas=[{"source": "cv.pdf", "page": 0}, {"source": "cv.pdf", "page": 1}, {"source": "certs.pdf"}],
+            ids=["python", "react", "aws"]
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_top_k_ordering(self):
+        """Test the most similar document is returned first with its metadata"""
+        results = self.store.similarity_search_by_vector_with_score(KeywordEmbeddings().embed_query("aws"), k=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0].page_content, "Certified on AWS")
+        self.assertEqual(results[0][0].metadata, {"source": "certs.pdf"})
+        self.assertGreater(results[0][1], results[1][1])
+
+    def test_batched_search(self):
+        """Test one result list is returned per query"""
+        embeddings = KeywordEmbeddings()
+        results = self.store.similarity_search_by_vectors_with_score(
+            [embeddings.embed_query("react"), embeddings.embed_query("python")], k=1
+        )
+        self.assertEqual([r[0][0].page_content for r in results], ["Frontend work in React", "Built APIs in Python"])
+
+    def test_upsert_overwrites_existing_id(self):
+        """Test adding an existing id replaces it instead of duplicating"""
+        self.store.add_texts(["Studied at RMIT"], ids=["python"])
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.similarity_search("rmit", k=1)[0].page_content, "Studied at RMIT")
+
+    def test_persistence_and_delete(self):
+        """Test the index reloads from disk and deletions persist"""
+        self.store.delete(ids=["react"])
+        reloaded = LocalVectorStore(KeywordEmbeddings(), path=self.tmp_dir.name)
+        self.assertEqual(len(reloaded), 2)
+        self.assertEqual(reloaded.similarity_search("python", k=1)[0].page_content, "Built APIs in Python")
+
+        reloaded.delete(delete_all=True)
+        self.assertEqual(reloaded.similarity_search("python", k=1), [])
+
+    def test_streamed_upserts_are_saved_once(self):
+        """Test upserts with save=False append in memory and persist on save()"""
+        reloaded = LocalVectorStore(KeywordEmbeddings(), path=self.tmp_dir.name)
+        for batch in range(50):
+            reloaded.add_vectors(
+                [[1.0, 0.0, 0.0, 0.0]] * 4, [f"batch {batch}"] * 4, ids=[f"{batch}-{i}" for i in range(4)], save=False
+            )
+        self.assertEqual(len(reloaded), 203)
+        self.assertEqual(len(LocalVectorStore(KeywordEmbeddings(), path=self.tmp_dir.name)), 3)
+
+        reloaded.save()
+        self.assertEqual(len(LocalVectorStore(KeywordEmbeddings(), path=self.tmp_dir.name)), 203)
+
+    def test_searches_during_upserts_see_consistent_snapshots(self):
+        """Test filtered searches never mix rows from before and after a concurrent upsert"""
+        errors = []
+        done = threading.Event()
+        query = KeywordEmbeddings().embed_query("python")
+
+        def search():
+            while not done.is_set():
+                try:
+                    for doc, _score in self.store.similarity_search_by_vector_with_score(query, k=5, filter={"source": "cv.pdf"}):
+                        self.assertEqual(doc.metadata["source"], "cv.pdf")
+                    self.store.similarity_search_by_vectors_with_score([query], k=5)
+                except Exception as e:
+                    errors.append(e)
+
+        searchers = [threading.Thread(target=search) for _ in range(4)]
+        for thread in searchers:
+            thread.start()
+        for batch in range(200):
+            self.store.add_vectors(
+                [[1.0, 0.0, 0.0, 0.0]] * 2, [f"Python {batch}"] * 2,
+                metadatas=[{"source": "cv.pdf"}, {"source": "other.pdf"}], ids=[f"{batch}-a", f"{batch}-b"], save=False
+            )
+            self.store.add_vectors([[0.0, 1.0, 0.0, 0.0]], ["Frontend work in React v2"], ids=["react"], save=False)
+        done.set()
+        for thread in searchers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.store), 403)
+
+
+
+class TestMatchesFilter(unittest.TestCase):
+    """Test cases for Pinecone-style metadata filters"""
+
+    def test_operators(self):
+        """Test equality, comparison, membership and boolean clauses"""
+        metadata = {"source": "cv.pdf", "page": 2}
+
+        self.assertTrue(matches_filter(metadata, None))
+        self.assertTrue(matches_filter(metadata, {"source": "cv.pdf"}))
+        self.assertFalse(matches_filter(metadata, {"source": {"$ne": "cv.pdf"}}))
+        self.assertTrue(matches_filter(metadata, {"source": {"$in": ["cv.pdf", "certs.pdf"]}, "page": {"$gte": 2}}))
+        self.assertFalse(matches_filter(metadata, {"page": {"$lt": 2}}))
+        self.assertTrue(matches_filter(metadata, {"$or": [{"source": "certs.pdf"}, {"page": 2}]}))
+        self.assertFalse(matches_filter(metadata, {"$and": [{"source": "cv.pdf"}, {"page": 3}]}))
+
+    def test_unsupported_operators_are_rejected(self):
+        """Test malformed filters raise InvalidFilterError rather than KeyError"""
+        validate_filter({"$or": [{"source": "cv.pdf"}, {"page": {"$in": [1, 2]}}]})
+        for filter in [{"page": {"$bogus": 1}}, {"$nor": []}, {"$and": "cv.pdf"}, {"page": {"$in": 2}}]:
+            with self.assertRaises(InvalidFilterError):
+                validate_filter(filter)
+        with self.assertRaises(InvalidFilterError):
+            matches_filter({"page": 1}, {"page": {"$bogus": 1}})
+
+
+if __name__ == "__main__":
+    unittest.main()
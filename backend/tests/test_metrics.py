@@ -0,0 +1,77 @@
+import unittest
+import os
+from fastapi.testclient import TestClient
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+from api import app
+from pipeline import IngestionPipeline
+
+
+class TestMetricTypes(unittest.TestCase):
+    """Test cases for the metric types and text exposition"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram("test_latency_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0), register=False)
+        histogram.observe(0.05, stage="a")
+        histogram.observe(0.5, stage="a")
+        histogram.observe(5, stage="a")
+
+        lines = histogram.render()
+        self.assertIn('test_latency_seconds_bucket{stage="a",le="0.1"} 1', lines)
+        self.assertIn('test_latency_seconds_bucket{stage="a",le="1"} 2', lines)
+        self.assertIn('test_latency_seconds_bucket{stage="a",le="+Inf"} 3', lines)
+        self.assertIn('test_latency_seconds_sum{stage="a"} 5.55', lines)
+        self.assertIn('test_latency_seconds_count{stage="a"} 3', lines)
+
+    def test_counter_and_label_escaping(self):
+        counter = metrics.Counter("test_events_total", "Test events", ("name",), register=False)
+        counter.inc(name='say "hi"')
+        counter.inc(2, name='say "hi"')
+
+        self.assertEqual(counter.value(name='say "hi"'), 3)
+        self.assertIn('test_events_total{name="say \\"hi\\""} 3', counter.render())
+
+    def test_callback_gauge_skips_failing_callbacks(self):
+        gauge = metrics.CallbackGauge("test_ratio", "Test ratio", ("cache",), register=False)
+        gauge.set_function(lambda: {("a",): 0.25})
+        gauge.set_function(lambda: 1 / 0)
+
+        self.assertIn('test_ratio{cache="a"} 0.25', gauge.render())
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for the stage timings and the /metrics endpoint"""
+
+    def test_pipeline_records_embed_and_upsert_stages(self):
+        embed_count = metrics.INGESTION_STAGE_SECONDS.count(stage="embed")
+        upsert_count = metrics.INGESTION_STAGE_SECONDS.count(stage="upsert")
+
+        pipeline = IngestionPipeline(
+            embed_fn=lambda texts: [[0.0] for _ in texts],
+            upsert_fn=lambda ids, vectors, texts, metadatas: None,
+            embed_batch_size=2,
+            upsert_batch_size=2,
+        )
+        pipeline.run(["a", "b", "c"], ["x", "y", "z"], [{}, {}, {}])
+
+        self.assertEqual(metrics.INGESTION_STAGE_SECONDS.count(stage="embed"), embed_count + 2)
+        self.assertEqual(metrics.INGESTION_STAGE_SECONDS.count(stage="upsert"), upsert_count + 2)
+
+    def test_metrics_endpoint(self):
+        client = TestClient(app)
+        client.get("/")
+
+        response = client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("# TYPE jarvis_query_stage_seconds histogram", response.text)
+        self.assertIn(
+            'jarvis_http_request_duration_seconds_count{method="GET",route="/",status="200"}', response.text
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import os
+import tempfile
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+from unittest.mock import patch
+
+import config
+from benchmarks.fakes import HashEmbeddings
+from keyword_index import KeywordIndex
+from local_vector_store import LocalVectorStore
+from manifest import IngestionManifest
+from migrate_embeddings import EmbeddingMigration, MigrationCheckpoint, cutover, local_target
+from vector_store import EmbeddingDimensionError, VectorStoreManager
+
+
+class FlakyEmbeddings(HashEmbeddings):
+    """HashEmbeddings that fail after embedding a given number of texts"""
+
+    def __init__(self, dimension: int, fail_after: int = None):
+        super().__init__(dimension=dimension)
+        self.fail_after = fail_after
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        if self.fail_after is not None and self.embedded + len(texts) > self.fail_after:
+            raise RuntimeError("embeddings API down")
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+class TestEmbeddingMigration(unittest.TestCase):
+    """Test cases for re-embedding the index into a new dimension"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = VectorStoreManager(
+            embeddings=HashEmbeddings(dimension=16), vector_store=LocalVectorStore(HashEmbeddings(dimension=16)),
+            manifest=IngestionManifest(), keyword_index=KeywordIndex(), namespace=""
+        )
+        self.source.add_documents([
+            Document(page_content=f"timal python aws chunk {i}", metadata={"source": "cv.pdf", "page": i})
+            for i in range(10)
+        ])
+        self.target_path = os.path.join(self.directory.name, "index-8")
+        self.checkpoint_path = os.path.join(self.directory.name, "migration.checkpoint")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def migrate(self, embeddings, checkpoint_every=2):
+        checkpoint = MigrationCheckpoint(self.checkpoint_path, {"target": self.target_path, "dimension": 8})
+        upsert, save = local_target(self.source, self.target_path, 8, embeddings)
+        return EmbeddingMigration(
+            self.source, embeddings, upsert, checkpoint, batch_size=2, concurrency=2,
+            flush_fn=save, checkpoint_every=checkpoint_every
+        ).run()
+
+    def test_chunks_are_reembedded_with_the_same_ids(self):
+        report = self.migrate(FlakyEmbeddings(dimension=8))
+
+        self.assertEqual((report["total"], report["migrated"], report["missing"]), (10, 10, []))
+        target = LocalVectorStore(HashEmbeddings(dimension=8), path=self.target_path)
+        self.assertEqual(target.dimension, 8)
+        self.assertEqual(sorted(target._ids), sorted(self.source.vector_store._ids))
+        self.assertEqual(sorted(target._texts), sorted(self.source.vector_store._texts))
+
+    def test_interrupted_migration_resumes_from_the_checkpoint(self):
+        with patch.object(config, "INGESTION_MAX_RETRIES", 0), self.assertRaises(RuntimeError):
+            self.migrate(FlakyEmbeddings(dimension=8, fail_after=4))
+
+        embeddings = FlakyEmbeddings(dimension=8)
+        report = self.migrate(embeddings)
+        self.assertEqual(report["missing"], [])
+        self.assertEqual(report["resumed"] + report["migrated"], 10)
+        self.assertEqual(embeddings.embedded, report["migrated"])
+        self.assertLess(report["migrated"], 10)
+
+    def test_target_index_is_saved_once_per_checkpoint(self):
+        with patch.object(LocalVectorStore, "_save", autospec=True, side_effect=LocalVectorStore._save) as save:
+            report = self.migrate(FlakyEmbeddings(dimension=8), checkpoint_every=3)
+
+        # Five batches of two: one checkpoint after three batches, one for the rest
+        self.assertEqual(report["missing"], [])
+        self.assertEqual(save.call_count, 2)
+        with open(self.checkpoint_path) as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+
+    def test_checkpoint_of_another_migration_is_rejected(self):
+        MigrationCheckpoint(self.checkpoint_path, {"target": "jarvis-512", "dimension": 512})
+        with self.assertRaises(ValueError):
+            MigrationCheckpoint(self.checkpoint_path, {"target": "jarvis-256", "dimension": 256})
+
+    def test_cutover_writes_env_file(self):
+        env_path = os.path.join(self.directory.name, ".env")
+        with open(env_path, "w") as f:
+            f.write("OPENAI_API_KEY=key\nEMBEDDING_DIMENSION=1024\n")
+
+        cutover(env_path, {"EMBEDDING_DIMENSION": "512", "PINECONE_INDEX_NAME": "jarvis-512"})
+
+        with open(env_path) as f:
+            self.assertEqual(f.read().split(), ["OPENAI_API_KEY=key", "EMBEDDING_DIMENSION=512", "PINECONE_INDEX_NAME=jarvis-512"])
+
+
+class TestDimensionCheck(unittest.TestCase):
+    """Test cases for the startup index dimension check"""
+
+    def test_mismatched_local_index_fails_fast(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.object(config, "LOCAL_INDEX_PATH", os.path.join(directory, "index")), \
+                patch.object(config, "VECTOR_STORE_BACKEND", "local"), \
+                patch.object(config, "VECTOR_STORE_NAMESPACE", ""):
+            LocalVectorStore(HashEmbeddings(dimension=16), path=config.LOCAL_INDEX_PATH).add_texts(["timal"])
+
+            def build(**kwargs):
+                return VectorStoreManager(
+                    embeddings=HashEmbeddings(dimension=8), manifest=IngestionManifest(),
+                    keyword_index=KeywordIndex(), **kwargs
+                )
+
+            with patch.object(config, "EMBEDDING_DIMENSION", 8), self.assertRaises(EmbeddingDimensionError):
+                build()
+            with patch.object(config, "EMBEDDING_DIMENSION", 8):
+                self.assertEqual(build(verify_dimension=False).vector_store.dimension, 16)
+            with patch.object(config, "EMBEDDING_DIMENSION", 16):
+                self.assertEqual(len(build().vector_store), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import os
+import threading
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import IngestionPipeline
+
+
+class TestIngestionPipeline(unittest.TestCase):
+    """Test cases for the batched embedding and upsert pipeline"""
+
+    def setUp(self):
+        self.upserted = {}
+        self.lock = threading.Lock()
+
+    def upsert(self, ids, vectors, texts, metadatas):
+        with self.lock:
+            for doc_id, vector in zip(ids, vectors):
+                self.upserted[doc_id] = vector
+
+    def test_batches_and_progress(self):
+        """Test every chunk is embedded and upserted with its own vector"""
+        embed_calls = []
+
+        def embed(texts):
+            embed_calls.append(len(texts))
+            return [[float(len(text))] for text in texts]
+
+        progress = {"embedded": 0, "upserted": 0}
+        pipeline = IngestionPipeline(embed, self.upsert, embed_batch_size=4, upsert_batch_size=3)
+        texts = ["x" * i for i in range(10)]
+        stats = pipeline.run([str(i) for i in range(10)], texts, [{}] * 10,
+                             progress_callback=lambda stage, count: progress.__setitem__(stage, progress[stage] + count))
+
+        self.assertEqual(embed_calls, [4, 4, 2])
+        self.assertEqual(self.upserted, {str(i): [float(i)] for i in range(10)})
+        self.assertEqual(progress, {"embedded": 10, "upserted": 10})
+        self.assertEqual(stats["chunks"], 10)
+
+    def test_failed_batch_is_retried(self):
+        """Test a transient failure is retried rather than failing the upload"""
+        failures = {"left": 1}
+
+        def flaky_embed(texts):
+            if failures["left"]:
+                failures["left"] -= 1
+                raise ConnectionError("rate limited")
+            return [[0.0] for _ in texts]
+
+        pipeline = IngestionPipeline(flaky_embed, self.upsert, embed_batch_size=2, max_retries=2, retry_backoff=0)
+        stats = pipeline.run(["a", "b"], ["a", "b"], [{}, {}])
+
+        self.assertEqual(stats["retries"], 1)
+        self.assertEqual(len(self.upserted), 2)
+
+    def test_exhausted_retries_raise(self):
+        """Test a batch that keeps failing surfaces the error"""
+        def broken_embed(texts):
+            raise ConnectionError("down")
+
+        pipeline = IngestionPipeline(broken_embed, self.upsert, max_retries=1, retry_backoff=0)
+        with self.assertRaises(ConnectionError):
+            pipeline.run(["a"], ["a"], [{}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import os
+import asyncio
+import time
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from keyword_index import KeywordIndex
+from llm import LLMManager
+from manifest import IngestionManifest
+from resilience import CircuitBreaker, CircuitOpenError, InvalidRequestError
+from vector_store import VectorStoreManager
+from tests.test_vector_store import CountingEmbeddings
+
+
+class FakeClock:
+    """Controllable time source for reset timeouts"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FailingVectorStore:
+    """Vector store that is down, counting how often it is queried"""
+
+    def __init__(self):
+        self.queries = 0
+
+    def similarity_search_by_vector_with_score(self, embedding, k=4, **kwargs):
+        self.queries += 1
+        raise ConnectionError("pinecone unavailable")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for the per-dependency circuit breaker"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("retrieval", failure_threshold=2, reset_timeout=30, clock=self.clock)
+
+    def fail(self):
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(self.raise_error)
+
+    @staticmethod
+    def raise_error():
+        raise ConnectionError("down")
+
+    def test_opens_after_consecutive_failures(self):
+        """Test calls are rejected without running once the threshold is reached"""
+        self.fail()
+        self.assertEqual(self.breaker.snapshot()["state"], "closed")
+        self.fail()
+
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: "ok")
+        self.assertEqual(self.breaker.snapshot()["total_rejected"], 1)
+
+    def test_half_open_trial_closes_or_reopens(self):
+        """Test a single trial is let through after the reset timeout"""
+        self.fail()
+        self.fail()
+        self.clock.now += 31
+
+        self.fail()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: "ok")
+
+        self.clock.now += 31
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.snapshot()["state"], "closed")
+
+    def test_client_errors_do_not_count_as_failures(self):
+        """Test invalid requests and 4xx responses are raised without opening the breaker"""
+        class BadRequest(Exception):
+            status = 400
+
+        def raise_error(error):
+            raise error
+
+        for error in [InvalidRequestError("bad filter"), BadRequest("invalid filter"), InvalidRequestError("bad filter")]:
+            with self.assertRaises(type(error)):
+                self.breaker.call(raise_error, error)
+
+        self.assertEqual(self.breaker.snapshot()["state"], "closed")
+        self.assertEqual(self.breaker.snapshot()["total_failures"], 0)
+
+    def test_timeouts_count_as_failures(self):
+        """Test slow sync and async calls are cut off"""
+        breaker = CircuitBreaker("llm", timeout=0.05, failure_threshold=2)
+
+        with self.assertRaises(TimeoutError):
+            breaker.call(time.sleep, 1)
+        with self.assertRaises(TimeoutError):
+            asyncio.run(breaker.acall(asyncio.sleep, 1))
+        self.assertEqual(breaker.snapshot()["state"], "open")
+
+
+class TestRetrievalFallback(unittest.TestCase):
+    """Test cases for answering without context when retrieval is down"""
+
+    def setUp(self):
+        self.vector_store = FailingVectorStore()
+        self.vector_store_manager = VectorStoreManager(
+            embeddings=CountingEmbeddings(), vector_store=self.vector_store, manifest=IngestionManifest(),
+            keyword_index=KeywordIndex()
+        )
+        self.vector_store_manager.retrieval_breaker = CircuitBreaker("retrieval", failure_threshold=2)
+        self.llm = FakeListChatModel(responses=["answer", "second answer"])
+        self.llm_manager = LLMManager(vector_store_manager=self.vector_store_manager, llm=self.llm)
+
+    def test_single_llm_call_without_context(self):
+        """Test a retrieval failure costs one LLM call and is reported"""
+        result = self.llm_manager.generate_response_with_rag("Who is Timal?")
+
+        self.assertEqual(result["answer"], "answer")
+        self.assertFalse(result["context_used"])
+        self.assertIn("pinecone unavailable", result["error"])
+        self.assertEqual(self.llm.i, 1)
+
+    def test_open_breaker_skips_retrieval(self):
+        """Test retrieval is not attempted once its breaker is open"""
+        for _ in range(4):
+            result = asyncio.run(self.llm_manager.agenerate_response_with_rag("Who is Timal?"))
+
+        self.assertEqual(self.vector_store.queries, 2)
+        self.assertIn("circuit is open", result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
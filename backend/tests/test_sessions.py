@@ -0,0 +1,90 @@
+import unittest
+import os
+import tempfile
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sessions import InMemorySessionStore, SQLiteSessionStore
+
+
+class FakeClock:
+    """Controllable time source for TTL tests"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def turn(i):
+    return [{"role": "user", "content": f"question {i}"}, {"role": "assistant", "content": f"answer {i}"}]
+
+
+class TestInMemorySessionStore(unittest.TestCase):
+    """Test cases for the default in-process session store"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = InMemorySessionStore(max_sessions=2, ttl_seconds=60, max_messages=4, clock=self.clock)
+
+    def test_append_creates_and_extends_session(self):
+        """Test history accumulates, keeps the newest messages and remembers the system prompt"""
+        self.assertIsNone(self.store.get("a"))
+
+        self.store.append("a", turn(0), system_prompt="Be brief")
+        self.store.append("a", turn(1))
+        self.store.append("a", turn(2))
+
+        session = self.store.get("a")
+        self.assertEqual(session["history"], turn(1) + turn(2))
+        self.assertEqual(session["system_prompt"], "Be brief")
+
+    def test_least_recently_used_session_is_evicted(self):
+        """Test the store holds at most max_sessions"""
+        self.store.append("a", turn(0))
+        self.store.append("b", turn(0))
+        self.store.get("a")
+        self.store.append("c", turn(0))
+
+        self.assertIsNotNone(self.store.get("a"))
+        self.assertIsNone(self.store.get("b"))
+
+    def test_idle_session_expires(self):
+        """Test sessions expire ttl_seconds after their last message"""
+        self.store.append("a", turn(0))
+        self.clock.now += 61
+
+        self.assertIsNone(self.store.get("a"))
+
+    def test_delete(self):
+        """Test deleting reports whether the session existed"""
+        self.store.append("a", turn(0))
+
+        self.assertTrue(self.store.delete("a"))
+        self.assertFalse(self.store.delete("a"))
+
+
+class TestSQLiteSessionStore(unittest.TestCase):
+    """Test cases for the SQLite session store"""
+
+    def test_sessions_persist_across_instances(self):
+        """Test a session written by one store is read by another on the same file"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "sessions.db")
+            clock = FakeClock()
+
+            SQLiteSessionStore(path, ttl_seconds=60, max_messages=4, clock=clock).append("a", turn(0), "Be brief")
+            store = SQLiteSessionStore(path, ttl_seconds=60, max_messages=4, clock=clock)
+            store.append("a", turn(1))
+            store.append("a", turn(2))
+
+            self.assertEqual(store.get("a"), {"history": turn(1) + turn(2), "system_prompt": "Be brief"})
+
+            clock.now += 61
+            self.assertIsNone(store.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
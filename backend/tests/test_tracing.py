@@ -0,0 +1,157 @@
+import unittest
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services
+import tracing
+from api import app
+from benchmarks.fakes import FakeChatModel, build_components
+from keyword_index import KeywordIndex
+from local_vector_store import LocalVectorStore
+from manifest import IngestionManifest
+from vector_store import VectorStoreManager
+from tests.test_api import FailingChatModel
+from tests.test_vector_store import CountingEmbeddings, pages
+
+
+class CollectingExporter:
+    """Keeps finished spans in memory"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def named(self, name):
+        return [span for span in self.spans if span.name == name]
+
+
+class TracingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = CollectingExporter()
+        self.previous_exporter = tracing.set_exporter(self.exporter)
+
+    def tearDown(self):
+        tracing.set_exporter(self.previous_exporter)
+
+
+class TestSpans(TracingTestCase):
+    """Test cases for span nesting, context propagation and export"""
+
+    def test_nested_spans_share_the_trace(self):
+        with tracing.span("outer", k=4) as outer:
+            with tracing.span("inner"):
+                pass
+
+        inner_span, outer_span = self.exporter.spans
+        self.assertEqual(inner_span.trace_id, outer.trace_id)
+        self.assertEqual(inner_span.parent_id, outer.span_id)
+        self.assertIsNone(outer_span.parent_id)
+        self.assertEqual(outer_span.to_dict()["attributes"], {"k": 4})
+
+    def test_exception_is_recorded_and_reraised(self):
+        with self.assertRaises(ValueError):
+            with tracing.span("failing"):
+                raise ValueError("boom")
+
+        exported = self.exporter.spans[0].to_dict()
+        self.assertEqual(exported["status"]["status_code"], "ERROR")
+        self.assertEqual(exported["events"][0]["attributes"]["exception.message"], "boom")
+
+    def test_bind_carries_the_parent_into_threads(self):
+        def work():
+            with tracing.span("worker"):
+                pass
+
+        with tracing.request_context("req-1"), tracing.span("request") as root:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(tracing.bind(work)).result()
+
+        worker = self.exporter.named("worker")[0]
+        self.assertEqual(worker.parent_id, root.span_id)
+        self.assertEqual(worker.attributes["request.id"], "req-1")
+
+    def test_disabled_tracing_exports_nothing(self):
+        tracing.set_exporter(None)
+        with tracing.span("ignored") as span:
+            span.set_attribute("key", "value")
+        self.assertEqual(self.exporter.spans, [])
+
+    def test_ingestion_spans_nest_under_add_documents(self):
+        embeddings = CountingEmbeddings()
+        manager = VectorStoreManager(
+            embeddings=embeddings, vector_store=LocalVectorStore(embeddings), manifest=IngestionManifest(),
+            keyword_index=KeywordIndex()
+        )
+        manager.add_documents(pages("first page", "second page"))
+
+        add_span = self.exporter.named("vector_store.add_documents")[0]
+        self.assertEqual(add_span.attributes["ingestion.added"], 2)
+        for name in ("ingestion.embed_batch", "ingestion.upsert_batch"):
+            self.assertEqual(self.exporter.named(name)[0].parent_id, add_span.span_id)
+
+
+class TestRequestIds(TracingTestCase):
+    """Test cases for the request id header"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = TestClient(app)
+
+    def test_generated_request_id_is_the_trace_id(self):
+        response = self.client.get("/")
+        request_id = response.headers["X-Request-ID"]
+
+        root = self.exporter.named("GET /")[0]
+        self.assertEqual(root.trace_id, request_id)
+        self.assertEqual(root.attributes["request.id"], request_id)
+        self.assertEqual(root.attributes["http.status_code"], 200)
+
+    def test_incoming_request_id_is_echoed(self):
+        response = self.client.get("/", headers={"X-Request-ID": "upstream-123"})
+        self.assertEqual(response.headers["X-Request-ID"], "upstream-123")
+
+    def test_malformed_request_id_is_replaced(self):
+        response = self.client.get("/", headers={"X-Request-ID": "bad id\twith spaces"})
+        self.assertNotEqual(response.headers["X-Request-ID"], "bad id\twith spaces")
+        self.assertTrue(tracing.valid_request_id(response.headers["X-Request-ID"]))
+
+
+class TestStreamedRequestSpans(TracingTestCase):
+    """Test cases for the request span of streamed answers"""
+
+    def setUp(self):
+        super().setUp()
+        self.previous_components = dict(services._components)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        services._components.clear()
+        services._components.update(self.previous_components)
+        super().tearDown()
+
+    def stream(self, chat_model):
+        services._components.clear()
+        services._components.update(build_components(chat_model=chat_model))
+        self.client.post("/query/stream", json={"query": "What has Timal built?"})
+        return self.exporter.named("POST /query/stream")[-1]
+
+    def test_span_ends_after_the_last_token(self):
+        root = self.stream(FakeChatModel(token_latency=0.05, answer_tokens=5))
+        self.assertGreaterEqual(root.end_time - root.start_time, 0.2e9)
+        self.assertEqual(root.status_code, "UNSET")
+
+    def test_failed_stream_marks_the_span(self):
+        root = self.stream(FailingChatModel())
+        self.assertEqual(root.status_code, "ERROR")
+        self.assertIn("stream dropped", root.status_description)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,275 @@
+import unittest
+import os
+import asyncio
+import tempfile
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from unittest.mock import patch
+
+import config
+from keyword_index import KeywordIndex
+from local_vector_store import LocalVectorStore
+from manifest import IngestionManifest
+from vector_store import VectorStoreManager
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that count how many texts were embedded"""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+class KeywordEmbeddings(Embeddings):
+    """Embeds a text as counts of a few known words"""
+
+    WORDS = ["python", "aws", "django", "flask", "fastapi", "lambda", "scripts"]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        words = text.split()
+        return [float(words.count(word)) for word in self.WORDS]
+
+
+def pages(*texts, source="cv.pdf"):
+    return [Document(page_content=text, metadata={"source": source, "page": i}) for i, text in enumerate(texts)]
+
+
+class TestIncrementalIngestion(unittest.TestCase):
+    """Test cases for deterministic ids and incremental re-ingestion"""
+
+    def setUp(self):
+        self.embeddings = CountingEmbeddings()
+        self.store = LocalVectorStore(self.embeddings)
+        self.manager = VectorStoreManager(
+            embeddings=self.embeddings, vector_store=self.store, manifest=IngestionManifest(),
+            keyword_index=KeywordIndex()
+        )
+
+    def test_reupload_is_deduplicated(self):
+        """Test uploading the same document twice embeds it once"""
+        self.assertEqual(self.manager.add_documents(pages("Python", "React")), 2)
+        self.assertEqual(self.manager.add_documents(pages("Python", "React")), 0)
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.embeddings.embedded, 2)
+
+    def test_revised_document_replaces_stale_chunks(self):
+        """Test a revision embeds only changed chunks and deletes removed ones"""
+        self.manager.add_documents(pages("Python", "React", "AWS"))
+        self.manager.add_documents(pages("Python", "React and TypeScript"))
+
+        self.assertEqual(self.embeddings.embedded, 4)
+        self.assertEqual(sorted(self.store._texts), ["Python", "React and TypeScript"])
+        self.assertEqual(self.manager.manifest.sources()["cv.pdf"]["chunks"], 2)
+
+    def test_sources_are_independent(self):
+        """Test re-uploading one document leaves other documents intact"""
+        self.manager.add_documents(pages("Python", source="cv.pdf"))
+        self.manager.add_documents(pages("AWS", source="certs.pdf"))
+        self.manager.add_documents(pages("Python v2", source="cv.pdf"))
+
+        self.assertEqual(sorted(self.store._texts), ["AWS", "Python v2"])
+
+    def test_delete_all_resets_manifest(self):
+        """Test clearing the store lets the same document be ingested again"""
+        self.manager.add_documents(pages("Python"))
+        self.manager.delete_all()
+        self.assertEqual(self.manager.add_documents(pages("Python")), 1)
+
+    def test_keyword_index_follows_ingestion(self):
+        """Test the keyword index gains new chunks and loses stale ones"""
+        self.manager.add_documents(pages("Python", "AWS SAA-C03"))
+        self.manager.add_documents(pages("Python"))
+
+        self.assertEqual(len(self.manager.keyword_index), 1)
+        self.assertEqual(self.manager.keyword_index.search("SAA-C03"), [])
+
+
+class QueryOnlyEmbeddings:
+    """Embeddings without embed_documents, like a client used only for retrieval"""
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+class TestQueryOnlyEmbeddings(unittest.TestCase):
+    """Test cases for a manager whose embeddings can only embed queries"""
+
+    def test_manager_builds_and_retrieves(self):
+        store = LocalVectorStore(CountingEmbeddings())
+        store.add_texts(["Timal built JARVIS"], metadatas=[{"source": "cv.pdf", "page": 0}])
+        manager = VectorStoreManager(
+            embeddings=QueryOnlyEmbeddings(), vector_store=store, manifest=IngestionManifest(),
+            keyword_index=KeywordIndex()
+        )
+
+        with patch.object(config, "RETRIEVAL_MODE", "vector"):
+            docs = manager.similarity_search("Timal", k=1)
+        self.assertEqual([doc.page_content for doc in docs], ["Timal built JARVIS"])
+
+
+class TestHybridRetrieval(unittest.TestCase):
+    """Test cases for keyword and vector search fused by reciprocal rank"""
+
+    def setUp(self):
+        self.store = LocalVectorStore(CountingEmbeddings())
+        self.manager = VectorStoreManager(
+            embeddings=CountingEmbeddings(), vector_store=self.store, manifest=IngestionManifest(),
+            keyword_index=KeywordIndex()
+        )
+        # CountingEmbeddings ranks by text length, so the exact-term chunk is last by vector score
+        self.manager.add_documents(pages(
+            "Timal built JARVIS",
+            "Timal studied at RMIT",
+            "Certified AWS Solutions Architect, exam code SAA-C03 passed in 2023 with distinction"
+        ))
+
+    def test_exact_term_is_retrieved(self):
+        """Test a chunk matching an exact code ranks first although vector search misses it"""
+        vector_only = [doc.page_content for doc in self.store.similarity_search("SAA-C03", k=1)]
+        self.assertNotIn("SAA-C03", vector_only[0])
+
+        docs = self.manager.similarity_search("SAA-C03", k=1)
+
+        self.assertIn("SAA-C03", docs[0].page_content)
+
+    def test_async_matches_sync(self):
+        """Test the async path fuses the same rankings"""
+        sync_docs = self.manager.similarity_search("RMIT", k=2)
+        async_docs = asyncio.run(self.manager.asimilarity_search("RMIT", k=2))
+
+        self.assertEqual([doc.page_content for doc in async_docs], [doc.page_content for doc in sync_docs])
+        self.assertEqual(len({doc.page_content for doc in async_docs}), 2)
+
+
+
+class TestRetrievalParameters(unittest.TestCase):
+    """Test cases for per-request k, score threshold, metadata filters and MMR"""
+
+    def setUp(self):
+        self.embeddings = KeywordEmbeddings()
+        self.store = LocalVectorStore(self.embeddings)
+        self.manager = VectorStoreManager(
+            embeddings=self.embeddings, vector_store=self.store, manifest=IngestionManifest(),
+            keyword_index=KeywordIndex()
+        )
+        self.manager.add_documents(pages("python django", "python flask", "python fastapi", source="cv.pdf"))
+        self.manager.add_documents(pages("aws lambda", "python scripts on aws", source="certs.pdf"))
+
+    def search(self, query, **kwargs):
+        return [doc.page_content for doc in self.manager.similarity_search(query, **kwargs)]
+
+    def test_k_and_filter(self):
+        """Test k limits the results and the filter restricts them to one source"""
+        self.assertEqual(len(self.search("python", k=2)), 2)
+        self.assertEqual(self.search("python", k=5, filter={"source": "certs.pdf"}), ["python scripts on aws", "aws lambda"])
+
+    def test_score_threshold(self):
+        """Test vector matches below the threshold are dropped"""
+        with patch.object(config, "RETRIEVAL_MODE", "vector"):
+            self.assertEqual(self.search("aws", k=5, score_threshold=0.6), ["aws lambda"])
+
+    def test_mmr_diversifies(self):
+        """Test MMR picks a different topic over another near-identical python chunk"""
+        with patch.object(config, "RETRIEVAL_MODE", "vector"):
+            plain = self.search("python", k=2)
+            diverse = self.search("python", k=2, mmr=True, mmr_lambda=0.3)
+
+        self.assertTrue(all("python" in text for text in plain))
+        self.assertEqual(diverse[0], plain[0])
+        self.assertFalse({"python django", "python flask", "python fastapi"} >= set(diverse))
+
+
+class TestSourceManagement(unittest.TestCase):
+    """Test cases for per-source deletion and blue/green reindexing"""
+
+    def setUp(self):
+        self.embeddings = CountingEmbeddings()
+        self.manager = VectorStoreManager(
+            embeddings=self.embeddings, vector_store=LocalVectorStore(self.embeddings), manifest=IngestionManifest(),
+            keyword_index=KeywordIndex(), namespace=""
+        )
+        self.manager.add_documents(pages("Python", "React", source="cv.pdf"))
+        self.manager.add_documents(pages("AWS SAA-C03", source="certs.pdf"))
+
+    def test_delete_source(self):
+        """Test deleting one document leaves the others searchable"""
+        self.assertEqual(self.manager.delete_source("cv.pdf"), 2)
+        self.assertEqual(self.manager.delete_source("cv.pdf"), 0)
+
+        self.assertEqual(self.manager.vector_store._texts, ["AWS SAA-C03"])
+        self.assertEqual(list(self.manager.manifest.sources()), ["certs.pdf"])
+        self.assertEqual(self.manager.keyword_index.search("python"), [])
+
+    def test_reindex_swaps_namespace_and_embeds_only_the_source(self):
+        """Test a reindex re-embeds one document and copies the rest"""
+        old_store = self.manager.vector_store
+        embedded = self.embeddings.embedded
+
+        stats = self.manager.reindex_source("cv.pdf", pages("Python v2", source="cv.pdf"))
+
+        self.assertEqual(stats["namespace"], "blue")
+        self.assertEqual(stats["copied"], 1)
+        self.assertEqual(self.embeddings.embedded - embedded, 1)
+        self.assertIsNot(self.manager.vector_store, old_store)
+        self.assertEqual(sorted(self.manager.vector_store._texts), ["AWS SAA-C03", "Python v2"])
+        self.assertEqual(self.manager.manifest.namespace, "blue")
+        self.assertEqual(self.manager.manifest.sources()["cv.pdf"]["chunks"], 1)
+        self.assertEqual(len(self.manager.keyword_index.search("SAA-C03")), 1)
+
+        self.assertEqual(self.manager.reindex_source("certs.pdf", pages("AWS", source="certs.pdf"))["namespace"], "green")
+        self.assertEqual(sorted(self.manager.vector_store._texts), ["AWS", "Python v2"])
+
+    def test_failed_reindex_keeps_the_live_corpus(self):
+        """Test queries keep the old namespace if the rebuild fails"""
+        old_store = self.manager.vector_store
+
+        def failing_chunks():
+            yield from pages("Python v2", source="cv.pdf")
+            raise RuntimeError("parse failed")
+
+        with self.assertRaises(RuntimeError):
+            self.manager.reindex_source("cv.pdf", failing_chunks())
+
+        self.assertIs(self.manager.vector_store, old_store)
+        self.assertEqual(self.manager.namespace, "")
+        self.assertEqual(sorted(old_store._texts), ["AWS SAA-C03", "Python", "React"])
+
+    def test_reindexed_namespace_survives_restart(self):
+        """Test the swap is recorded so a restart reads the new namespace"""
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.object(config, "LOCAL_INDEX_PATH", os.path.join(directory, "index")), \
+                patch.object(config, "VECTOR_STORE_BACKEND", "local"), \
+                patch.object(config, "VECTOR_STORE_NAMESPACE", "jarvis"), \
+                patch.object(config, "EMBEDDING_DIMENSION", 2):
+            def build():
+                return VectorStoreManager(
+                    embeddings=self.embeddings, manifest=IngestionManifest(os.path.join(directory, "manifest.json")),
+                    keyword_index=KeywordIndex(os.path.join(directory, "keywords.json"))
+                )
+
+            manager = build()
+            manager.add_documents(pages("Python", source="cv.pdf"))
+            manager.reindex_source("cv.pdf", pages("Python v2", source="cv.pdf"))
+
+            restarted = build()
+            self.assertEqual(restarted.namespace, "jarvis-blue")
+            self.assertEqual(restarted.vector_store._texts, ["Python v2"])
+            self.assertFalse(os.path.exists(os.path.join(directory, "index.jarvis")))
+
+
+if __name__ == "__main__":
+    unittest.main()
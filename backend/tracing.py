@@ -0,0 +1,361 @@
+"""
+Request-level tracing of the RAG and ingestion stages.
+
+Spans follow the OpenTelemetry data model (trace and span ids, parent, start
+and end time, attributes, events, status) and are written as one JSON object
+per line by the console or file exporter, in the layout of the OpenTelemetry
+SDK's console exporter. With TRACING_EXPORTER=otel they are handed to the
+opentelemetry API instead, so any exporter configured in the SDK receives them.
+
+The current span and request id live in context variables, so they follow
+async tasks; work handed to a thread pool must be wrapped with bind().
+"""
+import contextvars
+import functools
+import json
+import re
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import config
+
+_current_span = contextvars.ContextVar("jarvis_current_span", default=None)
+_request_id = contextvars.ContextVar("jarvis_request_id", default=None)
+
+# Accepted from clients as-is; anything else is replaced by a fresh id
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+TRACE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+_UNSET = object()
+_exporter = _UNSET
+_exporter_lock = threading.Lock()
+
+
+def new_request_id() -> str:
+    """Return a fresh request id; it doubles as the trace id of the request's spans"""
+    return uuid.uuid4().hex
+
+
+def valid_request_id(request_id: Optional[str]) -> bool:
+    """Whether a client-supplied request id is safe to echo and log"""
+    return bool(request_id) and REQUEST_ID_PATTERN.match(request_id) is not None
+
+
+def get_request_id() -> Optional[str]:
+    """Return the id of the request being handled, if any"""
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: str):
+    """Make request_id the current request id for the duration of the block"""
+    token = _request_id.set(request_id)
+    try:
+        yield
+    finally:
+        _request_id.reset(token)
+
+
+def bind(fn: Callable) -> Callable:
+    """Wrap fn to run in a copy of the current context, for thread pool submissions"""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run_in_context(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+
+    return run_in_context
+
+
+def _clean_attributes(attributes: dict) -> dict:
+    # Span attributes are primitives or lists of primitives; None is dropped
+    cleaned = {}
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, (str, bool, int, float)):
+            cleaned[key] = value
+        elif isinstance(value, (list, tuple)):
+            cleaned[key] = [item if isinstance(item, (str, bool, int, float)) else str(item) for item in value]
+        else:
+            cleaned[key] = str(value)
+    return cleaned
+
+
+def _iso_time(time_ns: int) -> str:
+    return datetime.fromtimestamp(time_ns / 1e9, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class Span:
+    """A timed operation within a trace, exported when it ends"""
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: dict, exporter):
+        self.name = name
+        self.parent_id = parent.span_id if parent else None
+        if parent:
+            self.trace_id = parent.trace_id
+        else:
+            # A request's root span reuses a generated request id as the trace id
+            request_id = get_request_id()
+            self.trace_id = request_id if request_id and TRACE_ID_PATTERN.match(request_id) else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes = _clean_attributes(attributes)
+        self.events = []
+        self.status_code = "UNSET"
+        self.status_description = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self._exporter = exporter
+
+    def set_attribute(self, key: str, value):
+        self.attributes.update(_clean_attributes({key: value}))
+
+    def set_attributes(self, attributes: dict):
+        self.attributes.update(_clean_attributes(attributes))
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "timestamp": time.time_ns(), "attributes": _clean_attributes(attributes)})
+
+    def update_name(self, name: str):
+        self.name = name
+
+    def record_exception(self, error: BaseException):
+        self.add_event("exception", **{"exception.type": type(error).__name__, "exception.message": str(error)})
+        self.status_code = "ERROR"
+        self.status_description = f"{type(error).__name__}: {error}"
+
+    @contextmanager
+    def activate(self):
+        """Make this the parent of spans started inside the block"""
+        token = _current_span.set(self)
+        try:
+            yield self
+        finally:
+            _current_span.reset(token)
+
+    def end(self):
+        """Close the span and export it; later calls do nothing"""
+        if self.end_time is not None:
+            return
+        self.end_time = time.time_ns()
+        try:
+            self._exporter.export(self)
+        except Exception as e:
+            print(f"Error exporting span {self.name}: {e}")
+
+    def to_dict(self) -> dict:
+        status = {"status_code": self.status_code}
+        if self.status_description:
+            status["description"] = self.status_description
+        return {
+            "name": self.name,
+            "context": {"trace_id": f"0x{self.trace_id}", "span_id": f"0x{self.span_id}"},
+            "kind": "SpanKind.INTERNAL",
+            "parent_id": f"0x{self.parent_id}" if self.parent_id else None,
+            "start_time": _iso_time(self.start_time),
+            "end_time": _iso_time(self.end_time) if self.end_time else None,
+            "duration_ms": (self.end_time - self.start_time) / 1e6 if self.end_time else None,
+            "status": status,
+            "attributes": self.attributes,
+            "events": [
+                {"name": event["name"], "timestamp": _iso_time(event["timestamp"]), "attributes": event["attributes"]}
+                for event in self.events
+            ],
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off, so call sites need no checks"""
+
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+    def update_name(self, name):
+        pass
+
+    def record_exception(self, error):
+        pass
+
+    def activate(self):
+        return nullcontext(self)
+
+    def end(self):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _OpenTelemetrySpan:
+    """Adapts an opentelemetry span to the interface of Span"""
+
+    def __init__(self, span):
+        self.span = span
+        span_context = span.get_span_context()
+        self.trace_id = format(span_context.trace_id, "032x")
+        self.span_id = format(span_context.span_id, "016x")
+
+    def set_attribute(self, key, value):
+        self.span.set_attributes(_clean_attributes({key: value}))
+
+    def set_attributes(self, attributes):
+        self.span.set_attributes(_clean_attributes(attributes))
+
+    def add_event(self, name, **attributes):
+        self.span.add_event(name, attributes=_clean_attributes(attributes))
+
+    def update_name(self, name):
+        self.span.update_name(name)
+
+    def record_exception(self, error):
+        from opentelemetry.trace import Status, StatusCode
+
+        self.span.record_exception(error)
+        self.span.set_status(Status(StatusCode.ERROR, str(error)))
+
+    def activate(self):
+        from opentelemetry import trace
+
+        return trace.use_span(self.span, end_on_exit=False)
+
+    def end(self):
+        self.span.end()
+
+
+class ConsoleSpanExporter:
+    """Prints each finished span as a JSON line"""
+
+    def export(self, span: Span):
+        print(json.dumps(span.to_dict()), flush=True)
+
+
+class FileSpanExporter:
+    """Appends each finished span as a JSON line to a file"""
+
+    def __init__(self, path: str = None):
+        self.path = path or config.TRACE_FILE_PATH
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict()) + "\n"
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line)
+
+
+class OpenTelemetryExporter:
+    """Starts spans through the opentelemetry API; the SDK decides where they go"""
+
+    def __init__(self):
+        # Optional dependency, only needed for this exporter
+        from opentelemetry import trace
+
+        self.tracer = trace.get_tracer("jarvis")
+
+    def start_span(self, name: str, attributes: dict) -> _OpenTelemetrySpan:
+        return _OpenTelemetrySpan(self.tracer.start_span(name, attributes=_clean_attributes(attributes)))
+
+
+def _build_exporter():
+    if config.TRACING_EXPORTER == "console":
+        return ConsoleSpanExporter()
+    if config.TRACING_EXPORTER == "file":
+        return FileSpanExporter()
+    if config.TRACING_EXPORTER == "otel":
+        try:
+            return OpenTelemetryExporter()
+        except ImportError:
+            print("Error enabling tracing: TRACING_EXPORTER=otel needs the opentelemetry-api package")
+    return None
+
+
+def get_exporter():
+    """Return the configured span exporter, or None when tracing is off"""
+    global _exporter
+    if _exporter is _UNSET:
+        with _exporter_lock:
+            if _exporter is _UNSET:
+                _exporter = _build_exporter()
+    return _exporter
+
+
+def set_exporter(exporter):
+    """
+    Replace the span exporter, e.g. with one collecting spans in tests
+
+    Args:
+        exporter: Object with an export(span) method, or None to turn tracing off
+
+    Returns:
+        The previous exporter
+    """
+    global _exporter
+    with _exporter_lock:
+        previous = _exporter
+        _exporter = exporter
+    return None if previous is _UNSET else previous
+
+
+def current_span():
+    """Return the innermost active span, or a no-op span outside any"""
+    exporter = get_exporter()
+    if isinstance(exporter, OpenTelemetryExporter):
+        from opentelemetry import trace
+
+        return _OpenTelemetrySpan(trace.get_current_span())
+    return _current_span.get() or _NOOP_SPAN
+
+
+def start_span(name: str, **attributes):
+    """
+    Start a span without making it current; the caller must end() it
+
+    Use this where a with block cannot enclose the operation, such as across
+    the yields of a generator.
+    """
+    exporter = get_exporter()
+    if exporter is None:
+        return _NOOP_SPAN
+
+    request_id = get_request_id()
+    if request_id:
+        attributes["request.id"] = request_id
+    if isinstance(exporter, OpenTelemetryExporter):
+        return exporter.start_span(name, attributes)
+    return Span(name, _current_span.get(), attributes, exporter)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Trace a block as a child of the current span
+
+    Exceptions are recorded on the span and re-raised.
+
+    Args:
+        name: Span name, e.g. "vector_store.similarity_search"
+        **attributes: Initial span attributes
+    """
+    current = start_span(name, **attributes)
+    try:
+        with current.activate():
+            yield current
+    except Exception as e:
+        current.record_exception(e)
+        raise
+    finally:
+        current.end()
@@ -1,24 +1,203 @@
-from typing import List, Optional
+import asyncio
+import atexit
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
 from langchain_core.documents import Document
 
 import config
-from embeddings import get_embeddings_model
+import metrics
+import tracing
+from batching import CoalescingEmbeddings
+from cache import EmbeddingCache
+from embeddings import embedding_model_name, get_embeddings_model
+from keyword_index import KeywordIndex
+from local_embeddings import LocalEmbeddings
+from local_vector_store import LocalVectorStore
+from manifest import IngestionManifest, chunk_id
+from pipeline import IngestionPipeline
+from resilience import CircuitBreaker
+
+
+# Pinecone caps ids per fetch request well below the per-upsert limit
+FETCH_BATCH_SIZE = 100
+
+
+class EmbeddingDimensionError(ValueError):
+    """The vector index holds vectors of a different dimension than EMBEDDING_DIMENSION"""
+
+
+def local_index_path(namespace: str, base_path: str = None) -> str:
+    """Return the directory of a namespace of the local index"""
+    base_path = base_path or config.LOCAL_INDEX_PATH
+    return f"{base_path}.{namespace}" if namespace else base_path
+
+
+def namespace_slots(namespace: str) -> Tuple[str, str]:
+    """Return the blue and green namespaces a reindex of the given namespace alternates between"""
+    return tuple(f"{namespace}-{color}" if namespace else color for color in ("blue", "green"))
+
+
+class Corpus:
+    """The namespace-scoped parts of the index: vectors, keyword index and manifest"""
+
+    def __init__(self, namespace: str, vector_store, keyword_index: KeywordIndex, manifest: IngestionManifest):
+        self.namespace = namespace
+        self.vector_store = vector_store
+        self.keyword_index = keyword_index
+        self.manifest = manifest
+
+
+class CorpusLock:
+    """
+    Shared/exclusive lock over the corpus
+
+    Ingesting or deleting one source holds it shared, so sources are still
+    written concurrently; reindexing and clearing hold it exclusively, so no
+    write lands in a namespace that is about to be replaced.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+
+    @contextmanager
+    def shared(self):
+        with self._condition:
+            self._condition.wait_for(lambda: not self._exclusive)
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            # Claim the lock first so new shared holders queue behind it
+            self._condition.wait_for(lambda: not self._exclusive)
+            self._exclusive = True
+            self._condition.wait_for(lambda: self._shared == 0)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
 
 
 class VectorStoreManager:
-    """Class to manage Pinecone vector store operations"""
+    """Class to manage vector store operations on Pinecone or the local index"""
     
-    def __init__(self):
+    def __init__(
+        self, embeddings=None, vector_store=None, manifest=None, keyword_index=None, namespace=None, verify_dimension=True
+    ):
         self.pc = None
         self.index = None
-        self.vector_store = None
-        self.embeddings = get_embeddings_model()
+        self.vector_store = vector_store
+        self.embeddings = embeddings or get_embeddings_model()
+        # Off only for tools that read an index built with another model, e.g. migrate_embeddings
+        self.verify_dimension = verify_dimension
         
-        # Initialize Pinecone
-        self._initialize_pinecone()
+        # What has been ingested per source, for dedup and incremental re-ingestion
+        self.manifest = manifest or IngestionManifest(config.INGESTION_MANIFEST_PATH)
+        self._source_locks = {}
+        self._source_locks_guard = threading.Lock()
+        self._corpus_lock = CorpusLock()
+        
+        # The manifest records which blue/green namespace the last reindex switched to
+        self.base_namespace = config.VECTOR_STORE_NAMESPACE if namespace is None else namespace
+        if self.manifest.namespace in (self.base_namespace,) + namespace_slots(self.base_namespace):
+            self.namespace = self.manifest.namespace
+        else:
+            self.namespace = self.base_namespace
+        
+        # Bumped whenever the corpus changes so derived caches can invalidate
+        self.index_version = 0
+        
+        # Repeated queries skip the embeddings round-trip
+        self.query_embedding_cache = EmbeddingCache(
+            max_size=config.EMBEDDING_CACHE_SIZE,
+            ttl_seconds=config.EMBEDDING_CACHE_TTL,
+            path=config.EMBEDDING_CACHE_PATH
+        )
+        if config.EMBEDDING_CACHE_PATH:
+            atexit.register(self.query_embedding_cache.save)
+        
+        # Cache misses arriving together share one embeddings request; the local
+        # model already batches concurrent requests itself, and query-only
+        # embeddings have no batched call to share
+        self.query_embeddings = self.embeddings
+        if (
+            config.QUERY_EMBEDDING_BATCH_WINDOW_MS > 0
+            and not isinstance(self.embeddings, LocalEmbeddings)
+            and hasattr(self.embeddings, "embed_documents")
+        ):
+            self.query_embeddings = CoalescingEmbeddings(
+                self.embeddings,
+                window_ms=config.QUERY_EMBEDDING_BATCH_WINDOW_MS,
+                max_batch_size=config.QUERY_EMBEDDING_MAX_BATCH_SIZE,
+                max_concurrent=config.QUERY_EMBEDDING_MAX_CONCURRENT
+            )
+        
+        # Batched, overlapped embedding and upsert for add_documents; embed_documents
+        # is looked up per batch, so query-only embeddings can still serve retrieval
+        self.pipeline = IngestionPipeline(
+            embed_fn=lambda texts: self.embeddings.embed_documents(texts),
+            upsert_fn=self._upsert_vectors
+        )
+        self.last_ingestion_stats = None
+        
+        # Query-time calls fail fast once a dependency is known to be down
+        self.embeddings_breaker = CircuitBreaker("embeddings", timeout=config.EMBEDDINGS_TIMEOUT)
+        self.retrieval_breaker = CircuitBreaker("retrieval", timeout=config.RETRIEVAL_TIMEOUT)
+        
+        # Bounded pool for the vector store calls that have no async client
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.RETRIEVAL_MAX_WORKERS,
+            thread_name_prefix="vector-store"
+        )
+        
+        # Initialize the configured backend unless a vector store was injected
+        if self.vector_store is None:
+            if config.VECTOR_STORE_BACKEND == "local":
+                self._initialize_local()
+            else:
+                self._initialize_pinecone()
+        
+        # BM25 index over the same chunks, kept in step with every upsert and delete
+        self.keyword_index = keyword_index if keyword_index is not None else KeywordIndex(config.KEYWORD_INDEX_PATH)
+        if not len(self.keyword_index) and isinstance(self.vector_store, LocalVectorStore) and len(self.vector_store):
+            # Local indexes built before keyword search existed already hold every chunk text
+            self.keyword_index.add(self.vector_store._ids, self.vector_store._texts, self.vector_store._metadatas)
+            self.keyword_index.save()
+    
+    def _initialize_local(self):
+        """Initialize the in-process vector index, loading it from disk if present"""
+        try:
+            path = local_index_path(self.namespace)
+            self.vector_store = LocalVectorStore(
+                embedding=self.embeddings,
+                path=path,
+                dimension=config.EMBEDDING_DIMENSION
+            )
+            if len(self.vector_store):
+                self._check_dimension(self.vector_store.dimension, path)
+            print(f"Successfully initialized local vector index: {path}")
+        except Exception as e:
+            print(f"Error initializing local vector index: {e}")
+            raise
     
     def _initialize_pinecone(self):
         """Initialize the Pinecone client and get the index"""
@@ -35,10 +214,13 @@ class VectorStoreManager:
                     dimension=config.EMBEDDING_DIMENSION,
                     metric="cosine",
                     spec=ServerlessSpec(
-                        cloud="aws",
+                        cloud=config.PINECONE_CLOUD,
                         region=config.PINECONE_ENVIRONMENT
                     )
                 )
+            else:
+                # Querying with vectors of another size fails on every request; fail once, clearly
+                self._check_dimension(self.pc.describe_index(config.PINECONE_INDEX_NAME).dimension, config.PINECONE_INDEX_NAME)
             
             # Get the index
             self.index = self.pc.Index(config.PINECONE_INDEX_NAME)
@@ -47,51 +229,472 @@ class VectorStoreManager:
             self.vector_store = PineconeVectorStore(
                 index=self.index,
                 embedding=self.embeddings,
-                text_key="text"
+                text_key="text",
+                namespace=self.namespace
             )
             
-            print(f"Successfully initialized Pinecone index: {config.PINECONE_INDEX_NAME}")
+            print(f"Successfully initialized Pinecone index: {config.PINECONE_INDEX_NAME} (namespace {self.namespace!r})")
             
         except Exception as e:
             print(f"Error initializing Pinecone: {e}")
             raise
     
-    def add_documents(self, documents: List[Document]) -> int:
+    def _check_dimension(self, index_dimension: int, index_name: str):
+        """
+        Fail fast if an existing index was built with another embedding dimension
+        
+        Raises:
+            EmbeddingDimensionError: If the existing index doesn't match EMBEDDING_DIMENSION
+        """
+        if self.verify_dimension and index_dimension != config.EMBEDDING_DIMENSION:
+            raise EmbeddingDimensionError(
+                f"Index {index_name} has dimension {index_dimension} but EMBEDDING_DIMENSION is "
+                f"{config.EMBEDDING_DIMENSION}; set EMBEDDING_DIMENSION={index_dimension} or migrate the index "
+                f"with migrate_embeddings.py"
+            )
+    
+    def add_documents(self, documents: List[Document], progress_callback=None) -> int:
         """
         Add documents to the vector store
         
+        Chunk ids are derived from (source, page, text), so chunks that are
+        already stored are skipped. With INCREMENTAL_INGESTION, an upload is
+        treated as the full new version of its source: only changed chunks are
+        embedded and chunks no longer present are deleted.
+        
         Args:
             documents: List of Document objects to add
+            progress_callback: Optional callable receiving
+                ("embedded" | "upserted" | "skipped" | "deleted", count)
             
         Returns:
             Number of documents added
         """
         try:
-            ids = self.vector_store.add_documents(documents)
-            print(f"Added {len(ids)} documents to Pinecone")
-            return len(ids)
+            # Group by source so each document's manifest entry is diffed as a whole
+            by_source = OrderedDict()
+            for doc in documents:
+                by_source.setdefault((doc.metadata or {}).get("source"), []).append(doc)
+            
+            totals = {"added": 0, "skipped": 0, "deleted": 0}
+            for source, source_documents in by_source.items():
+                stats = self._add_source_documents(source, source_documents, progress_callback)
+                for key in totals:
+                    totals[key] += stats[key]
+                self.last_ingestion_stats = stats
+            
+            self.index_version += 1
+            return totals["added"]
+        except Exception as e:
+            print(f"Error adding documents to the vector store: {e}")
+            raise
+    
+    def add_document_stream(self, source: str, chunks: Iterable[Document], progress_callback=None) -> int:
+        """
+        Add the chunks of one source document as they are produced
+        
+        Chunks are embedded while the producer is still parsing later pages.
+        The stream is treated as the complete new version of the source, as in
+        add_documents.
+        
+        Args:
+            source: Source document name
+            chunks: Iterable of Document chunks, e.g. DocumentProcessor.iter_pdf_chunks
+            progress_callback: Optional callable receiving
+                ("embedded" | "upserted" | "skipped" | "deleted", count)
+            
+        Returns:
+            Number of documents added
+        """
+        try:
+            stats = self._add_source_documents(source, chunks, progress_callback)
+            self.last_ingestion_stats = stats
+            self.index_version += 1
+            return stats["added"]
         except Exception as e:
-            print(f"Error adding documents to Pinecone: {e}")
+            print(f"Error adding documents to the vector store: {e}")
             raise
     
-    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+    def _add_source_documents(
+        self, source: Optional[str], documents: Iterable[Document], progress_callback=None, corpus: Corpus = None
+    ) -> dict:
+        """Embed the new chunks of one source and delete its stale ones, in the live corpus unless one is given"""
+        if corpus is None:
+            corpus, pipeline, corpus_lock = self._live_corpus(), self.pipeline, self._corpus_lock.shared()
+        else:
+            # A corpus being rebuilt is only written by the reindex holding the exclusive lock
+            pipeline = IngestionPipeline(
+                embed_fn=self.embeddings.embed_documents,
+                upsert_fn=partial(self._upsert_vectors, corpus=corpus)
+            )
+            corpus_lock = nullcontext()
+        
+        with tracing.span("vector_store.add_documents", source=source) as span, corpus_lock, self._source_lock(source):
+            existing = corpus.manifest.get(source) if source else set()
+            seen = set()
+            counts = {"added": 0, "skipped": 0}
+            
+            def new_chunks():
+                # Filter lazily so the pipeline consumes chunks as they are parsed
+                for doc in documents:
+                    doc_id = chunk_id(source or "", (doc.metadata or {}).get("page"), doc.page_content)
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    
+                    if doc_id in existing:
+                        counts["skipped"] += 1
+                        if progress_callback:
+                            progress_callback("skipped", 1)
+                        continue
+                    
+                    counts["added"] += 1
+                    yield doc_id, doc.page_content, dict(doc.metadata or {})
+            
+            stats = pipeline.run_stream(new_chunks(), progress_callback=progress_callback)
+            
+            # Chunks of the previous version that the new upload no longer contains
+            stale_ids = []
+            if source and config.INCREMENTAL_INGESTION:
+                stale_ids = sorted(existing - seen)
+                if stale_ids:
+                    corpus.vector_store.delete(ids=stale_ids)
+                    corpus.keyword_index.delete(stale_ids)
+                    if progress_callback:
+                        progress_callback("deleted", len(stale_ids))
+            
+            # Vectors are saved before the manifest records them as ingested
+            if isinstance(corpus.vector_store, LocalVectorStore):
+                corpus.vector_store.save()
+            if source:
+                corpus.manifest.set(source, seen if config.INCREMENTAL_INGESTION else existing | seen)
+            corpus.keyword_index.save()
+            
+            print(
+                f"Added {counts['added']} documents to the vector store from {source or 'unknown source'} "
+                f"(skipped {counts['skipped']} unchanged, deleted {len(stale_ids)} stale, "
+                f"{stats['chunks_per_second']:.1f} chunks/sec, {stats['retries']} retries)"
+            )
+            span.set_attributes({
+                "ingestion.added": counts["added"],
+                "ingestion.skipped": counts["skipped"],
+                "ingestion.deleted": len(stale_ids),
+                "ingestion.retries": stats["retries"]
+            })
+            return {**stats, **counts, "deleted": len(stale_ids)}
+    
+    def _source_lock(self, source: Optional[str]) -> threading.Lock:
+        # Concurrent uploads of the same document must not interleave their manifest diffs
+        with self._source_locks_guard:
+            return self._source_locks.setdefault(source, threading.Lock())
+    
+    def _upsert_vectors(
+        self, ids: List[str], vectors: List[List[float]], texts: List[str], metadatas: List[dict], corpus: Corpus = None
+    ):
+        """Write pre-computed embeddings to the configured backend, in the live corpus unless one is given"""
+        corpus = corpus or self._live_corpus()
+        if isinstance(corpus.vector_store, LocalVectorStore):
+            # Persisted once per run by _add_source_documents, not per batch
+            corpus.vector_store.add_vectors(vectors, texts, metadatas=metadatas, ids=ids, save=False)
+        elif self.index is not None:
+            # Same layout PineconeVectorStore uses: chunk text stored under "text"
+            self.index.upsert(vectors=[
+                {"id": doc_id, "values": vector, "metadata": {**metadata, "text": text}}
+                for doc_id, vector, text, metadata in zip(ids, vectors, texts, metadatas)
+            ], namespace=corpus.namespace)
+        else:
+            corpus.vector_store.add_texts(texts, metadatas=metadatas, ids=ids)
+        
+        corpus.keyword_index.add(ids, texts, metadatas)
+    
+    def similarity_search(
+        self,
+        query: str,
+        k: int = None,
+        score_threshold: float = None,
+        filter: dict = None,
+        mmr: bool = None,
+        mmr_lambda: float = None,
+    ) -> List[Document]:
         """
         Perform similarity search on the vector store
         
+        In hybrid retrieval mode the BM25 keyword search runs on the retrieval
+        pool while the query is embedded and searched, and the two rankings
+        are combined by reciprocal rank fusion; if the vector side fails or
+        its circuit breaker is open, the keyword matches are used alone.
+        Thresholding and MMR are computed locally over the fetched candidates.
+        
         Args:
             query: Query text to search for
-            k: Number of results to return
+            k: Number of results to return (default RETRIEVAL_K)
+            score_threshold: Minimum cosine similarity for vector matches
+            filter: Metadata filter, e.g. {"source": "cv.pdf"} or {"source": {"$in": [...]}}
+            mmr: Diversify the results by maximal marginal relevance
+            mmr_lambda: MMR trade-off, 1 favours relevance and 0 diversity
             
         Returns:
             List of Document objects most similar to the query
         """
         try:
-            docs = self.vector_store.similarity_search(query, k=k)
-            return docs
+            params = self._search_params(k, score_threshold, filter, mmr, mmr_lambda)
+            with tracing.span("vector_store.similarity_search", **self._span_attributes(params)) as span:
+                keyword_future = None
+                if params["hybrid"]:
+                    keyword_future = self._executor.submit(tracing.bind(self._keyword_candidates), query, params)
+                
+                try:
+                    embedding = self.embed_query(query)
+                    vector_candidates = self.retrieval_breaker.call(self._vector_candidates, embedding, params)
+                except Exception as e:
+                    if keyword_future is None:
+                        raise
+                    # Keyword matches alone still beat answering without context
+                    print(f"Vector search failed, using keyword matches only: {e}")
+                    span.add_event("vector_search_failed", error=str(e))
+                    vector_candidates = []
+                
+                keyword_candidates = keyword_future.result() if keyword_future else None
+                docs = self._select_candidates(vector_candidates, keyword_candidates, params)
+                span.set_attribute("retrieval.documents", len(docs))
+                return docs
         except Exception as e:
             print(f"Error performing similarity search: {e}")
             raise
     
+    async def asimilarity_search(
+        self,
+        query: str,
+        k: int = None,
+        score_threshold: float = None,
+        filter: dict = None,
+        mmr: bool = None,
+        mmr_lambda: float = None,
+    ) -> List[Document]:
+        """
+        Perform similarity search without blocking the event loop
+        
+        The query is embedded with the async embeddings client and the
+        vector store query runs on the bounded retrieval thread pool. In
+        hybrid retrieval mode the keyword search runs concurrently on the
+        same pool.
+        
+        Args:
+            query: Query text to search for
+            k: Number of results to return (default RETRIEVAL_K)
+            score_threshold: Minimum cosine similarity for vector matches
+            filter: Metadata filter, e.g. {"source": "cv.pdf"} or {"source": {"$in": [...]}}
+            mmr: Diversify the results by maximal marginal relevance
+            mmr_lambda: MMR trade-off, 1 favours relevance and 0 diversity
+            
+        Returns:
+            List of Document objects most similar to the query
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            params = self._search_params(k, score_threshold, filter, mmr, mmr_lambda)
+            with tracing.span("vector_store.similarity_search", **self._span_attributes(params)) as span:
+                keyword_future = None
+                if params["hybrid"]:
+                    keyword_future = loop.run_in_executor(
+                        self._executor, tracing.bind(self._keyword_candidates), query, params
+                    )
+                
+                try:
+                    embedding = await self.aembed_query(query)
+                    vector_candidates = await self.retrieval_breaker.acall(
+                        loop.run_in_executor, self._executor, tracing.bind(self._vector_candidates), embedding, params
+                    )
+                except Exception as e:
+                    if keyword_future is None:
+                        raise
+                    print(f"Vector search failed, using keyword matches only: {e}")
+                    span.add_event("vector_search_failed", error=str(e))
+                    vector_candidates = []
+                
+                keyword_candidates = await keyword_future if keyword_future else None
+                docs = self._select_candidates(vector_candidates, keyword_candidates, params)
+                span.set_attribute("retrieval.documents", len(docs))
+                return docs
+        except Exception as e:
+            print(f"Error performing async similarity search: {e}")
+            raise
+    
+    def _search_params(self, k, score_threshold, filter, mmr, mmr_lambda) -> dict:
+        """Resolve per-request retrieval options against the configured defaults"""
+        k = k or config.RETRIEVAL_K
+        mmr = config.RETRIEVAL_MMR if mmr is None else mmr
+        hybrid = config.RETRIEVAL_MODE == "hybrid" and len(self.keyword_index) > 0
+        
+        # Thresholding, fusion and MMR each pick from a wider candidate pool
+        fetch_k = k
+        if hybrid:
+            fetch_k = max(fetch_k, config.HYBRID_CANDIDATES)
+        if mmr:
+            fetch_k = max(fetch_k, config.MMR_FETCH_K)
+        
+        return {
+            "k": k,
+            "fetch_k": fetch_k,
+            "score_threshold": config.RETRIEVAL_SCORE_THRESHOLD if score_threshold is None else score_threshold,
+            "filter": filter or None,
+            "mmr": mmr,
+            "mmr_lambda": config.MMR_LAMBDA if mmr_lambda is None else mmr_lambda,
+            "hybrid": hybrid
+        }
+    
+    @staticmethod
+    def _span_attributes(params: dict) -> dict:
+        return {
+            "retrieval.k": params["k"],
+            "retrieval.fetch_k": params["fetch_k"],
+            "retrieval.hybrid": params["hybrid"],
+            "retrieval.mmr": params["mmr"],
+            "retrieval.filtered": params["filter"] is not None
+        }
+    
+    def _vector_candidates(self, embedding: List[float], params: dict) -> List[tuple]:
+        """
+        Fetch vector search candidates in a single query
+        
+        Returns:
+            List of (Document, score, vector) triples, best first; the vector is
+            only fetched when MMR needs it and the backend can return it
+        """
+        fetch_k, search_filter = params["fetch_k"], params["filter"]
+        
+        with metrics.QUERY_STAGE_SECONDS.time(stage="vector_search"), \
+                tracing.span("vector_store.query", backend=type(self.vector_store).__name__):
+            if isinstance(self.vector_store, LocalVectorStore):
+                candidates = self.vector_store.search_with_vectors(embedding, k=fetch_k, filter=search_filter)
+            elif self.index is not None:
+                response = self.index.query(
+                    vector=embedding,
+                    top_k=fetch_k,
+                    filter=search_filter,
+                    include_metadata=True,
+                    include_values=params["mmr"],
+                    namespace=self.namespace
+                )
+                candidates = []
+                for match in response.matches:
+                    metadata = dict(match.metadata or {})
+                    text = metadata.pop("text", "")
+                    vector = np.asarray(match.values, dtype=np.float32) if params["mmr"] and match.values else None
+                    candidates.append((Document(page_content=text, metadata=metadata), match.score, vector))
+            else:
+                kwargs = {"filter": search_filter} if search_filter else {}
+                results = self.vector_store.similarity_search_by_vector_with_score(embedding, k=fetch_k, **kwargs)
+                candidates = [(doc, score, None) for doc, score in results]
+        
+        if params["score_threshold"] is not None:
+            candidates = [candidate for candidate in candidates if candidate[1] >= params["score_threshold"]]
+        return candidates
+    
+    def _keyword_candidates(self, query: str, params: dict) -> List[tuple]:
+        """Fetch BM25 candidates as (Document, score, None) triples"""
+        with metrics.QUERY_STAGE_SECONDS.time(stage="keyword_search"), tracing.span("keyword_index.search"):
+            results = self.keyword_index.search(query, params["fetch_k"], filter=params["filter"])
+        return [(doc, score, None) for doc, score in results]
+    
+    def _select_candidates(self, vector_candidates: List[tuple], keyword_candidates: Optional[List[tuple]], params: dict) -> List[Document]:
+        """Fuse the candidate rankings, then keep the top k or an MMR selection"""
+        candidates = vector_candidates
+        if keyword_candidates is not None:
+            candidates = self._fuse_rankings([vector_candidates, keyword_candidates])
+        
+        if params["mmr"]:
+            return self._maximal_marginal_relevance(candidates, params["k"], params["mmr_lambda"])
+        return [doc for doc, _score, _vector in candidates[:params["k"]]]
+    
+    @staticmethod
+    def _fuse_rankings(rankings: List[List[tuple]]) -> List[tuple]:
+        """
+        Combine ranked candidate lists by reciprocal rank fusion
+        
+        Args:
+            rankings: Lists of (Document, score, vector) triples, best first
+            
+        Returns:
+            (Document, fused score, vector) triples, best first
+        """
+        scores = {}
+        candidates = {}
+        for ranking in rankings:
+            for rank, (doc, _score, vector) in enumerate(ranking):
+                # The same chunk from either retriever has the same deterministic id
+                metadata = doc.metadata or {}
+                page = metadata.get("page")
+                if isinstance(page, float) and page.is_integer():
+                    page = int(page)  # Pinecone returns numeric metadata as floats
+                doc_id = chunk_id(metadata.get("source") or "", page, doc.page_content)
+                scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (config.RRF_K + rank + 1)
+                
+                # Keep the vector if either retriever supplied one
+                if doc_id not in candidates or candidates[doc_id][1] is None:
+                    candidates[doc_id] = (doc, vector)
+        
+        best = sorted(scores, key=scores.get, reverse=True)
+        return [(candidates[doc_id][0], scores[doc_id], candidates[doc_id][1]) for doc_id in best]
+    
+    @staticmethod
+    def _maximal_marginal_relevance(candidates: List[tuple], k: int, mmr_lambda: float) -> List[Document]:
+        """
+        Greedily pick k candidates that are relevant but unlike those already picked
+        
+        Relevance is the candidate's rank score scaled to [0, 1]; redundancy is
+        the cosine similarity to the closest picked candidate. Candidates
+        without a vector count as dissimilar to everything.
+        """
+        if len(candidates) <= k:
+            return [doc for doc, _score, _vector in candidates]
+        
+        scores = np.asarray([score for _doc, score, _vector in candidates], dtype=np.float32)
+        spread = scores.max() - scores.min()
+        relevance = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+        
+        dimension = next((len(vector) for _doc, _score, vector in candidates if vector is not None), 0)
+        vectors = np.zeros((len(candidates), dimension), dtype=np.float32)
+        for i, (_doc, _score, vector) in enumerate(candidates):
+            if vector is not None:
+                norm = np.linalg.norm(vector)
+                vectors[i] = vector / norm if norm else vector
+        similarity = vectors @ vectors.T
+        
+        selected = [int(np.argmax(relevance))]
+        redundancy = similarity[selected[0]].copy()
+        while len(selected) < k:
+            mmr_scores = mmr_lambda * relevance - (1 - mmr_lambda) * redundancy
+            mmr_scores[selected] = -np.inf
+            best = int(np.argmax(mmr_scores))
+            selected.append(best)
+            redundancy = np.maximum(redundancy, similarity[best])
+        
+        return [candidates[i][0] for i in selected]
+    
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query, serving repeated queries from the embedding cache"""
+        key = self._query_cache_key(query)
+        embedding = self.query_embedding_cache.get(key)
+        if embedding is None:
+            with metrics.QUERY_STAGE_SECONDS.time(stage="embedding"), tracing.span("embeddings.embed_query"):
+                embedding = self.embeddings_breaker.call(self.query_embeddings.embed_query, query)
+            self.query_embedding_cache.put(key, embedding)
+        return embedding
+    
+    async def aembed_query(self, query: str) -> List[float]:
+        """Async variant of embed_query"""
+        key = self._query_cache_key(query)
+        embedding = self.query_embedding_cache.get(key)
+        if embedding is None:
+            with metrics.QUERY_STAGE_SECONDS.time(stage="embedding"), tracing.span("embeddings.embed_query"):
+                embedding = await self.embeddings_breaker.acall(self.query_embeddings.aembed_query, query)
+            self.query_embedding_cache.put(key, embedding)
+        return embedding
+    
+    def _query_cache_key(self, query: str) -> str:
+        return EmbeddingCache.make_key(query, embedding_model_name(self.embeddings), config.EMBEDDING_DIMENSION)
+    
     def delete_all(self) -> bool:
         """
         Delete all vectors from the store
@@ -100,9 +703,182 @@ class VectorStoreManager:
             True if successful
         """
         try:
-            self.index.delete(delete_all=True)
-            print("Deleted all vectors from Pinecone")
+            with self._corpus_lock.exclusive():
+                self.vector_store.delete(delete_all=True)
+                self.manifest.clear()
+                self.keyword_index.clear()
+                self.keyword_index.save()
+                self.index_version += 1
+            print("Deleted all vectors from the vector store")
             return True
         except Exception as e:
-            print(f"Error deleting vectors from Pinecone: {e}")
-            raise 
\ No newline at end of file
+            print(f"Error deleting vectors from the vector store: {e}")
+            raise
+    
+    def delete_source(self, source: str) -> int:
+        """
+        Delete every chunk of one source document
+        
+        Args:
+            source: Source document name, as stored in metadata["source"]
+            
+        Returns:
+            Number of chunks deleted; 0 if the source is unknown
+        """
+        try:
+            with tracing.span("vector_store.delete_source", source=source) as span, \
+                    self._corpus_lock.shared(), self._source_lock(source):
+                # The keyword index also covers chunks stored before the manifest existed
+                ids = sorted(self.manifest.get(source) | set(self.keyword_index.ids({"source": source})))
+                if ids:
+                    self.vector_store.delete(ids=ids)
+                    self.keyword_index.delete(ids)
+                    self.keyword_index.save()
+                self.manifest.remove(source)
+                span.set_attribute("ingestion.deleted", len(ids))
+            
+            if ids:
+                self.index_version += 1
+            print(f"Deleted {len(ids)} chunks of {source} from the vector store")
+            return len(ids)
+        except Exception as e:
+            print(f"Error deleting {source} from the vector store: {e}")
+            raise
+    
+    def reindex_source(self, source: str, chunks: Iterable[Document], progress_callback=None) -> dict:
+        """
+        Rebuild one source document with a blue/green namespace swap
+        
+        The other sources' vectors are copied, without re-embedding, into the
+        idle namespace, the source is embedded there from scratch, and queries
+        are switched over once the new namespace is complete. Queries keep
+        reading the old namespace until then, so they never see a half-built
+        index; uploads wait until the swap is done.
+        
+        Args:
+            source: Source document name
+            chunks: Iterable of Document chunks of the new version of the source
+            progress_callback: Optional callable receiving ("embedded" | "upserted" | "deleted", count)
+            
+        Returns:
+            Ingestion stats for the source, plus the chunks copied and the new namespace
+        """
+        try:
+            with tracing.span("vector_store.reindex", source=source) as span, self._corpus_lock.exclusive():
+                old = self._live_corpus()
+                blue, green = namespace_slots(self.base_namespace)
+                staging = self._open_corpus(green if self.namespace == blue else blue)
+                span.set_attribute("vector_store.namespace", staging.namespace)
+                
+                try:
+                    copied = 0
+                    for ids, vectors, texts, metadatas in self.export_vectors(exclude_source=source):
+                        self._upsert_vectors(ids, vectors, texts, metadatas, corpus=staging)
+                        copied += len(ids)
+                    for other_source in self.manifest.sources():
+                        if other_source != source:
+                            staging.manifest.set(other_source, self.manifest.get(other_source))
+                    
+                    stats = self._add_source_documents(source, chunks, progress_callback, corpus=staging)
+                except Exception:
+                    self._drop_corpus(staging)
+                    raise
+                
+                # Persist the new corpus, then switch queries over to it
+                staging.keyword_index.path = old.keyword_index.path
+                staging.keyword_index.save()
+                self.manifest.adopt(staging.manifest, staging.namespace)
+                self.vector_store, self.keyword_index, self.namespace = (
+                    staging.vector_store, staging.keyword_index, staging.namespace
+                )
+                self.index_version += 1
+                
+                self._drop_corpus(old)
+                span.set_attribute("reindex.copied", copied)
+            
+            self.last_ingestion_stats = stats
+            print(f"Reindexed {source} into namespace {staging.namespace!r} ({copied} chunks of other sources copied)")
+            return {**stats, "copied": copied, "namespace": staging.namespace}
+        except Exception as e:
+            print(f"Error reindexing {source}: {e}")
+            raise
+    
+    def _live_corpus(self) -> Corpus:
+        return Corpus(self.namespace, self.vector_store, self.keyword_index, self.manifest)
+    
+    def _open_corpus(self, namespace: str) -> Corpus:
+        """Create an empty corpus in a namespace, for a rebuild; its keyword index and manifest start in memory"""
+        if isinstance(self.vector_store, LocalVectorStore):
+            # An in-memory index stays in memory
+            path = local_index_path(namespace) if self.vector_store.path else None
+            vector_store = LocalVectorStore(self.embeddings, path=path, dimension=self.vector_store.dimension)
+            vector_store.delete(delete_all=True)
+        elif self.index is not None:
+            vector_store = PineconeVectorStore(
+                index=self.index, embedding=self.embeddings, text_key="text", namespace=namespace
+            )
+            # Clear leftovers of an interrupted reindex; deleting a namespace that doesn't exist raises
+            try:
+                self.index.delete(delete_all=True, namespace=namespace)
+            except Exception:
+                pass
+        else:
+            raise ValueError("Reindexing needs the local index or a Pinecone index")
+        
+        return Corpus(namespace, vector_store, KeywordIndex(), IngestionManifest())
+    
+    def _drop_corpus(self, corpus: Corpus):
+        """Delete a corpus's vectors; failures are logged, since the swap already succeeded or failed"""
+        try:
+            if isinstance(corpus.vector_store, LocalVectorStore):
+                corpus.vector_store.delete(delete_all=True)
+                if corpus.vector_store.path:
+                    for filename in (LocalVectorStore.VECTORS_FILE, LocalVectorStore.METADATA_FILE):
+                        file_path = os.path.join(corpus.vector_store.path, filename)
+                        if os.path.exists(file_path):
+                            os.remove(file_path)
+                    if not os.listdir(corpus.vector_store.path):
+                        os.rmdir(corpus.vector_store.path)
+            elif self.index is not None:
+                self.index.delete(delete_all=True, namespace=corpus.namespace)
+        except Exception as e:
+            print(f"Error deleting vector store namespace {corpus.namespace!r}: {e}")
+    
+    def export_vectors(self, exclude_source: str = None) -> Iterator[tuple]:
+        """
+        Read back the live corpus's chunks and vectors, optionally except one source's
+        
+        Yields:
+            (ids, vectors, texts, metadatas) batches
+        """
+        if isinstance(self.vector_store, LocalVectorStore):
+            store = self.vector_store
+            vectors, ids, texts, metadatas = store.snapshot()
+            rows = [i for i, metadata in enumerate(metadatas[:len(vectors)]) if metadata.get("source") != exclude_source]
+            if rows:
+                yield [ids[i] for i in rows], np.asarray(vectors)[rows], [texts[i] for i in rows], [metadatas[i] for i in rows]
+            return
+        
+        if self.index is None:
+            raise ValueError("Reindexing needs the local index or a Pinecone index")
+        
+        try:
+            # Listing ids is only supported by serverless indexes
+            ids = [doc_id for page in self.index.list(namespace=self.namespace) for doc_id in page]
+        except Exception:
+            ids = sorted(set(self.keyword_index.ids()).union(*(
+                self.manifest.get(source) for source in self.manifest.sources()
+            )))
+        
+        for start in range(0, len(ids), FETCH_BATCH_SIZE):
+            response = self.index.fetch(ids=ids[start:start + FETCH_BATCH_SIZE], namespace=self.namespace)
+            batch = ([], [], [], [])
+            for doc_id, vector in response.vectors.items():
+                metadata = dict(vector.metadata or {})
+                if metadata.get("source") == exclude_source:
+                    continue
+                text = metadata.pop("text", "")
+                for values, item in zip(batch, (doc_id, list(vector.values), text, metadata)):
+                    values.append(item)
+            if batch[0]:
+                yield batch 
\ No newline at end of file
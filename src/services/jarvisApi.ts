@@ -18,7 +18,8 @@ interface QueryResponse {
 
 interface UploadResponse {
   message: string
-  documents_added: number
+  job_id: string
+  status: 'queued' | 'processing' | 'completed' | 'failed'
   filename: string
 }
 
@@ -123,6 +124,72 @@ export const queryJarvis = async (
   }
 }
 
+/**
+ * Query the JARVIS backend and stream the answer as it is generated
+ *
+ * Sources arrive first, then answer tokens; resolves with the full response
+ * once the server sends its final frame.
+ */
+export const queryJarvisStream = async (
+  query: string,
+  conversationHistory: Array<{
+    role: 'user' | 'assistant'
+    content: string
+  }> = [],
+  onToken?: (token: string) => void,
+  onSources?: (sources: QueryResponse['sources']) => void,
+): Promise<QueryResponse> => {
+  const response = await fetch(`${API_BASE_URL}/query/stream`, {
+    method: 'POST',
+    headers: getHeaders(),
+    body: JSON.stringify({
+      query,
+      conversation_history: conversationHistory,
+    }),
+  })
+
+  if (!response.ok || !response.body) {
+    throw new Error(`Error ${response.status}: ${response.statusText}`)
+  }
+
+  const result: QueryResponse = { answer: '', sources: [], context_used: false }
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    // Frames are separated by a blank line: "event: <name>\ndata: <json>\n\n"
+    let boundary = buffer.indexOf('\n\n')
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf('\n\n')
+
+      const event = frame.match(/^event: (.*)$/m)?.[1]
+      const data = JSON.parse(frame.match(/^data: (.*)$/m)?.[1] || '{}')
+
+      if (event === 'sources') {
+        result.sources = data.sources
+        result.context_used = data.context_used
+        onSources?.(data.sources)
+      } else if (event === 'token') {
+        result.answer += data.content
+        onToken?.(data.content)
+      } else if (event === 'done') {
+        result.token_usage = data.token_usage
+      } else if (event === 'error') {
+        throw new Error(data.detail || 'Error querying JARVIS')
+      }
+    }
+  }
+
+  return result
+}
+
 /**
  * Check if the backend API is available
  */